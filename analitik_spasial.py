@@ -0,0 +1,45 @@
+import pandas as pd
+
+def buat_indeks_desa(geografi):
+    """
+    Indeks posisi id_desa -> baris geografi, dipakai ulang untuk semua join
+    sehingga join cukup berupa pengambilan array berdasarkan posisi
+    """
+    geo = geografi.sort_values("id_desa").reset_index(drop=True)
+    return {
+        "index": pd.Index(geo["id_desa"].astype(int)),
+        "luas_daerah": geo["luas_daerah"].to_numpy(dtype=float),
+        "rw": geo["rw"].to_numpy(dtype=float),
+        "rt": geo["rt"].to_numpy(dtype=float)
+    }
+
+def hitung_indikator_desa(df_desa, indeks):
+    """
+    Hitung kepadatan (jiwa/km²), penduduk per RW dan per RT untuk setiap
+    baris (desa, tahun) sekaligus, termasuk tahun prediksi.
+    df_desa: tabel panjang dengan kolom id_desa, id_tahun, jumlah_penduduk
+    """
+    pos = indeks["index"].get_indexer(df_desa["id_desa"].astype(int))
+    valid = pos >= 0
+    df = df_desa.loc[valid].copy()
+    pos = pos[valid]
+
+    penduduk = df["jumlah_penduduk"].to_numpy(dtype=float)
+    df["luas_daerah"] = indeks["luas_daerah"][pos]
+    df["kepadatan"] = penduduk / indeks["luas_daerah"][pos]
+    df["penduduk_per_rw"] = penduduk / indeks["rw"][pos]
+    df["penduduk_per_rt"] = penduduk / indeks["rt"][pos]
+    return df
+
+def hitung_fasilitas_per_kapita(df_desa, fasilitas, per=1000):
+    """
+    Rasio fasilitas per `per` penduduk untuk setiap tahun dan kategori
+    fasilitas (matriks tahun x kategori dalam satu operasi)
+    """
+    total = df_desa.groupby("id_tahun")["jumlah_penduduk"].sum()
+    kategori = fasilitas.groupby("kategori_fasilitas")["jumlah"].sum()
+
+    rasio = kategori.to_numpy(dtype=float)[None, :] / total.to_numpy(dtype=float)[:, None] * per
+    hasil = pd.DataFrame(rasio, index=total.index, columns=kategori.index)
+    hasil.insert(0, "jumlah_penduduk", total.to_numpy())
+    return hasil.reset_index()
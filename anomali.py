@@ -0,0 +1,181 @@
+"""
+Deteksi tahun anomali sebelum training dengan statistik robust.
+
+Seri tahunan di sini pendek (< 10 titik), jadi satu tahun salah ketik bisa
+mendominasi fit SVR linear dengan C besar. Dua metode, keduanya vektor atas
+matriks (tahun x seri) sehingga semua seri satu tabel diperiksa sekaligus:
+
+- "mad":    skor robust (median/MAD) selisih antar tahun terhadap seluruh seri
+- "hampel": filter Hampel pada selisih antar tahun, median/MAD bergerak 5 selisih
+
+Keduanya bekerja pada selisih karena seri penduduk bertren (median nilai bertetangga
+pada seri monoton selalu nilai tengahnya). Lonjakan menandai tahun sesudahnya;
+spike (naik lalu turun kembali) hanya menandai tahun puncaknya.
+
+model_store.train_table_models memeriksa semua seri tabel dengan satu panggilan
+catatan_tabel lalu meneruskan keputusannya ke training tiap seri.
+
+Mode training diatur SIDAREJA_ANOMALY: "off", "flag" (hanya dicatat, default)
+atau "weight" (tahun anomali diberi sample_weight BOBOT_ANOMALI).
+"""
+import os
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from logging_setup import get_logger
+
+logger = get_logger("anomali")
+
+MODE = os.getenv("SIDAREJA_ANOMALY", "flag")
+METODE = os.getenv("SIDAREJA_ANOMALY_METHOD", "mad")
+AMBANG = float(os.getenv("SIDAREJA_ANOMALY_THRESHOLD", "3.5"))
+BOBOT_ANOMALI = 0.1
+# Skala minimum = fraksi median nilai seri, supaya seri yang hampir lurus
+# sempurna tidak menandai selisih beberapa orang saja sebagai anomali
+LANTAI_RELATIF = 0.001
+
+def _skala_robust(dev):
+    """
+    1.4826 x MAD per kolom. Jika MAD nol (tren lurus sempurna) dipakai rata-rata
+    deviasi absolut titik lain, tanpa titik yang sedang dinilai, sehingga satu
+    outlier tidak ikut membesarkan skalanya sendiri.
+    """
+    absdev = np.abs(dev)
+    mad = np.nanmedian(absdev, axis=0) * 1.4826
+    n = np.sum(~np.isnan(dev), axis=0)
+    tanpa_titik = (np.nansum(absdev, axis=0) - absdev) / np.maximum(n - 1, 1) * 1.2533
+    return np.where(mad > 0, mad, tanpa_titik)
+
+def _skor(dev, scale, lantai):
+    scale = np.maximum(scale, lantai)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(scale > 0, dev / scale, 0.0)
+
+def skor_mad(D, lantai=0.0):
+    """Skor robust per selisih terhadap median/MAD seluruh seri"""
+    dev = D - np.nanmedian(D, axis=0)
+    return _skor(dev, _skala_robust(dev), lantai)
+
+def skor_hampel(D, window=2, lantai=0.0):
+    """Skor Hampel: jarak ke median bergerak (2*window+1 selisih) dibagi MAD lokal"""
+    padded = np.pad(D, ((window, window), (0, 0)), mode="edge")
+    windows = sliding_window_view(padded, 2 * window + 1, axis=0)   # (selisih, seri, jendela)
+    median = np.median(windows, axis=2)
+    mad = np.median(np.abs(windows - median[..., None]), axis=2) * 1.4826
+    dev = D - median
+    return _skor(dev, np.where(mad > 0, mad, _skala_robust(dev)), lantai)
+
+def deteksi(x, Y, metode=None, ambang=None):
+    """
+    Tandai tahun anomali. x: tahun (n,), Y: nilai (n,) atau (n, seri).
+    Mengembalikan (mask bool, skor) dengan bentuk sama seperti Y, urutan baris mengikuti x;
+    skor tahun pertama selalu 0.
+    """
+    metode = metode or METODE
+    ambang = AMBANG if ambang is None else ambang
+    x = np.asarray(x, dtype=float).ravel()
+    Y = np.asarray(Y, dtype=float)
+    single = Y.ndim == 1
+    Y = Y.reshape(len(x), -1)
+    order = np.argsort(x, kind="stable")
+    mask = np.zeros(Y.shape, dtype=bool)
+    skor = np.zeros(Y.shape)
+
+    if len(x) >= 4:
+        D = np.diff(Y[order], axis=0) / np.diff(x[order])[:, None]
+        lantai = LANTAI_RELATIF * np.nanmedian(np.abs(Y), axis=0)
+        skor[1:] = skor_hampel(D, lantai=lantai) if metode == "hampel" else skor_mad(D, lantai=lantai)
+        lompat = np.abs(skor) > ambang     # lompat[t]: selisih tahun t-1 -> t anomali
+        # Spike: lompatan di t dan t+1 berlawanan arah -> hanya tahun t yang salah
+        spike = np.zeros_like(lompat)
+        spike[:-1] = lompat[:-1] & lompat[1:] & (np.sign(skor[:-1]) != np.sign(skor[1:]))
+        mask = lompat.copy()
+        mask[1:] &= ~spike[:-1]
+
+    hasil_mask = np.empty_like(mask)
+    hasil_skor = np.empty_like(skor)
+    hasil_mask[order], hasil_skor[order] = mask, skor
+    if single:
+        return hasil_mask[:, 0], hasil_skor[:, 0]
+    return hasil_mask, hasil_skor
+
+def bobot(mask, faktor=BOBOT_ANOMALI):
+    """sample_weight: 1 untuk tahun normal, `faktor` untuk tahun anomali"""
+    return np.where(mask, faktor, 1.0)
+
+def _keputusan(mode, metode, tahun, skor):
+    return {
+        "mode": mode,
+        "metode": metode,
+        "ambang": AMBANG,
+        "tahun": [int(t) for t in tahun],
+        "skor": [round(float(v), 2) for v in skor],
+    }
+
+def catatan(x, y, mode=None, metode=None, keputusan=None):
+    """
+    Keputusan anomali untuk satu seri training: dict yang disimpan di model.anomali_
+    dan sample_weight (None jika mode bukan "weight" atau tidak ada anomali).
+    keputusan: hasil catatan_tabel untuk seri ini; jika ada, deteksi tidak diulang.
+    """
+    mode = mode or MODE
+    metode = metode or METODE
+    if mode == "off":
+        return None, None
+    x = np.asarray(x).ravel()
+    if keputusan is None:
+        mask, skor = deteksi(x, y, metode=metode)
+        keputusan = _keputusan(mode, metode, x[mask], skor[mask])
+    else:
+        keputusan = {**keputusan, "mode": mode}
+        mask = np.isin(x, keputusan["tahun"])
+    weights = bobot(mask) if mode == "weight" and mask.any() else None
+    return keputusan, weights
+
+def periksa_tabel(df, targets, group_by=None, metode=None):
+    """
+    Anomali semua target (dan kelompok) satu tabel sekaligus: data dipivot menjadi
+    matriks tahun x seri lalu dideteksi dalam satu panggilan.
+    Hasil: DataFrame (target, kelompok, id_tahun, nilai, skor) untuk tahun yang ditandai.
+    """
+    wide = df.groupby(["id_tahun", group_by])[targets].mean().unstack(group_by) if group_by \
+        else df.groupby("id_tahun")[targets].mean()
+    if wide.empty:
+        return pd.DataFrame(columns=["target", "kelompok", "id_tahun", "nilai", "skor"])
+    Y = wide.to_numpy(dtype=float)
+    mask, skor = deteksi(wide.index.to_numpy(), Y, metode=metode)
+    # Seri dengan tahun kosong di matriks dideteksi sendiri (selisih antar tahun yang ada)
+    for k in np.flatnonzero(np.isnan(Y).any(axis=0)):
+        ada = ~np.isnan(Y[:, k])
+        mask[:, k], skor[:, k] = False, 0.0
+        if ada.any():
+            mask[ada, k], skor[ada, k] = deteksi(wide.index.to_numpy()[ada], Y[ada, k], metode=metode)
+    baris, kolom = np.nonzero(mask)
+    labels = list(wide.columns)
+    return pd.DataFrame({
+        "target": [labels[k][0] if group_by else labels[k] for k in kolom],
+        "kelompok": [labels[k][1] if group_by else None for k in kolom],
+        "id_tahun": wide.index.to_numpy()[baris],
+        "nilai": Y[baris, kolom],
+        "skor": skor[baris, kolom].round(2),
+    })
+
+def catatan_tabel(df, targets, group_by=None, mode=None, metode=None):
+    """
+    Keputusan anomali semua seri satu tabel dari satu panggilan periksa_tabel,
+    dengan kunci seperti model_store.train_table_models (target atau (kelompok, target)).
+    Diteruskan ke training lewat catatan(..., keputusan=...). None jika mode "off".
+    """
+    mode = mode or MODE
+    metode = metode or METODE
+    if mode == "off":
+        return None
+    groups = df[group_by].unique() if group_by else [None]
+    hasil = {((group, target) if group_by else target): ([], []) for group in groups for target in targets}
+    for row in periksa_tabel(df, targets, group_by, metode=metode).itertuples():
+        tahun, skor = hasil[(row.kelompok, row.target) if group_by else row.target]
+        tahun.append(row.id_tahun)
+        skor.append(row.skor)
+    return {key: _keputusan(mode, metode, tahun, skor) for key, (tahun, skor) in hasil.items()}
@@ -0,0 +1,165 @@
+"""
+API JSON prediksi tanpa Streamlit (ASGI).
+
+    uvicorn api:app --workers 2            # http://localhost:8000/forecast/penduduk_tahunan/jumlah_penduduk?horizon=3
+    python benchmarks/load_api.py          # uji beban lokal
+
+Endpoint:
+    GET /health
+    GET /forecast/{table}/{target}?horizon=3[&group=0-14]
+    GET /indicators?start=2018&end=2023[&columns=jumlah_penduduk,pct_jumlah_penduduk]
+
+Data diambil lewat model.fetch_data (cache Arrow per proses, satu klien Supabase
+dengan connection pool bersama). Prediksi dibaca dari artefak memory-mapped
+(artefak.py) yang dipakai bersama semua worker; model_store hanya dipakai jika
+artefaknya belum ada atau datanya berubah. Respons memakai ETag dari
+artefak.versi_model (fingerprint data, engine, parameter tuning dan mode
+anomali) sehingga tuning ulang atau ganti engine juga mengubah ETag; If-None-Match yang cocok dibalas 304 tanpa body. Perubahan data
+dari aplikasi Streamlit sampai ke cache proses ini lewat log audit (audit.py).
+"""
+import os
+import json
+import asyncio
+import hashlib
+from urllib.parse import parse_qs
+from concurrent.futures import ThreadPoolExecutor
+
+from audit import sinkronkan
+from logging_setup import get_logger
+
+logger = get_logger("api")
+
+MAX_HORIZON = 50
+# Fetch & training bersifat blocking; dijalankan di pool thread terbatas agar event loop tetap responsif
+_executor = ThreadPoolExecutor(max_workers=int(os.getenv("SIDAREJA_API_THREADS", "8")), thread_name_prefix="api")
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+def _forecast(table, target, horizon, group):
+    """Prediksi `horizon` tahun ke depan; dijalankan di thread pool"""
+    from model import fetch_data
+    from model_store import MODEL_SPECS, FEATURE_COLUMNS, data_fingerprint
+    from artefak import prakiraan_atau_latih, versi_model
+
+    spec = next((s for s in MODEL_SPECS.values() if s["table"] == table), None)
+    if spec is None:
+        raise HttpError(404, f"Unknown table: {table}")
+    if target not in spec["targets"]:
+        raise HttpError(404, f"Unknown target for {table}: {target}")
+
+    group_by = spec.get("group_by")
+    columns = spec["targets"] + ([group_by] if group_by else [])
+    df = fetch_data(table, FEATURE_COLUMNS, columns)
+    if group_by:
+        if group is None:
+            raise HttpError(400, f"Query parameter 'group' is required for {table}")
+        df = df[df[group_by].astype(str) == group]
+        if len(df) < 3:
+            raise HttpError(404, f"Not enough data for group {group}")
+    df = df.sort_values(FEATURE_COLUMNS[0])
+
+    versi = versi_model(table, target, group if group_by else None, data_fingerprint(df, FEATURE_COLUMNS + [target]))
+    etag = '"' + hashlib.sha1(f"{versi}|{table}|{target}|{group}|{horizon}".encode()).hexdigest()[:20] + '"'
+
+    def body():
+        hasil = prakiraan_atau_latih(table, target, df, group if group_by else None, horizon)
+        return {
+            "table": table,
+            "target": target,
+            "group": group,
+            "last_year": int(df[FEATURE_COLUMNS[0]].max()),
+            "engine": hasil["engine"],
+            "metrics": {"mae": hasil["mae"], "mape": hasil["mape"], "r2": hasil["r2"]},
+            "forecast": [{"id_tahun": int(y), "value": round(float(v), 2)} for y, v in zip(hasil["years"], hasil["forecast"])],
+        }
+
+    return etag, body
+
+def _indicators(start, end, columns):
+    """Rentang baris tabel indikator (indikator.py) sebagai list of dict"""
+    from indikator import baca, kolom_tersedia
+
+    unknown = [col for col in columns if col not in kolom_tersedia()]
+    if unknown:
+        raise HttpError(400, f"Unknown columns: {', '.join(unknown)}")
+    df = baca(start, end, columns or None)
+    return {"rows": json.loads(df.to_json(orient="records"))}
+
+async def _send_json(send, status, payload=None, headers=()):
+    body = b"" if payload is None else json.dumps(payload, default=float).encode("utf-8")
+    base = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    await send({"type": "http.response.start", "status": status, "headers": base + list(headers)})
+    await send({"type": "http.response.body", "body": body})
+
+async def app(scope, receive, send):
+    """Aplikasi ASGI minimal (tanpa framework) untuk /health dan /forecast"""
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                sinkronkan()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                _executor.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    if scope["type"] != "http":
+        return
+
+    parts = [p for p in scope["path"].split("/") if p]
+    if scope["method"] not in ("GET", "HEAD"):
+        return await _send_json(send, 405, {"error": "Method not allowed"})
+
+    if parts == ["health"]:
+        from model_store import is_ready
+        return await _send_json(send, 200, {"status": "ok", "models_ready": is_ready()})
+
+    query = parse_qs(scope.get("query_string", b"").decode())
+    loop = asyncio.get_running_loop()
+
+    if parts == ["indicators"]:
+        try:
+            start = int(query["start"][0]) if "start" in query else None
+            end = int(query["end"][0]) if "end" in query else None
+        except ValueError:
+            return await _send_json(send, 400, {"error": "start and end must be integers"})
+        columns = [col for col in query.get("columns", [""])[0].split(",") if col]
+        try:
+            payload = await loop.run_in_executor(_executor, _indicators, start, end, columns)
+            return await _send_json(send, 200, payload)
+        except HttpError as e:
+            return await _send_json(send, e.status, {"error": e.message})
+        except Exception as e:
+            logger.error("api_error", extra={"table": "indikator", "error": str(e)})
+            return await _send_json(send, 500, {"error": "Internal server error"})
+
+    if len(parts) != 3 or parts[0] != "forecast":
+        return await _send_json(send, 404, {"error": "Not found"})
+
+    try:
+        horizon = int(query.get("horizon", ["3"])[0])
+        if not 1 <= horizon <= MAX_HORIZON:
+            raise ValueError
+    except ValueError:
+        return await _send_json(send, 400, {"error": f"horizon must be an integer between 1 and {MAX_HORIZON}"})
+    group = query.get("group", [None])[0]
+
+    try:
+        etag, body = await loop.run_in_executor(_executor, _forecast, parts[1], parts[2], horizon, group)
+        headers = [(b"etag", etag.encode()), (b"cache-control", b"no-cache")]
+        if_none_match = dict(scope["headers"]).get(b"if-none-match", b"").decode()
+        if etag in [tag.strip() for tag in if_none_match.split(",")]:
+            return await _send_json(send, 304, headers=headers)
+        if scope["method"] == "HEAD":
+            return await _send_json(send, 200, headers=headers)
+        payload = await loop.run_in_executor(_executor, body)
+        return await _send_json(send, 200, payload, headers=headers)
+    except HttpError as e:
+        return await _send_json(send, e.status, {"error": e.message})
+    except Exception as e:
+        logger.error("api_error", extra={"table": parts[1], "target": parts[2], "error": str(e)})
+        return await _send_json(send, 500, {"error": "Internal server error"})
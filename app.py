@@ -2,15 +2,28 @@ import streamlit as st
 st.set_page_config(page_title="Sidareja Predict")
 
 from streamlit_option_menu import option_menu
-from halaman import data_jumlah_penduduk, data_kepala_keluarga, data_putus_sekolah, data_migrasi, data_status_perkawinan, data_penduduk_usia, login_page, ui_dashboard, ui_kepala_keluarga, ui_migrasi, ui_penduduk_usia, ui_status_perkawinan, ui_putus_sekolah, konfirmasi_akun
+from halaman import data_jumlah_penduduk, data_kepala_keluarga, data_putus_sekolah, data_migrasi, data_status_perkawinan, data_penduduk_usia, login_page, ui_dashboard, ui_ringkasan, ui_kepala_keluarga, ui_migrasi, ui_penduduk_usia, ui_status_perkawinan, ui_putus_sekolah, konfirmasi_akun, jumlah_penduduk_desa, kepadatan_penduduk, performa, kelahiran_kematian, skenario, piramida_penduduk
 from auth import is_authenticated, get_current_user, logout
+from instrumentasi import render
+from warmup import start_background_warmup
+from audit import sinkronkan
+
+@st.cache_resource
+def warmup_models():
+    """Mulai warmup model sekali per proses server (jika belum dijalankan lewat `python warmup.py`)"""
+    return start_background_warmup()
+
+@st.cache_resource
+def sinkronkan_perubahan():
+    """Ikuti log audit sekali per proses agar cache ikut berubah saat worker lain menulis data"""
+    return sinkronkan()
 
 def show_unauthenticated_menu():
     with st.sidebar:
         app = option_menu(
             menu_title='',
-            options=['Dashboard', 'Penduduk Berdasarkan Usia', 'Keluarga', 'Migrasi', 'Status Perkawinan', 'Putus Sekolah', 'Login'],
-            icons=['speedometer2', 'diagram-3', 'people-fill', 'arrow-left-right', 'heart-fill', 'book', 'box-arrow-in-right'],
+            options=['Dashboard', 'Ringkasan', 'Penduduk Berdasarkan Usia', 'Piramida Penduduk', 'Kelahiran & Kematian', 'Simulasi Skenario', 'Penduduk per Desa', 'Kepadatan Penduduk', 'Keluarga', 'Migrasi', 'Status Perkawinan', 'Putus Sekolah', 'Login'],
+            icons=['speedometer2', 'grid-3x3-gap', 'diagram-3', 'bar-chart-steps', 'activity', 'shuffle', 'house-fill', 'geo-alt-fill', 'people-fill', 'arrow-left-right', 'heart-fill', 'book', 'box-arrow-in-right'],
             menu_icon='chat-text-fill',
             default_index=0,
             styles={
@@ -20,20 +33,33 @@ def show_unauthenticated_menu():
                 "nav-link-selected": {"background-color": "grey", "font-weight": "normal"},
             }
         )
-    if app == "Dashboard":
-        ui_dashboard.app()
-    elif app == "Penduduk Berdasarkan Usia":
-        ui_penduduk_usia.app()
-    elif app == "Keluarga":
-        ui_kepala_keluarga.app()
-    elif app == "Migrasi":
-        ui_migrasi.app()
-    elif app == "Status Perkawinan":
-        ui_status_perkawinan.app()
-    elif app == "Putus Sekolah":
-        ui_putus_sekolah.app()
-    elif app == "Login":
-        login_page.app()
+    with render(app):
+        if app == "Dashboard":
+            ui_dashboard.app()
+        elif app == "Ringkasan":
+            ui_ringkasan.app()
+        elif app == "Penduduk Berdasarkan Usia":
+            ui_penduduk_usia.app()
+        elif app == "Piramida Penduduk":
+            piramida_penduduk.app()
+        elif app == "Kelahiran & Kematian":
+            kelahiran_kematian.app()
+        elif app == "Simulasi Skenario":
+            skenario.app()
+        elif app == "Penduduk per Desa":
+            jumlah_penduduk_desa.app()
+        elif app == "Kepadatan Penduduk":
+            kepadatan_penduduk.app()
+        elif app == "Keluarga":
+            ui_kepala_keluarga.app()
+        elif app == "Migrasi":
+            ui_migrasi.app()
+        elif app == "Status Perkawinan":
+            ui_status_perkawinan.app()
+        elif app == "Putus Sekolah":
+            ui_putus_sekolah.app()
+        elif app == "Login":
+            login_page.app()
 
 def show_authenticated_menu():
     # Tampilkan informasi user yang sedang login
@@ -50,7 +76,8 @@ def show_authenticated_menu():
             'Data Jumlah Migrasi', 
             'Data Status Perkawinan', 
             'Data Putus Sekolah',
-            'Data Penduduk Berdasarkan Usia'
+            'Data Penduduk Berdasarkan Usia',
+            'Performance'
         ]
         icons = [
             'people-fill',
@@ -58,7 +85,8 @@ def show_authenticated_menu():
             'arrow-left-right',
             'heart-fill',
             'book',
-            'graph-up'
+            'graph-up',
+            'stopwatch'
         ]
         
         # Tambahkan menu konfirmasi jika user adalah superadmin
@@ -84,26 +112,31 @@ def show_authenticated_menu():
         )
 
     # Navigasi menu
-    if app == 'Konfirmasi Akun' and role == "superadmin":
-        konfirmasi_akun.app()
-    elif app == 'Logout':
-        logout()
-        st.rerun()
-    if app == 'Data Jumlah Penduduk':
-        data_jumlah_penduduk.app()
-    elif app == 'Data Jumlah Kepala Keluarga':
-        data_kepala_keluarga.app()
-    elif app == 'Data Jumlah Migrasi':
-        data_migrasi.app()
-    elif app == 'Data Status Perkawinan':
-        data_status_perkawinan.app()
-    elif app == 'Data Putus Sekolah':
-        data_putus_sekolah.app()
-    elif app == 'Data Penduduk Berdasarkan Usia':
-        data_penduduk_usia.app()
+    with render(app):
+        if app == 'Konfirmasi Akun' and role == "superadmin":
+            konfirmasi_akun.app()
+        elif app == 'Logout':
+            logout()
+            st.rerun()
+        if app == 'Data Jumlah Penduduk':
+            data_jumlah_penduduk.app()
+        elif app == 'Data Jumlah Kepala Keluarga':
+            data_kepala_keluarga.app()
+        elif app == 'Data Jumlah Migrasi':
+            data_migrasi.app()
+        elif app == 'Data Status Perkawinan':
+            data_status_perkawinan.app()
+        elif app == 'Data Putus Sekolah':
+            data_putus_sekolah.app()
+        elif app == 'Data Penduduk Berdasarkan Usia':
+            data_penduduk_usia.app()
+        elif app == 'Performance':
+            performa.app()
 
 
 def main():
+    warmup_models()
+    sinkronkan_perubahan()
     if is_authenticated():
         show_authenticated_menu()
     else:
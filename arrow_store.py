@@ -0,0 +1,183 @@
+import io
+import os
+import hashlib
+import time
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
+
+import model
+import snapshot
+from instrumentasi import timed, span
+from logging_setup import get_logger
+from perubahan import subscribe
+
+logger = get_logger("arrow_store")
+
+# Cache tabel Arrow bersama semua sesi dalam satu proses; tabel Arrow immutable
+# sehingga aman dibagi antar thread tanpa salinan.
+_tables = {}        # table -> (waktu ambil, pa.Table, id snapshot)
+_dari_supabase = set()  # tabel yang sudah pernah diambil/di-invalidate (None = semua); berikutnya selalu ke Supabase
+_lock = threading.Lock()
+# Umur maksimum salinan Arrow (detik); penulisan lewat halaman data_* langsung membuang cache
+TTL = float(os.getenv("SIDAREJA_ARROW_TTL", "300"))
+
+def _decode(table_name):
+    """
+    Ambil isi tabel langsung sebagai Arrow: minta respons CSV dari PostgREST dan
+    parse dengan pyarrow (tanpa list of dict Python). Jika klien tidak mendukung
+    CSV, baris JSON diubah ke Arrow tanpa melewati pandas.
+    """
+    query = model.supabase.table(table_name).select("*")
+    if hasattr(query, "csv"):
+        try:
+            text = query.csv().execute().data
+            if text:
+                return pacsv.read_csv(io.BytesIO(text.encode("utf-8") if isinstance(text, str) else text))
+        except Exception as e:
+            logger.warning("arrow_csv_fallback", extra={"table": table_name, "error": str(e)})
+        query = model.supabase.table(table_name).select("*")
+    return pa.Table.from_pylist(query.execute().data or [])
+
+def _sumber():
+    """Identitas database sumber, agar snapshot dari database lain tidak dipakai"""
+    return hashlib.sha1(str(model.SUPABASE_URL).encode()).hexdigest()[:12]
+
+def _audit_terakhir():
+    """id terakhir log audit di Supabase, atau None jika tidak bisa dibaca"""
+    from audit import id_terakhir
+    try:
+        return id_terakhir(model.supabase)
+    except Exception as e:
+        logger.warning("audit_id_error", extra={"error": str(e)})
+        return None
+
+def _snapshot_segar(table_name):
+    """
+    Saat proses baru start, snapshot terakhir yang umurnya < TTL dipakai langsung
+    (memory-mapped) sehingga worker yang start bersamaan tidak mengambil ulang tabel
+    yang sama. Snapshot hanya dipakai jika dibuat dari database yang sama dan log
+    audit belum bertambah sejak snapshot diambil (satu query id, bukan seluruh
+    tabel); perubahan langsung di database tanpa log audit baru terlihat setelah TTL.
+    """
+    items = snapshot.riwayat(table_name)
+    if not items or time.time() - items[-1]["ts"] >= TTL:
+        return None, None
+    item = items[-1]
+    if item.get("sumber") != _sumber() or item.get("audit_id") is None \
+            or _audit_terakhir() != item["audit_id"]:
+        return None, None
+    try:
+        return snapshot.muat(item["id"]), item["id"]
+    except Exception as e:
+        logger.warning("snapshot_load_error", extra={"table": table_name, "error": str(e)})
+        return None, None
+
+def _ambil(table_name):
+    with _lock:
+        pertama = table_name not in _dari_supabase and None not in _dari_supabase
+        _dari_supabase.add(table_name)
+    if pertama:
+        table, snapshot_id = _snapshot_segar(table_name)
+        if table is not None:
+            return table, snapshot_id
+    audit_id = _audit_terakhir()   # sebelum decode: perubahan sesudahnya menaikkan id
+    table = _decode(table_name)
+    try:
+        snapshot_id = snapshot.simpan(table_name, table, sumber=_sumber(), audit_id=audit_id)
+    except Exception as e:
+        logger.warning("snapshot_save_error", extra={"table": table_name, "error": str(e)})
+        snapshot_id = None
+    return table, snapshot_id
+
+@timed("fetch_arrow", tag_args=("table_name",))
+def get_table(table_name, columns=None):
+    """Tabel Arrow dari cache (atau Supabase jika belum ada); `columns` memilih kolom tanpa menyalin"""
+    with _lock:
+        cached = _tables.get(table_name)
+    if cached is not None and time.monotonic() - cached[0] < TTL:
+        table = cached[1]
+    else:
+        table, snapshot_id = _ambil(table_name)
+        with _lock:
+            _tables[table_name] = (time.monotonic(), table, snapshot_id)
+        logger.info("fetch", extra={"table": table_name, "rows": table.num_rows, "snapshot": snapshot_id})
+    return table.select(columns) if columns else table
+
+def snapshot_id(table_name):
+    """Id snapshot isi tabel yang sedang di-cache (None jika belum diambil)"""
+    with _lock:
+        cached = _tables.get(table_name)
+    return cached[2] if cached is not None else None
+
+def to_pandas(table):
+    """
+    DataFrame dari tabel Arrow; kolom numerik tanpa null dipakai ulang bukan
+    disalin per baris (split_blocks) sehingga konversinya murah.
+    """
+    return table.to_pandas(split_blocks=True, self_destruct=False)
+
+def persen_perubahan(table, columns, names):
+    """
+    Tambah kolom % perubahan dari baris sebelumnya (tabel sudah urut tahun).
+    Dihitung dengan numpy di atas buffer Arrow, hasilnya kolom Arrow baru.
+    """
+    for column, name in zip(columns, names):
+        values = table.column(column).to_numpy().astype(float)
+        change = np.full(len(values), np.nan)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            change[1:] = (values[1:] - values[:-1]) / values[:-1] * 100
+        table = table.append_column(name, pa.array(change, from_pandas=True))
+    return table
+
+def invalidate(table_name=None):
+    with _lock:
+        if table_name is None:
+            _dari_supabase.add(None)   # semua tabel
+            _tables.clear()
+        else:
+            _dari_supabase.add(table_name)
+            _tables.pop(table_name, None)
+
+@subscribe
+def _invalidate_on_write(table, op, rows):
+    """Tulis ke tabel apa pun membuang salinan Arrow-nya"""
+    invalidate(table)
+
+@contextmanager
+def ukur_render(stage, **tags):
+    """
+    Ukur waktu dan puncak memori sebuah blok render (misal st.dataframe) sebagai span.
+    Memori Python diukur dengan tracemalloc (hanya selama blok ini),
+    memori Arrow dari selisih alokasi memory pool pyarrow.
+    """
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    arrow_before = pa.total_allocated_bytes()
+    with span(stage, **tags) as extra:
+        try:
+            yield extra
+        finally:
+            _, peak = tracemalloc.get_traced_memory()
+            if started:
+                tracemalloc.stop()
+            extra["peak_kb"] = round(peak / 1024, 1)
+            extra["arrow_kb"] = round((pa.total_allocated_bytes() - arrow_before) / 1024, 1)
+            logger.info(stage, extra=extra)
+
+def tampilkan_tabel(table, column_config=None, name=None, **kwargs):
+    """
+    Kirim tabel Arrow langsung ke st.dataframe (Streamlit memakai Arrow sebagai
+    format kirim sehingga tidak ada konversi pandas atau string di sisi kita).
+    Format angka diatur lewat column_config, bukan dengan mengubah kolom jadi string.
+    """
+    import streamlit as st
+
+    with ukur_render("render_table", table=name, rows=table.num_rows):
+        st.dataframe(table, column_config=column_config, **kwargs)
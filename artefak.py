@@ -0,0 +1,261 @@
+"""
+Artefak model dan prediksi dalam format .npy yang dibaca memory-mapped oleh semua worker.
+
+Model yang bisa ditulis sebagai rumus tertutup (SVR linear, tren linear, Holt,
+CAGR) disimpan sebagai satu baris array terstruktur: koefisien, parameter
+scaler, metrik backtest dan fingerprint data. Prediksi HORIZON tahun ke depan
+disimpan di array kedua yang sejajar. Kedua file dibuka dengan mmap_mode="r",
+sehingga halaman di page cache OS dipakai bersama semua proses (Streamlit dengan
+beberapa worker, uvicorn --workers) dan pencarian seri memakai searchsorted
+pada kolom kunci yang terurut: memori per worker tidak bertambah dengan jumlah seri.
+
+Baris hanya dipakai jika versinya (versi_model: fingerprint data, engine,
+parameter tuning dan mode anomali) sama dengan saat ini; selain itu pemanggil kembali ke model_store.get_model lalu menulis baris baru lewat tulis().
+
+    ARTEFAK_DIR/CURRENT             # nama versi aktif
+    ARTEFAK_DIR/.lock               # flock penulis (tulis() dari beberapa proses)
+    ARTEFAK_DIR/<versi>/model.npy
+    ARTEFAK_DIR/<versi>/prakiraan.npy
+"""
+import os
+import json
+import shutil
+import hashlib
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:     # Windows: hanya kunci antar thread
+    fcntl = None
+
+from logging_setup import get_logger
+
+logger = get_logger("artefak")
+
+ARTEFAK_DIR = os.getenv("SIDAREJA_ARTIFACT_DIR", os.path.join("cache", "artefak"))
+HORIZON = 10        # tahun prediksi yang disimpan per seri
+SIMPAN_VERSI = 3    # versi lama yang dipertahankan (worker mungkin masih memetakannya)
+CEK_INTERVAL = 1.0  # detik antar pemeriksaan file CURRENT
+
+LINEAR, MAJEMUK = 0, 1  # intercept + slope * tahun | nilai_dasar * (1 + rate) ** (tahun - tahun_dasar)
+
+DTYPE = np.dtype([
+    ("kunci", "S96"), ("fingerprint", "S20"), ("engine", "S8"), ("jenis", "u1"),
+    ("slope", "f8"), ("intercept", "f8"), ("rate", "f8"), ("tahun_dasar", "f8"), ("nilai_dasar", "f8"),
+    ("scaler_mean", "f8"), ("scaler_scale", "f8"),
+    ("mae", "f8"), ("mape", "f8"), ("r2", "f8"),
+    ("tahun_akhir", "i4"),
+])
+
+_state = {"versi": None, "dicek": 0.0, "model": None, "prakiraan": None}
+_lock = threading.Lock()
+_tulis_lock = threading.Lock()
+
+def kunci(table, target, group=None):
+    return f"{table}|{'-' if group is None else group}|{target}".encode("utf-8")
+
+def versi_model(table, target, group, fingerprint):
+    """
+    Versi prediksi satu seri: fingerprint data ditambah semua yang mengubah model
+    tanpa mengubah data (engine, parameter tuning, mode & metode anomali)
+    """
+    from model_store import ENGINE
+    from tuning import stored_params
+    import anomali
+
+    params = json.dumps(stored_params(table, target, group), sort_keys=True, default=str)
+    isi = f"{fingerprint}|{ENGINE}|{params}|{anomali.MODE}|{anomali.METODE}|{anomali.AMBANG}"
+    return hashlib.sha1(isi.encode()).hexdigest()[:20]
+
+def _metrik(value):
+    return float(value) if value is not None and np.isfinite(value) else np.nan
+
+def rekam(table, target, group, fingerprint, result, last_year):
+    """
+    Baris artefak dari hasil get_model (model, mae, mape, r2), atau None jika
+    modelnya tidak bisa ditulis sebagai rumus (misal SVR kernel RBF).
+    """
+    from model import linear_coefficients
+
+    model, mae, mape, r2 = result
+    engine = getattr(model, "engine_", "svr")
+    row = np.zeros((), dtype=DTYPE)
+    row["kunci"] = kunci(table, target, group)
+    row["fingerprint"] = fingerprint.encode("ascii")
+    row["engine"] = engine.encode("ascii")
+    row["mae"], row["mape"], row["r2"] = _metrik(mae), _metrik(mape), _metrik(r2)
+    row["tahun_akhir"] = last_year
+    row["scaler_scale"] = 1.0
+
+    if engine == "svr":
+        steps = getattr(model, "named_steps", {})
+        if set(steps) != {"scaler", "svr"} or steps["svr"].kernel != "linear" or steps["scaler"].n_features_in_ != 1:
+            return None
+        row["slope"], row["intercept"] = linear_coefficients(model)
+        row["scaler_mean"], row["scaler_scale"] = steps["scaler"].mean_[0], steps["scaler"].scale_[0]
+    elif engine == "linear" and model.single_:
+        row["slope"], row["intercept"] = model.slope_[0], model.intercept_[0]
+    elif engine == "holt" and model.single_:
+        row["slope"] = model.trend_[0]
+        row["intercept"] = model.level_[0] - model.trend_[0] * model.last_year_
+    elif engine == "cagr" and model.single_:
+        row["jenis"] = MAJEMUK
+        row["rate"], row["tahun_dasar"], row["nilai_dasar"] = model.rate_[0], model.last_year_, model.last_value_[0]
+    else:
+        return None
+    return row
+
+def prediksi(rows, years):
+    """
+    Nilai prediksi (baris x tahun) dari koefisien artefak, vektor untuk banyak seri sekaligus.
+    years: (tahun,) untuk semua baris atau (baris, tahun) per baris.
+    """
+    rows = np.atleast_1d(rows)
+    years = np.atleast_2d(np.asarray(years, dtype=float))
+    linear = rows["intercept"][:, None] + rows["slope"][:, None] * years
+    majemuk = rows["nilai_dasar"][:, None] * (1.0 + rows["rate"][:, None]) ** (years - rows["tahun_dasar"][:, None])
+    return np.where((rows["jenis"] == MAJEMUK)[:, None], majemuk, linear)
+
+def _versi_aktif():
+    try:
+        with open(os.path.join(ARTEFAK_DIR, "CURRENT"), encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+def baca():
+    """(model, prakiraan) versi aktif sebagai array memory-mapped; (None, None) jika belum ada"""
+    now = time.monotonic()
+    with _lock:
+        if now - _state["dicek"] < CEK_INTERVAL:
+            return _state["model"], _state["prakiraan"]
+        _state["dicek"] = now
+        versi = _versi_aktif()
+        if versi != _state["versi"]:
+            try:
+                folder = os.path.join(ARTEFAK_DIR, versi) if versi else None
+                _state["model"] = np.load(os.path.join(folder, "model.npy"), mmap_mode="r") if folder else None
+                _state["prakiraan"] = np.load(os.path.join(folder, "prakiraan.npy"), mmap_mode="r") if folder else None
+                _state["versi"] = versi
+            except Exception as e:
+                logger.warning("artifact_load_error", extra={"error": str(e)})
+        return _state["model"], _state["prakiraan"]
+
+def _cari(models, table, target, group, fingerprint):
+    if models is None or len(models) == 0:
+        return None
+    key = kunci(table, target, group)
+    i = int(np.searchsorted(models["kunci"], key))
+    if i < len(models) and models["kunci"][i] == key and models["fingerprint"][i] == fingerprint.encode("ascii"):
+        return i
+    return None
+
+def prakiraan(table, target, group, fingerprint, horizon):
+    """
+    Prediksi `horizon` tahun setelah tahun data terakhir tanpa memuat model:
+    dict (years, forecast, engine, mae, mape, r2) atau None jika artefak tidak ada/usang.
+    """
+    models, forecasts = baca()
+    i = _cari(models, table, target, group, fingerprint)
+    if i is None:
+        return None
+    row = models[i]
+    last_year = int(row["tahun_akhir"])
+    years = np.arange(last_year + 1, last_year + horizon + 1)
+    values = np.array(forecasts[i, :horizon]) if horizon <= forecasts.shape[1] else prediksi(row, years)[0]
+    metrik = {name: (None if np.isnan(row[name]) else float(row[name])) for name in ("mae", "mape", "r2")}
+    return {"years": years, "forecast": values, "engine": row["engine"].decode("ascii"), **metrik}
+
+@contextmanager
+def _kunci_penulis():
+    """Kunci lintas proses selama baca-gabung-ganti versi aktif (flock pada ARTEFAK_DIR/.lock)"""
+    os.makedirs(ARTEFAK_DIR, exist_ok=True)
+    with _tulis_lock, open(os.path.join(ARTEFAK_DIR, ".lock"), "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+def tulis(rows):
+    """
+    Gabungkan baris baru dengan versi aktif (kunci yang sama diganti) lalu tulis
+    sebagai versi baru; CURRENT diganti atomik sehingga pembaca tidak melihat file setengah jadi.
+    Penulis dari beberapa proses (worker uvicorn, warmup) diserialkan dengan flock,
+    sehingga tidak ada yang menggabung dari versi lama lalu menimpa baris penulis lain.
+    """
+    rows = [row for row in rows if row is not None]
+    if not rows:
+        return None
+    baru = np.array(rows, dtype=DTYPE)
+    with _kunci_penulis():
+        aktif = _versi_aktif()
+        if aktif is not None:
+            lama = np.load(os.path.join(ARTEFAK_DIR, aktif, "model.npy"))
+            lama = lama[~np.isin(lama["kunci"], baru["kunci"])]
+            baru = np.concatenate([lama, baru])
+        # kunci yang sama di batch baru: ambil yang terakhir
+        _, idx = np.unique(baru["kunci"][::-1], return_index=True)
+        semua = baru[::-1][idx]                 # np.unique mengembalikan kunci terurut
+        forecasts = prediksi(semua, semua["tahun_akhir"][:, None] + np.arange(1, HORIZON + 1))
+
+        versi = f"{time.time_ns():x}-{os.getpid()}"
+        folder = os.path.join(ARTEFAK_DIR, versi)
+        os.makedirs(folder, exist_ok=True)
+        np.save(os.path.join(folder, "model.npy"), semua)
+        np.save(os.path.join(folder, "prakiraan.npy"), forecasts)
+        tmp = os.path.join(ARTEFAK_DIR, f"CURRENT.{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(versi)
+        os.replace(tmp, os.path.join(ARTEFAK_DIR, "CURRENT"))
+        _bersihkan(versi)
+    with _lock:
+        _state["dicek"] = 0.0
+    logger.info("artifact_write", extra={"rows": len(semua)})
+    return versi
+
+def _bersihkan(aktif):
+    versi = sorted((d for d in os.listdir(ARTEFAK_DIR) if os.path.isdir(os.path.join(ARTEFAK_DIR, d))),
+                   key=lambda d: os.path.getmtime(os.path.join(ARTEFAK_DIR, d)))
+    for lama in [d for d in versi if d != aktif][:-SIMPAN_VERSI or None]:
+        shutil.rmtree(os.path.join(ARTEFAK_DIR, lama), ignore_errors=True)
+
+def prakiraan_atau_latih(table, target, data, group, horizon):
+    """
+    Prediksi seri dari artefak; jika belum ada atau datanya berubah, dari
+    model_store.get_model lalu barisnya ditulis agar worker lain tidak perlu memuat model.
+    """
+    from model_store import FEATURE_COLUMNS, get_model, data_fingerprint
+
+    fingerprint = versi_model(table, target, group, data_fingerprint(data, FEATURE_COLUMNS + [target]))
+    hasil = prakiraan(table, target, group, fingerprint, horizon)
+    if hasil is not None:
+        return hasil
+    result = get_model(table, target, data, group=group)
+    last_year = int(data[FEATURE_COLUMNS[0]].max())
+    try:
+        tulis([rekam(table, target, group, fingerprint, result, last_year)])
+    except Exception as e:
+        logger.warning("artifact_write_error", extra={"table": table, "target": target, "error": str(e)})
+    model, mae, mape, r2 = result
+    years = np.arange(last_year + 1, last_year + horizon + 1)
+    return {"years": years, "forecast": model.predict(years.reshape(-1, 1)),
+            "engine": getattr(model, "engine_", "svr"), "mae": mae, "mape": mape, "r2": r2}
+
+def dari_tabel(table, data, targets, group_by, models):
+    """Baris artefak untuk hasil model_store.train_table_models (dipakai warmup)"""
+    from model_store import FEATURE_COLUMNS, data_fingerprint
+
+    rows = []
+    for key, result in models.items():
+        group, target = key if group_by else (None, key)
+        part = data if group is None else data[data[group_by] == group]
+        fingerprint = versi_model(table, target, group, data_fingerprint(part, FEATURE_COLUMNS + [target]))
+        rows.append(rekam(table, target, group, fingerprint, result, int(part[FEATURE_COLUMNS[0]].max())))
+    return rows
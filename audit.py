@@ -0,0 +1,256 @@
+"""
+Log perubahan append-only (audit + change data capture) untuk semua penulisan data_* dan crud.py.
+
+Setiap publish() di perubahan.py mencatat satu entri per baris yang berubah
+(tabel, kunci, nilai lama/baru, pengguna, waktu) ke buffer di memori. Buffer
+dikirim ke tabel audit_log (sql/audit_log.sql) dengan satu insert per batch oleh
+thread latar, sehingga penulisan data tidak menunggu log.
+
+Proses lain (worker Streamlit lain, api.py) membaca log secara inkremental lewat
+tail(sejak_id) / ikuti(), bukan dengan membaca ulang tabel penuh. sinkronkan()
+meneruskan entri dari proses lain ke subscriber perubahan.py, jadi cache Arrow,
+tabel indikator dan update model inkremental ikut diperbarui.
+
+id audit_log (bigserial) diambil saat insert, bukan saat commit: transaksi yang
+commit belakangan bisa muncul dengan id lebih kecil dari entri yang sudah dibaca.
+Karena itu ikuti() selalu membaca ulang jendela OVERLAP id terakhir dan
+melewati id yang sudah diproses.
+
+Entri yang masih di buffer (paling lama FLUSH_INTERVAL detik / BATCH_SIZE entri,
+atau sampai MAX_BUFFER selama Supabase tidak bisa dihubungi) hilang jika proses
+mati mendadak; atexit hanya berjalan pada exit normal. SIDAREJA_AUDIT_FLUSH=0
+menulis log secara sinkron di setiap catat() sehingga jendela ini tertutup,
+dengan biaya satu insert per penulisan data.
+
+    python audit.py                 # 50 entri terakhir
+    python audit.py --tabel migrasi --sejak 120
+"""
+import argparse
+import atexit
+import os
+import socket
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+from logging_setup import get_logger
+
+logger = get_logger("audit")
+
+TABLE = "audit_log"
+BATCH_SIZE = int(os.getenv("SIDAREJA_AUDIT_BATCH", "100"))
+# Interval (detik) flush buffer oleh thread latar; 0 = flush sinkron di catat()
+FLUSH_INTERVAL = float(os.getenv("SIDAREJA_AUDIT_FLUSH", "1.0"))
+# Interval (detik) membaca log untuk perubahan dari proses lain; 0 = tidak disinkronkan
+SYNC_INTERVAL = float(os.getenv("SIDAREJA_AUDIT_SYNC", "5"))
+MAX_BUFFER = 10_000
+# Jumlah id terakhir yang dibaca ulang setiap tail, untuk entri yang commit tidak berurutan
+OVERLAP = int(os.getenv("SIDAREJA_AUDIT_OVERLAP", "1000"))
+
+# Kolom kunci per tabel (selain tabel ini: id_tahun); kolom yang tidak ada di baris dilewati
+KUNCI = {
+    "penduduk_usia": ["id_tahun", "kategori_usia"],
+    "users": ["id", "id_admin"],
+}
+RAHASIA = {"password"}
+
+# Identitas proses ini, untuk melewati entri milik sendiri saat sinkronisasi
+SUMBER = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+_buffer = []
+_lock = threading.Lock()
+_wake = threading.Event()
+_state = {"flusher": None, "pengikut": None}
+
+def _client():
+    from model import supabase
+    return supabase
+
+def _pengguna():
+    """Username login Streamlit bila dipanggil dari sesi halaman, selain itu nama proses"""
+    if "streamlit" in sys.modules:
+        try:
+            import streamlit as st
+            username = st.session_state.get("username")
+            if username:
+                return username
+        except Exception:
+            pass
+    return os.getenv("SIDAREJA_AUDIT_USER", "sistem")
+
+def _bersihkan(row):
+    if row is None:
+        return None
+    return {k: ("***" if k in RAHASIA else v) for k, v in row.items()}
+
+def kolom_kunci(table):
+    return KUNCI.get(table, ["id_tahun"])
+
+def sebelum(client, table, row):
+    """Nilai lama satu baris (dict) berdasarkan kolom kuncinya; None jika tidak ditemukan"""
+    query = client.table(table).select("*")
+    for col in kolom_kunci(table):
+        if col in row:
+            query = query.eq(col, row[col])
+    data = query.execute().data
+    return data[0] if data else None
+
+def catat(table, op, rows, old=None, user=None):
+    """
+    Tambahkan entri log ke buffer (dipanggil dari perubahan.publish).
+    old: list nilai lama sejajar dengan rows (None untuk insert atau jika tidak diketahui).
+    """
+    old = list(old or [])
+    old += [None] * (len(rows) - len(old))
+    user = user or _pengguna()
+    ts = datetime.now(timezone.utc).isoformat()
+    keys = kolom_kunci(table)
+    entries = []
+    for row, lama in zip(rows, old):
+        kunci = {col: row[col] for col in keys if col in row}
+        baru = None if op == "delete" else {k: v for k, v in row.items() if k not in kunci}
+        entries.append({
+            "ts": ts, "tabel": table, "op": op, "kunci": kunci,
+            "lama": _bersihkan(lama), "baru": _bersihkan(baru),
+            "pengguna": user, "sumber": SUMBER,
+        })
+    with _lock:
+        _buffer.extend(entries)
+        penuh = len(_buffer) >= BATCH_SIZE
+    if FLUSH_INTERVAL <= 0:
+        flush()
+        return entries
+    _mulai_flusher()
+    if penuh:
+        _wake.set()
+    return entries
+
+def flush():
+    """Kirim isi buffer ke audit_log dalam batch; entri dikembalikan ke buffer jika gagal"""
+    with _lock:
+        batch = _buffer[:]
+        _buffer.clear()
+    sent = 0
+    for i in range(0, len(batch), BATCH_SIZE):
+        chunk = batch[i:i + BATCH_SIZE]
+        try:
+            _client().table(TABLE).insert(chunk).execute()
+            sent += len(chunk)
+        except Exception as e:
+            logger.warning("audit_write_error", extra={"rows": len(batch) - sent, "error": str(e)})
+            with _lock:
+                _buffer[:0] = batch[sent:]
+                dropped = len(_buffer) - MAX_BUFFER
+                if dropped > 0:
+                    del _buffer[:dropped]
+                    logger.error("audit_dropped", extra={"rows": dropped})
+            break
+    return sent
+
+def _loop_flush():
+    while True:
+        _wake.wait(FLUSH_INTERVAL)
+        _wake.clear()
+        if _buffer:
+            flush()
+
+def _mulai_flusher():
+    with _lock:
+        if _state["flusher"] is None:
+            _state["flusher"] = threading.Thread(target=_loop_flush, daemon=True, name="audit-flush")
+            _state["flusher"].start()
+
+atexit.register(flush)
+
+def tail(sejak_id=0, limit=500, tabel=None, client=None):
+    """Entri dengan id > sejak_id, urut id (untuk konsumsi inkremental)"""
+    query = (client or _client()).table(TABLE).select("*").gt("id", sejak_id)
+    if tabel:
+        query = query.eq("tabel", tabel)
+    return query.order("id").limit(limit).execute().data or []
+
+def id_terakhir(client=None):
+    data = (client or _client()).table(TABLE).select("id").order("id", desc=True).limit(1).execute().data
+    return data[0]["id"] if data else 0
+
+def entri_baru(last, dilihat, limit=500, client=None):
+    """
+    Entri yang belum ada di `dilihat` mulai dari id last - OVERLAP, urut id.
+    dilihat (set id) diperbarui di tempat dan dipangkas ke jendela OVERLAP;
+    mengembalikan (entries, id terbesar yang sudah dibaca).
+    """
+    cursor, baru = max(last - OVERLAP, 0), []
+    while True:
+        page = tail(cursor, limit=limit, client=client)
+        baru += [entry for entry in page if entry["id"] not in dilihat]
+        if len(page) < limit:
+            break
+        cursor = page[-1]["id"]
+    dilihat.update(entry["id"] for entry in baru)
+    last = max([last] + [entry["id"] for entry in baru])
+    for lama in [i for i in dilihat if i <= last - OVERLAP]:
+        dilihat.discard(lama)
+    return baru, last
+
+def ikuti(callback, sejak_id=None, interval=SYNC_INTERVAL, client=None):
+    """
+    Panggil callback(entries) untuk setiap batch entri baru di audit_log, di thread latar.
+    sejak_id None = mulai dari entri terbaru (riwayat lama tidak diputar ulang).
+    Entri yang commit terlambat dengan id lebih kecil tetap dikirim, tepat sekali.
+    """
+    def loop():
+        last, dilihat = sejak_id, set()
+        while True:
+            try:
+                if last is None:
+                    # Jendela overlap saat mulai hanya ditandai sudah dilihat, tidak diputar ulang
+                    _, last = entri_baru(id_terakhir(client), dilihat, client=client)
+                entries, last = entri_baru(last, dilihat, client=client)
+                if entries:
+                    callback(entries)
+            except Exception as e:
+                logger.warning("audit_tail_error", extra={"error": str(e)})
+            time.sleep(interval)
+
+    thread = threading.Thread(target=loop, daemon=True, name="audit-tail")
+    thread.start()
+    return thread
+
+def _teruskan(entries):
+    """Entri dari proses lain -> subscriber perubahan.py, dikelompokkan per (tabel, op) berurutan"""
+    from perubahan import kirim
+
+    group, rows = None, []
+    for entry in entries:
+        if entry.get("sumber") == SUMBER:
+            continue
+        key = (entry["tabel"], entry["op"])
+        if key != group and rows:
+            kirim(*group, rows)
+            rows = []
+        group = key
+        rows.append({**entry["kunci"], **(entry.get("baru") or {})})
+    if rows:
+        kirim(*group, rows)
+
+def sinkronkan(interval=SYNC_INTERVAL):
+    """Mulai (sekali per proses) meneruskan perubahan dari proses lain ke cache lokal"""
+    with _lock:
+        if interval <= 0 or _state["pengikut"] is not None:
+            return _state["pengikut"]
+        _state["pengikut"] = ikuti(_teruskan, interval=interval)
+    return _state["pengikut"]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tampilkan log perubahan data")
+    parser.add_argument("--tabel", default=None)
+    parser.add_argument("--sejak", type=int, default=None, help="Tampilkan entri dengan id lebih besar dari ini")
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+
+    sejak = args.sejak if args.sejak is not None else max(id_terakhir() - args.limit, 0)
+    for entry in tail(sejak, limit=args.limit, tabel=args.tabel):
+        print(f"{entry['id']:>8} {entry['ts']} {entry['pengguna'] or '-':<12} {entry['tabel']:<18} "
+              f"{entry['op']:<6} {entry['kunci']} {entry.get('lama')} -> {entry.get('baru')}")
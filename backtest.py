@@ -0,0 +1,93 @@
+import os
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
+
+HORIZONS = (1, 2, 3)  # halaman menampilkan prediksi 1-3 tahun ke depan
+# Jumlah proses untuk fold backtest; 0 = otomatis (pool hanya jika total baris latih >= POOL_MIN_ROWS)
+N_JOBS = int(os.getenv("SIDAREJA_BACKTEST_JOBS", "0"))
+# Origin terakhir yang diuji, sehingga jumlah fit per training tetap walau seri panjang
+MAX_FOLDS = int(os.getenv("SIDAREJA_BACKTEST_FOLDS", "8"))
+POOL_MIN_ROWS = 5_000  # di bawah ini overhead pool proses lebih besar dari waktu fit
+
+def time_series_splits(n, mode="expanding", min_train=3, window=None, horizon=max(HORIZONS), max_folds=None):
+    """
+    Split rolling-origin atas data yang sudah urut tahun, untuk `max_folds` origin terakhir.
+    expanding: data latih selalu dari tahun pertama sampai origin
+    sliding:   data latih hanya `window` tahun terakhir sebelum origin
+    Data uji = `horizon` tahun setelah origin (tidak pernah ada tahun masa depan di data latih).
+    """
+    if mode not in ("expanding", "sliding"):
+        raise ValueError(f"Unknown backtest mode: {mode}")
+    window = window or min_train
+    max_folds = max_folds or MAX_FOLDS
+    for origin in range(max(min_train, n - max_folds), n):
+        start = 0 if mode == "expanding" else max(0, origin - window)
+        yield np.arange(start, origin), np.arange(origin, min(origin + horizon, n))
+
+def _fit_predict(model, X, y, train_idx, test_idx):
+    fitted = clone(model).fit(X[train_idx], y[train_idx])
+    return test_idx, fitted.predict(X[test_idx])
+
+def _jumlah_proses(splits, n_jobs):
+    if n_jobs or N_JOBS:
+        return n_jobs or N_JOBS
+    return -1 if len(splits) > 1 and sum(len(train) for train, _ in splits) >= POOL_MIN_ROWS else 1
+
+def backtest(model, X, y, mode="expanding", min_train=None, window=None, horizons=HORIZONS, n_jobs=None):
+    """
+    Backtest time-series: fold dilatih di pool proses bila n_jobs > 1, atau
+    otomatis bila data latihnya cukup besar (lihat _jumlah_proses).
+    Mengembalikan metrik gabungan (mae, mape, r2 out-of-sample) dan metrik per horizon.
+    """
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y, dtype=float)
+    order = np.argsort(X[:, 0], kind="stable")
+    X, y = X[order], y[order]
+    n = len(y)
+    if min_train is None:
+        min_train = max(2, min(3, n - 1))
+
+    splits = list(time_series_splits(n, mode, min_train, window, max(horizons)))
+    if not splits:
+        nan = float("nan")
+        return {"mae": nan, "mape": nan, "r2": nan, "mae_std": nan, "folds": 0, "horizons": {}}
+
+    results = Parallel(n_jobs=_jumlah_proses(splits, n_jobs))(
+        delayed(_fit_predict)(model, X, y, train_idx, test_idx) for train_idx, test_idx in splits
+    )
+
+    # Susun error per (fold, horizon) dalam satu array
+    steps = np.concatenate([np.arange(1, len(test_idx) + 1) for test_idx, _ in results])
+    actual = np.concatenate([y[test_idx] for test_idx, _ in results])
+    predicted = np.concatenate([pred for _, pred in results])
+    keep = np.isin(steps, horizons)
+    steps, actual, predicted = steps[keep], actual[keep], predicted[keep]
+
+    abs_err = np.abs(actual - predicted)
+    pct_err = abs_err / np.maximum(np.abs(actual), np.finfo(float).eps) * 100
+
+    def r2(a, p):
+        ss_tot = ((a - a.mean()) ** 2).sum()
+        return float(1 - ((a - p) ** 2).sum() / ss_tot) if len(a) > 1 and ss_tot > 0 else float("nan")
+
+    per_horizon = {}
+    for h in horizons:
+        mask = steps == h
+        if mask.any():
+            per_horizon[h] = {
+                "mae": float(abs_err[mask].mean()),
+                "mape": float(pct_err[mask].mean()),
+                "r2": r2(actual[mask], predicted[mask]),
+                "n": int(mask.sum())
+            }
+
+    return {
+        "mae": float(abs_err.mean()),
+        "mape": float(pct_err.mean()),
+        "r2": r2(actual, predicted),
+        "mae_std": float(abs_err.std()),
+        "folds": len(splits),
+        "mode": mode,
+        "horizons": per_horizon
+    }
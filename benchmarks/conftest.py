@@ -0,0 +1,156 @@
+import sys
+import os
+import csv
+import io
+import time
+import numpy as np
+import pytest
+
+# Jalankan dari root repo sehingga `model`, `halaman`, dst. bisa diimport
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+SIZES = [10, 100, 1_000, 10_000, 100_000, 1_000_000]
+
+# SVR (libsvm) berskala kuadratik terhadap jumlah baris, jadi ukuran training dibatasi
+TRAIN_SIZES = [10, 100, 1_000, 5_000]
+
+class StubResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+class StubQuery:
+    """Pengganti query builder Supabase yang mengembalikan baris lokal (opsional dengan latensi jaringan)"""
+    def __init__(self, rows, latency=0.0):
+        self.rows = rows
+        self.latency = latency
+
+    def select(self, *args, **kwargs):
+        return self
+
+    def eq(self, *args, **kwargs):
+        return self
+
+    def gt(self, *args, **kwargs):
+        return self
+
+    def limit(self, *args, **kwargs):
+        return self
+
+    def insert(self, rows):
+        if self.latency:
+            time.sleep(self.latency)
+        self.rows.extend(rows if isinstance(rows, list) else [rows])
+        return self
+
+    def order(self, *args, **kwargs):
+        return self
+
+    def range(self, start, end):
+        return StubQuery(self.rows[start:end + 1], self.latency)
+
+    def csv(self):
+        return StubCsvQuery(self.rows)
+
+    def execute(self):
+        if self.latency:
+            time.sleep(self.latency)
+        return StubResponse(self.rows, count=len(self.rows))
+
+class StubCsvQuery:
+    """Respons PostgREST dengan header Accept: text/csv"""
+    def __init__(self, rows):
+        self.rows = rows
+
+    def execute(self):
+        if not self.rows:
+            return StubResponse("")
+        out = io.StringIO()
+        writer = csv.DictWriter(out, fieldnames=list(self.rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(self.rows)
+        return StubResponse(out.getvalue())
+
+class StubSupabase:
+    def __init__(self, tables, latency=0.0):
+        self.tables = tables
+        self.latency = latency
+
+    def table(self, name):
+        return StubQuery(self.tables.setdefault(name, []), self.latency)
+
+def synthetic_series(n, columns=("jumlah_penduduk",), start=58000.0, growth=600.0, seed=0, start_year=2015):
+    """Seri tahunan sintetis (tren linear + noise) sebagai list of dict ala respons Supabase"""
+    rng = np.random.default_rng(seed)
+    years = np.arange(n) + start_year
+    data = {"id_tahun": years}
+    for i, col in enumerate(columns):
+        base = start / (i + 1)
+        data[col] = np.round(base + growth * np.arange(n) + rng.normal(0, growth / 2, n))
+    keys = list(data.keys())
+    return [dict(zip(keys, row)) for row in zip(*(data[k].tolist() for k in keys))]
+
+def page_tables(n_years=9):
+    """Tabel sintetis dengan kolom yang dipakai keenam halaman ui_*"""
+    tables = {
+        "penduduk_tahunan": synthetic_series(n_years, ("jumlah_penduduk", "laki_laki", "perempuan")),
+        "keluarga": synthetic_series(n_years, ("jumlah_kepala_keluarga", "pria", "wanita"), start=18000, growth=300),
+        "migrasi": synthetic_series(n_years, ("migrasi_masuk", "migrasi_keluar"), start=900, growth=20),
+        "status_perkawinan": synthetic_series(n_years, ("status_kawin", "cerai_hidup"), start=30000, growth=200),
+        "putus_sekolah": synthetic_series(n_years, ("jumlah_putus_sekolah",), start=6000, growth=100),
+    }
+    # Kolom total konsisten dengan bagiannya (aturan validasi.jumlah)
+    for row in tables["penduduk_tahunan"]:
+        row["jumlah_penduduk"] = row["laki_laki"] + row["perempuan"]
+    for row in tables["keluarga"]:
+        row["jumlah_kepala_keluarga"] = row["pria"] + row["wanita"]
+    usia = []
+    for i, kategori in enumerate(["0-14", "15-60", "60+"]):
+        for row in synthetic_series(n_years, ("laki_laki", "perempuan"), start=15000 / (i + 1), growth=50, seed=i):
+            row["kategori_usia"] = kategori
+            row["total"] = row["laki_laki"] + row["perempuan"]
+            usia.append(row)
+    tables["penduduk_usia"] = usia
+    return tables
+
+@pytest.fixture(autouse=True)
+def cache_sementara(tmp_path, monkeypatch):
+    """
+    Arahkan semua direktori cache aplikasi ke tmp_path dan kosongkan cache di memori,
+    sehingga data sintetis benchmark tidak pernah masuk ke cache/ milik aplikasi
+    """
+    import snapshot, model_store, artefak, indikator, tuning, fitur
+    from arrow_store import invalidate
+
+    cache = tmp_path / "cache"
+    monkeypatch.setattr(snapshot, "SNAPSHOT_DIR", str(cache / "snapshots"))
+    monkeypatch.setattr(snapshot, "_terakhir", {})
+    monkeypatch.setattr(model_store, "STORE_DIR", str(cache / "models"))
+    monkeypatch.setattr(model_store, "READY_FILE", str(cache / "models" / "READY.json"))
+    for name in ("_memory", "_tables", "_fingerprints", "_scaler_stats", "_engines"):
+        monkeypatch.setattr(model_store, name, {})
+    monkeypatch.setattr(artefak, "ARTEFAK_DIR", str(cache / "artefak"))
+    monkeypatch.setattr(artefak, "_state", {"versi": None, "dicek": 0.0, "model": None, "prakiraan": None})
+    monkeypatch.setattr(indikator, "STORE_FILE", str(cache / "indikator.feather"))
+    monkeypatch.setattr(indikator, "_state", {"table": None, "years": None, "kotor": False, "versi": 0})
+    monkeypatch.setattr(tuning, "PARAMS_FILE", str(cache / "params.json"))
+    monkeypatch.setattr(tuning, "_params", None)
+    fitur._cache.clear()
+    invalidate()
+    return cache
+
+@pytest.fixture
+def stub_supabase(monkeypatch, cache_sementara):
+    """Ganti koneksi Supabase di model.py dengan stub lokal (cache di tmp_path, lihat cache_sementara)"""
+    import model
+
+    def install(tables):
+        from arrow_store import invalidate
+        stub = StubSupabase(tables)
+        monkeypatch.setattr(model, "supabase", stub)
+        invalidate()
+        return stub
+
+    return install
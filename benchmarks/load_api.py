@@ -0,0 +1,91 @@
+"""
+Uji beban API prediksi (api.py).
+
+    uvicorn api:app --port 8000 &
+    python benchmarks/load_api.py --url http://127.0.0.1:8000 --requests 5000 --concurrency 50
+
+    # tanpa Supabase: jalankan API di proses ini dengan data sintetis
+    python benchmarks/load_api.py --stub
+
+Separuh request mengirim If-None-Match dengan ETag terakhir sehingga jalur 304 ikut terukur.
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import threading
+
+import httpx
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+PATHS = [
+    "/forecast/penduduk_tahunan/jumlah_penduduk?horizon=3",
+    "/forecast/penduduk_tahunan/laki_laki?horizon=10",
+    "/forecast/migrasi/migrasi_masuk?horizon=3",
+    "/forecast/keluarga/jumlah_kepala_keluarga?horizon=5",
+    "/forecast/penduduk_usia/total?horizon=3&group=0-14",
+]
+
+def start_stub_server(port):
+    """Jalankan api.app dengan Supabase stub (data sintetis) di thread latar"""
+    import uvicorn
+    import model
+    from conftest import StubSupabase, page_tables
+
+    model.supabase = StubSupabase(page_tables())
+    from api import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}"
+
+async def run(url, total, concurrency):
+    latencies = []
+    statuses = {}
+    etags = {}
+    counter = iter(range(total))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        # Pemanasan: latih model sekali sebelum pengukuran
+        for path in PATHS:
+            response = await client.get(path)
+            etags[path] = response.headers.get("etag")
+
+        async def worker():
+            for i in counter:
+                path = PATHS[i % len(PATHS)]
+                headers = {"If-None-Match": etags[path]} if i % 2 and etags.get(path) else {}
+                start = time.perf_counter()
+                response = await client.get(path, headers=headers)
+                latencies.append((time.perf_counter() - start) * 1000)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies = np.array(latencies)
+    print(f"{total} request, concurrency {concurrency}: {total / elapsed:,.0f} req/s")
+    print(f"latency ms  p50={np.percentile(latencies, 50):.2f}  p90={np.percentile(latencies, 90):.2f}  "
+          f"p99={np.percentile(latencies, 99):.2f}  max={latencies.max():.2f}")
+    print(f"status {dict(sorted(statuses.items()))}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Uji beban API prediksi Sidareja")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--stub", action="store_true", help="Jalankan API lokal dengan data sintetis")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    url = start_stub_server(args.port) if args.stub else args.url
+    asyncio.run(run(url, args.requests, args.concurrency))
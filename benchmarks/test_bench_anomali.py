@@ -0,0 +1,48 @@
+"""
+Benchmark dan uji deteksi anomali per seri dan per tabel berkelompok.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from conftest import synthetic_series
+
+@pytest.mark.parametrize("metode", ["mad", "hampel"])
+@pytest.mark.parametrize("n_series", [1, 100, 10_000], ids=lambda n: f"series={n}")
+def test_deteksi_anomali(benchmark, metode, n_series):
+    """Deteksi anomali 10 tahun x banyak seri dalam satu panggilan; satu tahun per seri disisipi lonjakan"""
+    from anomali import deteksi
+    rng = np.random.default_rng(0)
+    years = np.arange(2015, 2025)
+    Y = 50_000 + 500 * (years - 2015)[:, None] + rng.normal(0, 50, (len(years), n_series))
+    Y[5] += 5_000
+    mask, _ = benchmark(deteksi, years, Y, metode=metode)
+    assert mask[5].mean() > 0.9
+
+@pytest.mark.parametrize("metode", ["mad", "hampel"])
+def test_anomali_tren_lurus(metode):
+    """Tren lurus sempurna (MAD nol) dengan satu tahun salah ketik: hanya tahun itu yang ditandai"""
+    from anomali import deteksi
+    years = np.arange(2015, 2024)
+    y = 100.0 + (years - 2015)
+    y[3] = 200.0
+    mask, _ = deteksi(years, y, metode=metode)
+    assert years[mask].tolist() == [2018]
+
+@pytest.mark.parametrize("n_groups", [3, 300], ids=lambda n: f"groups={n}")
+def test_catatan_tabel(benchmark, n_groups):
+    """Anomali seluruh tabel berkelompok dalam satu deteksi, sama dengan deteksi per seri"""
+    from anomali import catatan, catatan_tabel
+    df = pd.concat([
+        pd.DataFrame(synthetic_series(9, ("laki_laki", "perempuan"), seed=g)).assign(kategori_usia=f"g{g}")
+        for g in range(n_groups)
+    ], ignore_index=True)
+    df.loc[df["id_tahun"] == 2019, "laki_laki"] *= 1.5
+    hasil = benchmark(catatan_tabel, df, ["laki_laki", "perempuan"], "kategori_usia", mode="flag")
+    assert len(hasil) == n_groups * 2
+    for (group, target), keputusan in list(hasil.items())[:6]:
+        part = df[df["kategori_usia"] == group]
+        assert keputusan["tahun"] == catatan(part["id_tahun"].values, part[target].values, mode="flag")[0]["tahun"]
+    assert all(2019 in hasil[(f"g{g}", "laki_laki")]["tahun"] for g in range(n_groups))
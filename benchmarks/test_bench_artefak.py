@@ -0,0 +1,61 @@
+"""
+Benchmark dan uji artefak model memory-mapped: pencarian seri, penulis
+bersamaan dan versi artefak.
+"""
+import numpy as np
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+@pytest.mark.parametrize("n_series", [10, 10_000, 1_000_000], ids=lambda n: f"series={n}")
+def test_artefak_prakiraan(benchmark, tmp_path, monkeypatch, n_series):
+    """Cari satu seri di artefak memory-mapped: searchsorted pada kunci, tanpa dict per worker"""
+    import artefak
+    monkeypatch.setattr(artefak, "ARTEFAK_DIR", str(tmp_path))
+    monkeypatch.setitem(artefak._state, "versi", None)
+    monkeypatch.setitem(artefak._state, "dicek", 0.0)
+    rows = np.zeros(n_series, dtype=artefak.DTYPE)
+    rows["kunci"] = [artefak.kunci("penduduk_tahunan", f"seri_{i}") for i in range(n_series)]
+    rows["fingerprint"] = b"0" * 20
+    rows["engine"] = b"linear"
+    rows["slope"], rows["intercept"], rows["tahun_akhir"] = 600.0, -1_150_000.0, 2023
+    artefak.tulis(list(rows))
+
+    hasil = benchmark(artefak.prakiraan, "penduduk_tahunan", f"seri_{n_series // 2}", None, "0" * 20, 3)
+    assert list(hasil["years"]) == [2024, 2025, 2026]
+    assert isinstance(artefak.baca()[0], np.memmap)
+
+def _tulis_seri(direktori, awal, n):
+    import artefak
+    artefak.ARTEFAK_DIR = direktori
+    for i in range(awal, awal + n):
+        row = np.zeros((), dtype=artefak.DTYPE)
+        row["kunci"] = artefak.kunci("penduduk_tahunan", f"seri_{i}")
+        row["tahun_akhir"] = 2023
+        artefak.tulis([row])
+
+def test_artefak_tulis_bersamaan(tmp_path, monkeypatch):
+    """Beberapa proses menulis bersamaan: tidak ada baris yang hilang karena merge dari versi lama"""
+    import multiprocessing
+    import artefak
+    monkeypatch.setattr(artefak, "ARTEFAK_DIR", str(tmp_path))
+    monkeypatch.setitem(artefak._state, "dicek", 0.0)
+    ctx = multiprocessing.get_context("fork")
+    procs = [ctx.Process(target=_tulis_seri, args=(str(tmp_path), p * 20, 20)) for p in range(4)]
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join()
+    assert all(proc.exitcode == 0 for proc in procs)
+    assert len(artefak.baca()[0]) == 80
+
+def test_versi_model(monkeypatch):
+    """Versi artefak/ETag berubah bila engine atau mode anomali berubah walau datanya sama"""
+    import artefak, anomali, model_store
+    awal = artefak.versi_model("penduduk_tahunan", "jumlah_penduduk", None, "0" * 20)
+    assert len(awal) == 20
+    monkeypatch.setattr(model_store, "ENGINE", "linear")
+    engine = artefak.versi_model("penduduk_tahunan", "jumlah_penduduk", None, "0" * 20)
+    monkeypatch.setattr(anomali, "MODE", "weight")
+    mode = artefak.versi_model("penduduk_tahunan", "jumlah_penduduk", None, "0" * 20)
+    assert len({awal, engine, mode}) == 3
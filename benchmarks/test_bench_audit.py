@@ -0,0 +1,43 @@
+"""
+Benchmark dan uji log audit: penulisan batch dan pembacaan inkremental.
+"""
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from conftest import StubSupabase
+
+LATENCY = 0.005  # per insert
+
+@pytest.mark.parametrize("n", [1, 100, 1_000], ids=lambda n: f"rows={n}")
+def test_audit_batch(benchmark, monkeypatch, n):
+    """Catat n perubahan lalu flush: satu insert per BATCH_SIZE entri, bukan per baris"""
+    import audit, model
+    stub = StubSupabase({}, latency=LATENCY)
+    monkeypatch.setattr(model, "supabase", stub)
+    monkeypatch.setitem(audit._state, "flusher", "off")   # flush hanya dari benchmark ini
+    rows = [{"id_tahun": 2000 + i, "jumlah_penduduk": 60_000 + i} for i in range(n)]
+
+    def run():
+        audit.catat("penduduk_tahunan", "update", rows, user="bench")
+        return audit.flush()
+
+    assert benchmark.pedantic(run, rounds=3, iterations=1) == n
+    assert stub.tables[audit.TABLE] and len(stub.tables[audit.TABLE]) % n == 0
+    if benchmark.stats:
+        batches = -(-n // audit.BATCH_SIZE)
+        assert benchmark.stats.stats.mean < batches * LATENCY + 0.1
+
+def test_audit_commit_terlambat(monkeypatch):
+    """id yang commit belakangan (lebih kecil dari id terakhir yang dibaca) tetap dikirim tepat sekali"""
+    import audit
+    log = [{"id": i} for i in (1, 2, 4)]
+    monkeypatch.setattr(audit, "tail", lambda sejak, limit=500, client=None:
+                        sorted((e for e in log if e["id"] > sejak), key=lambda e: e["id"])[:limit])
+    dilihat = set()
+    entries, last = audit.entri_baru(0, dilihat)
+    assert [e["id"] for e in entries] == [1, 2, 4] and last == 4
+    log += [{"id": 3}, {"id": 5}]
+    entries, last = audit.entri_baru(last, dilihat, limit=2)
+    assert [e["id"] for e in entries] == [3, 5] and last == 5
+    assert audit.entri_baru(last, dilihat)[0] == []
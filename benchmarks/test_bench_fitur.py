@@ -0,0 +1,24 @@
+"""
+Benchmark matriks fitur lintas tabel (lag per kolom indikator).
+"""
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from conftest import page_tables
+
+@pytest.mark.parametrize("n_years", [10, 100, 1_000], ids=lambda n: f"years={n}")
+def test_feature_matrix(benchmark, stub_supabase, tmp_path, monkeypatch, n_years):
+    """Matriks fitur lag 1-2 untuk 6 kolom: O(tahun x fitur), dibangun ulang tiap putaran"""
+    import indikator, fitur
+    monkeypatch.setattr(indikator, "STORE_FILE", str(tmp_path / "indikator.feather"))
+    stub_supabase(page_tables(n_years))
+    indikator.invalidate()
+    kolom = ["jumlah_penduduk", "migrasi_neto", "jumlah_kepala_keluarga", "status_kawin", "cerai_hidup", "usia_0_14_total"]
+
+    def build():
+        fitur._cache.clear()
+        return fitur.matriks(kolom, lags=(1, 2))
+
+    df = benchmark(build)
+    assert df.shape == (n_years, 1 + len(kolom) * 2)
@@ -0,0 +1,39 @@
+"""
+Uji tabel indikator: file di disk hanya dipakai bila id snapshot sumbernya sama,
+dan % perubahan halaman tetap terisi untuk tahun yang belum ada di tabel.
+"""
+import pandas as pd
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from conftest import page_tables
+
+def proses_baru(monkeypatch, stub_supabase, tables):
+    import arrow_store, indikator
+    stub_supabase(tables)
+    monkeypatch.setattr(arrow_store, "_dari_supabase", set())
+    monkeypatch.setattr(indikator, "_state", {"table": None, "years": None, "kotor": False, "versi": 0})
+
+def test_file_indikator_sesuai_sumber(stub_supabase, monkeypatch):
+    """File dari data yang sama dipakai tanpa dibangun ulang; file dari data lain dibangun ulang"""
+    import indikator
+    stub_supabase(page_tables(9))
+    assert len(indikator.baca()) == 9
+
+    proses_baru(monkeypatch, stub_supabase, page_tables(9))
+    with monkeypatch.context() as m:
+        m.setattr(indikator, "segarkan", lambda: pytest.fail("file yang masih berlaku dibangun ulang"))
+        assert len(indikator.baca()) == 9
+
+    proses_baru(monkeypatch, stub_supabase, {**page_tables(12), "audit_log": [{"id": 1}]})  # data berubah
+    assert len(indikator.baca()) == 12
+
+def test_tambah_perubahan_tahun_baru(stub_supabase):
+    """Tahun di df yang belum ada di tabel indikator memakai pct_change df sendiri"""
+    from indikator import tambah_perubahan
+    stub_supabase(page_tables(9))
+    df = pd.DataFrame(page_tables(10)["penduduk_tahunan"])
+    hasil = tambah_perubahan(df.copy(), {"jumlah_penduduk": "% Perubahan"})
+    assert hasil["% Perubahan"].iloc[1:].notna().all()
+    assert hasil["% Perubahan"].iloc[-1] == pytest.approx(df["jumlah_penduduk"].pct_change().iloc[-1] * 100)
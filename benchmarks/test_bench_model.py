@@ -0,0 +1,98 @@
+"""
+Benchmark hot path model: fetch_data, train_svm_model, predict_population
+dan training banyak seri desa sekaligus. Modul lain punya file
+test_bench_<modul>.py sendiri.
+
+    pytest benchmarks/ --benchmark-autosave
+    pytest benchmarks/ --benchmark-compare --benchmark-compare-fail=mean:20%
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from conftest import SIZES, TRAIN_SIZES, synthetic_series
+
+@pytest.fixture(scope="module", params=SIZES, ids=lambda n: f"rows={n}")
+def rows(request):
+    return synthetic_series(request.param)
+
+@pytest.fixture(scope="module", params=TRAIN_SIZES, ids=lambda n: f"rows={n}")
+def train_frame(request):
+    return pd.DataFrame(synthetic_series(request.param))
+
+@pytest.fixture(scope="module")
+def fitted_model():
+    from model import train_svm_model
+    df = pd.DataFrame(synthetic_series(9))
+    model, _, _, _ = train_svm_model(feature_columns=["id_tahun"], target_column="jumlah_penduduk", data=df)
+    return model
+
+def test_fetch_data(benchmark, stub_supabase, rows):
+    from model import fetch_data
+    from arrow_store import invalidate
+    stub_supabase({"penduduk_tahunan": rows})
+
+    def fetch_uncached():
+        invalidate("penduduk_tahunan")
+        return fetch_data("penduduk_tahunan", ["id_tahun"], ["jumlah_penduduk"])
+
+    df = benchmark(fetch_uncached)
+    assert len(df) == len(rows)
+
+def test_fetch_data_cached(benchmark, stub_supabase, rows):
+    from model import fetch_data
+    stub_supabase({"penduduk_tahunan": rows})
+    df = benchmark(fetch_data, "penduduk_tahunan", ["id_tahun"], ["jumlah_penduduk"])
+    assert len(df) == len(rows)
+
+def test_train_svm_model(benchmark, train_frame):
+    from model import train_svm_model
+    model, mae, mape, r2 = benchmark.pedantic(
+        train_svm_model,
+        kwargs={"feature_columns": ["id_tahun"], "target_column": "jumlah_penduduk", "data": train_frame},
+        rounds=3,
+        iterations=1
+    )
+    assert np.isfinite(mae)
+
+@pytest.mark.parametrize("n", SIZES, ids=lambda n: f"years={n}")
+def test_predict_population(benchmark, fitted_model, n):
+    from model import predict_population
+    years = np.arange(n, dtype=float) + 2024
+    predictions = benchmark(predict_population, years, fitted_model)
+    assert predictions.shape == (n,)
+
+@pytest.mark.parametrize("n_desa", [10, 100, 500], ids=lambda n: f"desa={n}")
+def test_batched_training(benchmark, n_desa):
+    from model_desa import latih_model_desa, prediksi_desa
+    rng = np.random.default_rng(0)
+    years = np.arange(2016, 2024)
+    df_desa = pd.DataFrame({
+        "id_desa": np.repeat(np.arange(1, n_desa + 1), len(years)),
+        "id_tahun": np.tile(years, n_desa),
+        "jumlah_penduduk": np.round(rng.uniform(3000, 9000, n_desa).repeat(len(years))
+                                    + np.tile(years - years[0], n_desa) * 80
+                                    + rng.normal(0, 40, n_desa * len(years)))
+    })
+    koef = benchmark.pedantic(latih_model_desa, args=(df_desa,), rounds=3, iterations=1)
+    assert len(prediksi_desa(koef, [2024, 2025, 2026])) == n_desa * 3
+
+def test_is_ready_kedaluwarsa(tmp_path, monkeypatch):
+    """READY.json tidak berlaku lagi setelah data tabel berubah atau versi store naik"""
+    import model_store
+    monkeypatch.setattr(model_store, "READY_FILE", str(tmp_path / "READY.json"))
+    monkeypatch.setattr(model_store, "STORE_DIR", str(tmp_path))
+    monkeypatch.setattr(model_store, "_tables", {})
+    df = pd.DataFrame(synthetic_series(9, ("laki_laki", "perempuan", "jumlah_penduduk")))
+    fingerprint = model_store.table_fingerprint("penduduk_tahunan", df)
+    model_store.mark_ready({"Dashboard": {"table": "penduduk_tahunan", "fingerprint": fingerprint}})
+    assert model_store.is_ready()
+    model_store._tables["penduduk_tahunan"] = df
+    assert model_store.is_ready()
+    model_store._tables["penduduk_tahunan"] = df.assign(jumlah_penduduk=df["jumlah_penduduk"] + 1)
+    assert not model_store.is_ready()
+    model_store._tables.clear()
+    monkeypatch.setattr(model_store, "STORE_VERSION", model_store.STORE_VERSION + 1)
+    assert not model_store.is_ready()
@@ -0,0 +1,26 @@
+"""
+Benchmark render halaman ui_* secara utuh memakai streamlit AppTest
+dengan data Supabase sintetis (tanpa akses jaringan).
+"""
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+pytest.importorskip("streamlit.testing.v1")
+
+from streamlit.testing.v1 import AppTest
+from conftest import page_tables
+
+PAGES = ["ui_dashboard", "ui_kepala_keluarga", "ui_migrasi", "ui_status_perkawinan", "ui_putus_sekolah", "ui_penduduk_usia", "kelahiran_kematian", "ui_ringkasan"]
+
+def render(page):
+    import streamlit as st
+    st.cache_data.clear()
+    at = AppTest.from_string(f"from halaman import {page}\n{page}.app()", default_timeout=60)
+    at.run()
+    return at
+
+@pytest.mark.parametrize("page", PAGES)
+def test_render_page(benchmark, stub_supabase, page):
+    stub_supabase(page_tables())
+    at = benchmark.pedantic(render, args=(page,), rounds=3, iterations=1)
+    assert not at.exception
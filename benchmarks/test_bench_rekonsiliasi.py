@@ -0,0 +1,102 @@
+"""
+Benchmark dan uji koherensi rekonsiliasi prediksi kecamatan: setelah
+rekonsiliasi, seri bawah (jenis kelamin, kelompok umur, desa) harus
+menjumlah tepat ke total kecamatan.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from conftest import synthetic_series, page_tables
+
+KELOMPOK = ["0-14", "15-60", "60+"]
+
+def base_forecasts(n_desa, tahun=3, seed=0):
+    """Prediksi dasar yang sengaja tidak koheren (setiap seri diberi noise sendiri)"""
+    rng = np.random.default_rng(seed)
+    noise = lambda level: level * (1 + rng.normal(0, 0.02, tahun))
+    pred_jk = {"jumlah_penduduk": noise(65_000.0), "laki_laki": noise(32_000.0), "perempuan": noise(32_500.0)}
+    pred_usia = {g: {"total": noise(v), "laki_laki": noise(v / 2), "perempuan": noise(v / 2)}
+                 for g, v in zip(KELOMPOK, (16_000.0, 42_000.0, 6_000.0))}
+    pred_desa = {f"Desa {i}": noise(65_000.0 / n_desa) for i in range(n_desa)}
+    return pred_jk, pred_usia, pred_desa
+
+def assert_koheren(hasil, desa=()):
+    total = hasil.loc["jumlah_penduduk"]
+    np.testing.assert_allclose(hasil.loc["laki_laki"] + hasil.loc["perempuan"], total, rtol=1e-9)
+    for kolom in ("total", "laki_laki", "perempuan"):
+        bawah = sum(hasil.loc[f"usia:{g}:{kolom}"] for g in KELOMPOK)
+        atas = total if kolom == "total" else hasil.loc[kolom]
+        np.testing.assert_allclose(bawah, atas, rtol=1e-9)
+    for g in KELOMPOK:
+        np.testing.assert_allclose(hasil.loc[f"usia:{g}:laki_laki"] + hasil.loc[f"usia:{g}:perempuan"],
+                                   hasil.loc[f"usia:{g}:total"], rtol=1e-9)
+    if len(desa):
+        np.testing.assert_allclose(sum(hasil.loc[f"desa:{d}"] for d in desa), total, rtol=1e-9)
+
+def test_summing_matrix():
+    """S = [A; I]: baris agregat menjumlah seri bawahnya, S @ bawah = semua seri"""
+    from rekonsiliasi import summing_matrix
+    S, names, bottom = summing_matrix({"total": ["a", "b", "c"], "ab": ["a", "b"]})
+    assert names == ["total", "ab", "a", "b", "c"] and bottom == ["a", "b", "c"]
+    np.testing.assert_array_equal(S @ np.array([1.0, 2.0, 4.0]), [7.0, 3.0, 1.0, 2.0, 4.0])
+
+def test_reconcile_memenuhi_summing_matrix():
+    """Setelah rekonsiliasi, seri di S (agregat + bawah) = S @ seri bawah hasil rekonsiliasi"""
+    from rekonsiliasi import summing_matrix, reconcile
+    hierarki = {"total": ["a", "b", "c"]}
+    S, names, bottom = summing_matrix(hierarki)
+    base = pd.DataFrame([[100.0, 110.0], [30.0, 31.0], [40.0, 42.0], [20.0, 25.0]], index=names)
+    hasil = reconcile(base, [hierarki], weights={"total": 4.0, "a": 1.0, "b": 1.0, "c": float("nan")})
+    np.testing.assert_allclose(S @ hasil.loc[bottom].to_numpy(), hasil.loc[names].to_numpy(), rtol=1e-12)
+
+@pytest.mark.parametrize("n_desa", [10, 100, 1_000], ids=lambda n: f"desa={n}")
+def test_rekonsiliasi_kecamatan(benchmark, n_desa):
+    """Jenis kelamin, kelompok umur dan desa direkonsiliasi dalam satu langkah (dengan bobot MAE²)"""
+    from rekonsiliasi import rekonsiliasi_kecamatan
+    pred_jk, pred_usia, pred_desa = base_forecasts(n_desa)
+    rng = np.random.default_rng(1)
+    mae = {name: float(rng.uniform(10, 500)) for name in ["jumlah_penduduk", "laki_laki", "perempuan"]}
+    mae.update({f"desa:{d}": float(rng.uniform(10, 100)) for d in pred_desa})
+    hasil = benchmark(rekonsiliasi_kecamatan, pred_jk, pred_usia, pred_desa, mae=mae)
+    assert_koheren(hasil, pred_desa)
+
+def test_prediksi_kecamatan(stub_supabase):
+    """Model penduduk_tahunan, penduduk_usia dan desa dari model store: angka ketiga halaman koheren"""
+    from rekonsiliasi import prediksi_kecamatan
+    stub_supabase(page_tables())
+    df_desa = pd.concat([
+        pd.DataFrame(synthetic_series(9, start=6000.0 + 500 * i, growth=60.0, seed=i)).assign(id_desa=i + 1, nama_desa=f"Desa {i}")
+        for i in range(5)
+    ], ignore_index=True)
+    hasil = prediksi_kecamatan(np.array([2024, 2025, 2026]), df_desa=df_desa)
+    assert list(hasil.columns) == [2024, 2025, 2026]
+    assert_koheren(hasil, [f"Desa {i}" for i in range(5)])
+
+def test_piramida_koheren(stub_supabase):
+    """Tahun prediksi piramida menjumlah ke total kecamatan yang sama dengan dashboard"""
+    pytest.importorskip("plotly")
+    from halaman.piramida_penduduk import piramida_dari_usia
+    from rekonsiliasi import prediksi_kecamatan
+    tables = page_tables()
+    stub_supabase(tables)
+    df_usia = pd.DataFrame(tables["penduduk_usia"])
+    data = piramida_dari_usia(df_usia, 3)
+    pred = data[data["Type"] == "Predicted"].groupby("id_tahun")[["laki_laki", "perempuan"]].sum().sum(axis=1)
+    total = prediksi_kecamatan(pred.index.to_numpy(), df_usia=df_usia).loc["jumlah_penduduk"]
+    np.testing.assert_allclose(pred.to_numpy(), total.to_numpy(), rtol=1e-9)
+
+def test_prediksi_kecamatan_kohort(stub_supabase):
+    """Proyeksi kohort sebagai prediksi dasar kelompok umur juga direkonsiliasi ke total dashboard"""
+    from kohort import proyeksi_kohort
+    from rekonsiliasi import prediksi_kecamatan
+    tables = page_tables()
+    stub_supabase(tables)
+    kohort_df, _ = proyeksi_kohort(pd.DataFrame(tables["penduduk_usia"]), horizon=3)
+    pred_kohort = {g: {col: part[col].to_numpy() for col in ("total", "laki_laki", "perempuan")}
+                   for g, part in kohort_df.groupby("kategori_usia")}
+    years = np.sort(kohort_df["id_tahun"].unique())
+    hasil = prediksi_kecamatan(years, df_desa=pd.DataFrame(), pred_usia=pred_kohort)
+    assert_koheren(hasil)
@@ -0,0 +1,33 @@
+"""
+Benchmark query repositori yang dijalankan bersamaan terhadap Supabase
+sintetis dengan latensi jaringan.
+"""
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from conftest import StubSupabase, page_tables
+
+LATENCY = 0.05
+
+def test_repositori_halaman(benchmark):
+    """Count + satu halaman dengan latensi 50 ms per query: bersamaan ~50 ms, bukan ~100 ms"""
+    from repositori import jalankan, halaman
+    client = StubSupabase({"penduduk_usia": page_tables()["penduduk_usia"]}, latency=LATENCY)
+    df, total = benchmark.pedantic(jalankan, setup=lambda: ((halaman("penduduk_usia", 2, client=client),), {}),
+                                   rounds=5, iterations=1)
+    assert len(df) == 10 and total == 27
+    if benchmark.stats:  # None dengan --benchmark-disable
+        assert benchmark.stats.stats.mean < 1.8 * LATENCY
+
+def test_repositori_ambil_banyak(benchmark):
+    """Enam tabel dashboard sekaligus: waktu mendekati satu query terlambat"""
+    from repositori import jalankan, ambil_banyak
+    tables = page_tables()
+    client = StubSupabase(tables, latency=LATENCY)
+    specs = {name: (name, "*") for name in tables}
+    frames = benchmark.pedantic(jalankan, setup=lambda: ((ambil_banyak(specs, client=client),), {}),
+                                rounds=5, iterations=1)
+    assert set(frames) == set(tables)
+    if benchmark.stats:  # None dengan --benchmark-disable
+        assert benchmark.stats.stats.mean < 3 * LATENCY
@@ -0,0 +1,33 @@
+"""
+Benchmark simulasi skenario Monte Carlo proyeksi kohort dan kesamaannya
+dengan proyeksi deterministik.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from conftest import synthetic_series
+
+@pytest.mark.parametrize("paths", [1000, 10000], ids=lambda n: f"paths={n}")
+def test_simulasi_skenario(benchmark, paths):
+    from simulasi import simulasi_skenario
+    usia = []
+    for i, kategori in enumerate(["0-14", "15-60", "60+"]):
+        for row in synthetic_series(9, ("laki_laki", "perempuan"), start=15000 / (i + 1), growth=50, seed=i):
+            usia.append({**row, "kategori_usia": kategori})
+    migrasi = pd.DataFrame(synthetic_series(9, ("migrasi_masuk", "migrasi_keluar"), start=900, growth=20))
+    years, hasil = benchmark(simulasi_skenario, pd.DataFrame(usia), migrasi, tahun=30, paths=paths)
+    assert hasil.shape == (paths, 30, 6)
+
+def test_simulasi_tanpa_guncangan(monkeypatch):
+    """Tanpa volatilitas setiap jalur simulasi sama dengan proyeksi kohort deterministik"""
+    import simulasi, kohort
+    monkeypatch.setattr(simulasi, "VOLATILITAS_FERTILITAS", 0.0)
+    monkeypatch.setattr(simulasi, "VOLATILITAS_MORTALITAS", 0.0)
+    state, naik = np.array([8000.0, 20000.0, 3000.0, 7800.0, 21000.0, 3500.0]), kohort.laju_naik_default()
+    skenario = {"faktor_migrasi": 1.0, "faktor_fertilitas": 1.0, "faktor_mortalitas": 1.0}
+    hasil = simulasi._simulasi_blok(state, 0.03, naik, kohort.DEFAULT_MORTALITAS, 300.0, 0.0, 20, 4, skenario, 0)
+    jalur = kohort.proyeksi(state, kohort.matriks_proyeksi(0.03, naik=naik), kohort.vektor_migrasi(300.0), 20)
+    np.testing.assert_allclose(hasil, np.broadcast_to(jalur, (4,) + jalur.shape), rtol=1e-12)
@@ -0,0 +1,47 @@
+"""
+Benchmark memuat snapshot dataset memory-mapped.
+"""
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from conftest import synthetic_series
+
+@pytest.mark.parametrize("n", [10, 10_000, 1_000_000], ids=lambda n: f"rows={n}")
+def test_snapshot_muat(benchmark, tmp_path, monkeypatch, n):
+    """Snapshot disimpan sekali; memuatnya memory-mapped sehingga biayanya hampir tidak tergantung ukuran"""
+    import pyarrow as pa
+    import snapshot
+    monkeypatch.setattr(snapshot, "SNAPSHOT_DIR", str(tmp_path))
+    table = pa.Table.from_pylist(synthetic_series(n, ("jumlah_penduduk", "laki_laki", "perempuan")))
+    snapshot_id = snapshot.simpan("penduduk_tahunan", table)
+    assert snapshot.simpan("penduduk_tahunan", table) == snapshot_id
+    assert len(list(tmp_path.joinpath("penduduk_tahunan").glob("*.feather"))) == 1
+
+    loaded = benchmark(snapshot.muat, snapshot_id)
+    assert loaded.num_rows == n
+
+def test_snapshot_proses_baru(stub_supabase, monkeypatch):
+    """Proses baru hanya memakai snapshot segar dari database yang sama dan log audit yang belum bertambah"""
+    import arrow_store, model
+
+    def proses_baru(tables):
+        stub_supabase(tables)
+        monkeypatch.setattr(arrow_store, "_dari_supabase", set())
+        monkeypatch.setattr(arrow_store, "_tables", {})
+
+    lama = synthetic_series(9)
+    baru = synthetic_series(9, start=1.0)
+    stub_supabase({"penduduk_tahunan": lama})
+    arrow_store.get_table("penduduk_tahunan")
+
+    proses_baru({"penduduk_tahunan": baru})
+    assert arrow_store.get_table("penduduk_tahunan").num_rows == 9
+    assert arrow_store.get_table("penduduk_tahunan")["jumlah_penduduk"][0].as_py() == lama[0]["jumlah_penduduk"]
+
+    proses_baru({"penduduk_tahunan": baru, "audit_log": [{"id": 7}]})
+    assert arrow_store.get_table("penduduk_tahunan")["jumlah_penduduk"][0].as_py() == baru[0]["jumlah_penduduk"]
+
+    monkeypatch.setattr(model, "SUPABASE_URL", "https://lain.supabase.co")
+    proses_baru({"penduduk_tahunan": lama, "audit_log": [{"id": 7}]})
+    assert arrow_store.get_table("penduduk_tahunan")["jumlah_penduduk"][0].as_py() == lama[0]["jumlah_penduduk"]
@@ -0,0 +1,43 @@
+"""
+Benchmark aturan validasi data dari satu baris form sampai impor besar.
+"""
+import pandas as pd
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from conftest import synthetic_series
+
+@pytest.mark.parametrize("n", [1, 1_000, 100_000], ids=lambda n: f"rows={n}")
+def test_validasi(benchmark, n):
+    """Semua aturan penduduk_tahunan pada satu baris form s.d. impor besar"""
+    from validasi import validasi
+    df = pd.DataFrame(synthetic_series(n, ("laki_laki", "perempuan")))
+    df["jumlah_penduduk"] = df["laki_laki"] + df["perempuan"]
+    hasil = benchmark(validasi, "penduduk_tahunan", df)
+    assert not (hasil["aturan"] == "jumlah").any()
+
+def test_tampilkan_pelanggaran_seluruh_tabel(stub_supabase, monkeypatch):
+    """Halaman data_* memvalidasi seluruh tabel dari cache Arrow; tabel kosong tidak membuat halaman gagal"""
+    import sys, types
+    from contextlib import nullcontext
+    from validasi import tampilkan_pelanggaran
+    tampil = []
+    st = types.SimpleNamespace(expander=lambda *a, **k: nullcontext(), caption=lambda *a, **k: None,
+                               dataframe=lambda df, **k: tampil.append(df))
+    monkeypatch.setitem(sys.modules, "streamlit", st)
+
+    stub_supabase({"migrasi": []})
+    tampilkan_pelanggaran("migrasi")
+    assert tampil == []
+
+    rows = synthetic_series(30, ("migrasi_masuk", "migrasi_keluar"))
+    stub_supabase({"migrasi": rows + [dict(rows[0])]})   # duplikat tahun pertama, di "halaman" lain
+    tampilkan_pelanggaran("migrasi")
+    assert (tampil[0]["Tahun"] == rows[0]["id_tahun"]).sum() == 2
+
+def test_putus_sekolah_nol():
+    """Nol putus sekolah dalam setahun adalah data sah, bukan error"""
+    from validasi import periksa
+    assert periksa("putus_sekolah", [{"id_tahun": 2023, "jumlah_putus_sekolah": 0}]) == (True, [])
+    assert not periksa("putus_sekolah", [{"id_tahun": 2023, "jumlah_putus_sekolah": -1}])[0]
@@ -3,6 +3,8 @@ import pandas as pd
 from supabase import create_client, Client
 import os
 from dotenv import load_dotenv
+from perubahan import publish
+from audit import sebelum
 
 # Load environment variables
 load_dotenv()
@@ -14,7 +16,8 @@ supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
 def create_data(name, age):
     data = {"name": name, "age": age}
-    supabase.table("users").insert(data).execute()
+    response = supabase.table("users").insert(data).execute()
+    publish("users", "insert", response.data or [data])
 
 def read_data():
     users = supabase.table("users").select("id, name, age").execute()
@@ -25,13 +28,20 @@ def read_data():
     }
 
 def update_data(user_id, name, age):
+    row = {"id": user_id, "name": name, "age": age}
+    lama = sebelum(supabase, "users", row)
     supabase.table("users").update({"name": name, "age": age}).eq("id", user_id).execute()
+    publish("users", "update", [row], old=[lama])
 
 def delete_data(user_id):
-    supabase.table("users").delete().eq("id", user_id).execute()
+    response = supabase.table("users").delete().eq("id", user_id).execute()
+    publish("users", "delete", [{"id": user_id}], old=response.data)
 
 def confirm_user(user_id):
+    row = {"id_admin": user_id, "is_confirmed": True}
+    lama = sebelum(supabase, "users", row)
     supabase.table("users").update({"is_confirmed": True}).eq("id_admin", user_id).execute()
+    publish("users", "update", [row], old=[lama])
 
 def get_unconfirmed_users():
     response = supabase.table("users").select("id_admin, nama, username, role, is_confirmed").eq("is_confirmed", False).execute()
@@ -3,11 +3,11 @@ import pandas as pd
 import os
 
 @st.cache_data
-def load_csv_data(filename):
-    """Load data CSV dengan caching"""
+def load_csv_data(filename, sep=';'):
+    """Load data CSV dengan caching (file di folder data memakai pemisah ';')"""
     file_path = os.path.join('data', filename)
     if os.path.exists(file_path):
-        return pd.read_csv(file_path)
+        return pd.read_csv(file_path, sep=sep, encoding='utf-8-sig')
     else:
         st.error(f"File {filename} tidak ditemukan")
         return pd.DataFrame()
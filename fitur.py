@@ -0,0 +1,159 @@
+"""
+Feature store: fitur lag dan lintas tabel per tahun untuk model multi-fitur.
+
+Sumbernya tabel indikator (indikator.py) yang sudah berisi semua tabel tahunan
+dalam satu baris per id_tahun, jadi fitur dari migrasi, keluarga, status
+perkawinan, dst. tidak perlu di-join ulang per model. Matriks fitur dibangun
+sekali per (kolom, lag, versi tabel) dengan operasi array O(tahun x fitur) dan
+dipakai bersama semua target.
+
+    python fitur.py                 # bandingkan MAE backtest model id_tahun vs multi-fitur
+    python fitur.py --poly 2        # dengan PolynomialFeatures derajat 2
+"""
+import argparse
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+import indikator
+from instrumentasi import timed
+from logging_setup import get_logger
+from model import train_svm_model, LinearTrendModel
+
+logger = get_logger("fitur")
+
+LAGS = (1,)
+# Fitur lintas tabel default per target (nama kolom tabel indikator)
+FITUR_DEFAULT = {
+    "jumlah_penduduk": ["migrasi_neto", "jumlah_kepala_keluarga"],
+    "laki_laki": ["migrasi_neto", "jumlah_kepala_keluarga"],
+    "perempuan": ["migrasi_neto", "jumlah_kepala_keluarga"],
+    "jumlah_kepala_keluarga": ["jumlah_penduduk", "status_kawin"],
+    "pria": ["jumlah_penduduk", "status_kawin"],
+    "wanita": ["jumlah_penduduk", "status_kawin"],
+    "migrasi_masuk": ["jumlah_penduduk", "migrasi_keluar"],
+    "migrasi_keluar": ["jumlah_penduduk", "migrasi_masuk"],
+    "status_kawin": ["jumlah_penduduk", "usia_15_60_total"],
+    "cerai_hidup": ["status_kawin"],
+    "jumlah_putus_sekolah": ["usia_0_14_total", "jumlah_penduduk"],
+}
+MAX_CACHE = 32
+
+_cache = OrderedDict()  # (kolom, lags, versi tabel indikator) -> DataFrame fitur
+_lock = threading.Lock()
+
+def nama_fitur(kolom, lags=LAGS):
+    return [f"{col}_lag{lag}" for col in kolom for lag in lags]
+
+def _geser(years, values, lags):
+    """
+    Nilai lag per tahun kalender (bukan per baris), sehingga tahun yang hilang
+    menghasilkan NaN. values: array (tahun x kolom); hasil: (tahun x kolom*lag).
+    """
+    pos = years - years.min()
+    dense = np.full((pos.max() + 1, values.shape[1]), np.nan)
+    dense[pos] = values
+    hasil = np.full((len(years), values.shape[1], len(lags)), np.nan)
+    for j, lag in enumerate(lags):
+        src = pos - lag
+        ok = src >= 0
+        hasil[ok, :, j] = dense[src[ok]]
+    return hasil.reshape(len(years), -1)
+
+@timed("build_features")
+def matriks(kolom, lags=LAGS):
+    """DataFrame id_tahun + fitur lag untuk kolom tabel indikator (di-cache per versi tabel)"""
+    key = (tuple(kolom), tuple(lags), indikator.versi())
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    df = indikator.baca(columns=list(kolom))
+    years = df["id_tahun"].to_numpy(dtype=np.int64)
+    values = _geser(years, df[list(kolom)].to_numpy(dtype=float), lags)
+    hasil = pd.DataFrame(values, columns=nama_fitur(kolom, lags))
+    hasil.insert(0, "id_tahun", years)
+
+    with _lock:
+        _cache[key] = hasil
+        while len(_cache) > MAX_CACHE:
+            _cache.popitem(last=False)
+    return hasil
+
+def dataset(data, target, kolom, lags=LAGS):
+    """Data target + fitur (join pada id_tahun); baris dengan fitur tidak lengkap dibuang"""
+    fitur = matriks(kolom, lags)
+    df = data[["id_tahun", target]].merge(fitur, on="id_tahun", how="inner")
+    return df.dropna().sort_values("id_tahun").reset_index(drop=True)
+
+def fitur_masa_depan(kolom, tahun, lags=LAGS):
+    """
+    Fitur untuk tahun prediksi. Lag yang jatuh pada tahun historis diambil dari
+    tabel indikator; sisanya dari tren linear semua kolom sekaligus.
+    """
+    df = indikator.baca(columns=list(kolom)).dropna()
+    years = df["id_tahun"].to_numpy(dtype=np.int64)
+    values = df[list(kolom)].to_numpy(dtype=float)
+    tahun = np.asarray(tahun, dtype=np.int64).ravel()
+
+    semua = np.arange(years.min(), max(tahun.max(), years.max()) + 1)
+    baru = semua[~np.isin(semua, years)]
+    if len(baru):
+        tren = LinearTrendModel().fit(years.reshape(-1, 1), values)
+        years = np.concatenate([years, baru])
+        values = np.vstack([values, tren.predict(baru.reshape(-1, 1)).reshape(len(baru), -1)])
+        order = np.argsort(years)
+        years, values = years[order], values[order]
+
+    lagged = _geser(years, values, lags)
+    return pd.DataFrame(lagged[np.searchsorted(years, tahun)], columns=nama_fitur(kolom, lags))
+
+def latih_multi_fitur(data, target, kolom=None, lags=LAGS, table_name=None, params=None, poly_degree=1):
+    """
+    Latih pipeline SVR dengan id_tahun + fitur lintas tabel. Mengembalikan
+    (model, mae, mape, r2) seperti train_svm_model; fitur tersimpan di model.fitur_.
+    """
+    kolom = list(kolom if kolom is not None else FITUR_DEFAULT.get(target, []))
+    df = dataset(data, target, kolom, lags)
+    features = ["id_tahun"] + nama_fitur(kolom, lags)
+    result = train_svm_model(features, target, data=df, table_name=table_name, params=params, poly_degree=poly_degree)
+    result[0].fitur_ = (kolom, tuple(lags))
+    return result
+
+def prediksi(model, tahun):
+    """Prediksi model multi-fitur untuk tahun-tahun tertentu"""
+    kolom, lags = model.fitur_
+    tahun = np.asarray(tahun).ravel()
+    X = np.column_stack([tahun, fitur_masa_depan(kolom, tahun, lags).to_numpy()])
+    return model.predict(X)
+
+def bandingkan(poly_degree=1):
+    """MAE backtest model id_tahun saja vs multi-fitur untuk semua target di FITUR_DEFAULT"""
+    from model_store import MODEL_SPECS
+    from model import fetch_data
+
+    hasil = []
+    for spec in MODEL_SPECS.values():
+        if spec.get("group_by"):
+            continue
+        data = fetch_data(spec["table"], ["id_tahun"], spec["targets"])
+        for target in spec["targets"]:
+            if target not in FITUR_DEFAULT:
+                continue
+            try:
+                _, mae_1, _, _ = train_svm_model(["id_tahun"], target, data=data, table_name=spec["table"])
+                _, mae_n, _, _ = latih_multi_fitur(data, target, table_name=spec["table"], poly_degree=poly_degree)
+            except Exception as e:
+                logger.warning("feature_compare_error", extra={"table": spec["table"], "target": target, "error": str(e)})
+                continue
+            hasil.append({"table": spec["table"], "target": target, "mae_tahun": mae_1, "mae_multi_fitur": mae_n})
+    return pd.DataFrame(hasil)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bandingkan model id_tahun dengan model multi-fitur")
+    parser.add_argument("--poly", type=int, default=1, help="Derajat PolynomialFeatures (default 1 = tanpa)")
+    args = parser.parse_args()
+    print(bandingkan(poly_degree=args.poly).to_string(index=False))
@@ -2,6 +2,9 @@ import streamlit as st
 import pandas as pd
 from supabase import create_client, Client
 from model import fetch_data
+from perubahan import publish
+from audit import sebelum
+from validasi import periksa, tampilkan_pelanggaran
 import os
 from dotenv import load_dotenv
 
@@ -26,15 +29,20 @@ def add_year_if_not_exists(id_tahun):
 # Fungsi untuk menambahkan data penduduk
 def add_population_data(id_tahun, jumlah_penduduk, laki_laki, perempuan):
     try:
-        response = supabase.table("penduduk_tahunan").insert({
+        row = {
             "id_tahun": int(id_tahun),  # Konversi ke integer
             "jumlah_penduduk": int(jumlah_penduduk),  # Konversi ke integer
             "laki_laki": int(laki_laki),  # Konversi ke integer
             "perempuan": int(perempuan)  # Konversi ke integer
-        }).execute()
+        }
+        valid, pesan = periksa("penduduk_tahunan", [row])
+        if not valid:
+            return False, "Data tidak valid: " + "; ".join(pesan)
+        response = supabase.table("penduduk_tahunan").insert(row).execute()
         
         # Cek apakah data berhasil ditambahkan
         if response.data:  # Jika ada data yang dikembalikan, berarti sukses
+            publish("penduduk_tahunan", "insert", [row])
             return True, "Data berhasil ditambahkan!"
         else:
             return False, "Gagal menambahkan data: Tidak ada data yang dikembalikan."
@@ -59,7 +67,8 @@ def delete_population_data(id_tahun):
     try:
         # Konversi id_tahun ke integer
         id_tahun = int(id_tahun)
-        supabase.table("penduduk_tahunan").delete().eq("id_tahun", id_tahun).execute()
+        response = supabase.table("penduduk_tahunan").delete().eq("id_tahun", id_tahun).execute()
+        publish("penduduk_tahunan", "delete", [{"id_tahun": id_tahun}], old=response.data)
         st.success(f"Data untuk tahun {id_tahun} berhasil dihapus!")
     except Exception as e:
         st.error(f"Gagal menghapus data: {str(e)}")
@@ -67,11 +76,19 @@ def delete_population_data(id_tahun):
 # Fungsi untuk memperbarui data
 def update_population_data(id_tahun, jumlah_penduduk, laki_laki, perempuan):
     try:
-        supabase.table("penduduk_tahunan").update({
+        values = {
             "jumlah_penduduk": int(jumlah_penduduk),  # Konversi ke integer
             "laki_laki": int(laki_laki),  # Konversi ke integer
             "perempuan": int(perempuan)  # Konversi ke integer
-        }).eq("id_tahun", int(id_tahun)).execute()  # Konversi ke integer
+        }
+        valid, pesan = periksa("penduduk_tahunan", [{"id_tahun": int(id_tahun), **values}])
+        if not valid:
+            st.error("Data tidak valid: " + "; ".join(pesan))
+            return
+        row = {"id_tahun": int(id_tahun), **values}
+        lama = sebelum(supabase, "penduduk_tahunan", row)
+        supabase.table("penduduk_tahunan").update(values).eq("id_tahun", int(id_tahun)).execute()  # Konversi ke integer
+        publish("penduduk_tahunan", "update", [row], old=[lama])
         st.success(f"Data untuk tahun {id_tahun} berhasil diperbarui!")
     except Exception as e:
         st.error(f"Gagal memperbarui data: {str(e)}")
@@ -87,6 +104,7 @@ def app():
 
     # Ambil data penduduk
     df = get_population_data()
+    tampilkan_pelanggaran("penduduk_tahunan")
 
     # Tampilkan tabel dengan tombol hapus per baris
     col1, col2, col3, col4, col5 = st.columns([2, 3, 3, 3, 2])
@@ -173,8 +191,10 @@ def app():
         st.write(f"**Total Jumlah Penduduk:** {jumlah_penduduk}")
         
         if st.form_submit_button("Tambah Data"):
-            if jumlah_penduduk == 0:
-                st.error("Jumlah penduduk tidak boleh nol!")
+            valid, pesan = periksa("penduduk_tahunan", [{"id_tahun": tahun_baru, "jumlah_penduduk": jumlah_penduduk, "laki_laki": laki_laki, "perempuan": perempuan}])
+            if not valid:
+                for p in pesan:
+                    st.error(p)
             elif check_year_exists(tahun_baru):
                 st.error(f"Data penduduk untuk tahun {tahun_baru} sudah ada!")
             else:
@@ -2,6 +2,9 @@ import streamlit as st
 import pandas as pd
 from supabase import create_client, Client
 from model import fetch_data
+from perubahan import publish
+from audit import sebelum
+from validasi import periksa, tampilkan_pelanggaran
 import os
 from dotenv import load_dotenv
 
@@ -26,15 +29,20 @@ def add_year_if_not_exists(id_tahun):
 # Fungsi untuk menambahkan data kepala keluarga
 def add_population_data(id_tahun, jumlah_kepala_keluarga, pria, wanita):
     try:
-        response = supabase.table("keluarga").insert({
+        row = {
             "id_tahun": int(id_tahun),  # Konversi ke integer
             "jumlah_kepala_keluarga": int(jumlah_kepala_keluarga),  # Konversi ke integer
             "pria": int(pria),  # Konversi ke integer
             "wanita": int(wanita)  # Konversi ke integer
-        }).execute()
+        }
+        valid, pesan = periksa("keluarga", [row])
+        if not valid:
+            return False, "Data tidak valid: " + "; ".join(pesan)
+        response = supabase.table("keluarga").insert(row).execute()
         
         # Cek apakah data berhasil ditambahkan
         if response.data:  # Jika ada data yang dikembalikan, berarti sukses
+            publish("keluarga", "insert", [row])
             return True, "Data berhasil ditambahkan!"
         else:
             return False, "Gagal menambahkan data: Tidak ada data yang dikembalikan."
@@ -59,7 +67,8 @@ def delete_population_data(id_tahun):
     try:
         # Konversi id_tahun ke integer
         id_tahun = int(id_tahun)
-        supabase.table("keluarga").delete().eq("id_tahun", id_tahun).execute()
+        response = supabase.table("keluarga").delete().eq("id_tahun", id_tahun).execute()
+        publish("keluarga", "delete", [{"id_tahun": id_tahun}], old=response.data)
         st.success(f"Data untuk tahun {id_tahun} berhasil dihapus!")
     except Exception as e:
         st.error(f"Gagal menghapus data: {str(e)}")
@@ -67,11 +76,19 @@ def delete_population_data(id_tahun):
 # Fungsi untuk memperbarui data
 def update_population_data(id_tahun, jumlah_kepala_keluarga, pria, wanita):
     try:
-        supabase.table("keluarga").update({
+        values = {
             "jumlah_kepala_keluarga": int(jumlah_kepala_keluarga),  # Konversi ke integer
             "pria": int(pria),  # Konversi ke integer
             "wanita": int(wanita)  # Konversi ke integer
-        }).eq("id_tahun", int(id_tahun)).execute()  # Konversi ke integer
+        }
+        valid, pesan = periksa("keluarga", [{"id_tahun": int(id_tahun), **values}])
+        if not valid:
+            st.error("Data tidak valid: " + "; ".join(pesan))
+            return
+        row = {"id_tahun": int(id_tahun), **values}
+        lama = sebelum(supabase, "keluarga", row)
+        supabase.table("keluarga").update(values).eq("id_tahun", int(id_tahun)).execute()  # Konversi ke integer
+        publish("keluarga", "update", [row], old=[lama])
         st.success(f"Data untuk tahun {id_tahun} berhasil diperbarui!")
     except Exception as e:
         st.error(f"Gagal memperbarui data: {str(e)}")
@@ -87,6 +104,7 @@ def app():
 
     # Ambil data kepala keluarga
     df = get_population_data()
+    tampilkan_pelanggaran("keluarga")
 
     # Tampilkan tabel dengan tombol hapus per baris
     col1, col2, col3, col4, col5 = st.columns([2, 3, 3, 3, 2])
@@ -173,8 +191,10 @@ def app():
         st.write(f"**Total Jumlah Kepala Keluarga:** {jumlah_kepala_keluarga}")
         
         if st.form_submit_button("Tambah Data"):
-            if jumlah_kepala_keluarga == 0:
-                st.error("Jumlah kepala keluarga tidak boleh nol!")
+            valid, pesan = periksa("keluarga", [{"id_tahun": tahun_baru, "jumlah_kepala_keluarga": jumlah_kepala_keluarga, "pria": pria, "wanita": wanita}])
+            if not valid:
+                for p in pesan:
+                    st.error(p)
             elif check_year_exists(tahun_baru):
                 st.error(f"Data kepala keluarga untuk tahun {tahun_baru} sudah ada!")
             else:
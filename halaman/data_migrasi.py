@@ -2,6 +2,9 @@ import streamlit as st
 import pandas as pd
 from supabase import create_client, Client
 from model import fetch_data
+from perubahan import publish
+from audit import sebelum
+from validasi import periksa, tampilkan_pelanggaran
 import os
 from dotenv import load_dotenv
 
@@ -26,14 +29,19 @@ def add_year_if_not_exists(id_tahun):
 # Fungsi untuk menambahkan data kepala migrasi
 def add_population_data(id_tahun, migrasi_masuk, migrasi_keluar):
     try:
-        response = supabase.table("migrasi").insert({
+        row = {
             "id_tahun": int(id_tahun),  # Konversi ke integer
             "migrasi_masuk": int(migrasi_masuk),  # Konversi ke integer
             "migrasi_keluar": int(migrasi_keluar),  # Konversi ke integer
-        }).execute()
+        }
+        valid, pesan = periksa("migrasi", [row])
+        if not valid:
+            return False, "Data tidak valid: " + "; ".join(pesan)
+        response = supabase.table("migrasi").insert(row).execute()
         
         # Cek apakah data berhasil ditambahkan
         if response.data:  # Jika ada data yang dikembalikan, berarti sukses
+            publish("migrasi", "insert", [row])
             return True, "Data berhasil ditambahkan!"
         else:
             return False, "Gagal menambahkan data: Tidak ada data yang dikembalikan."
@@ -58,7 +66,8 @@ def delete_population_data(id_tahun):
     try:
         # Konversi id_tahun ke integer
         id_tahun = int(id_tahun)
-        supabase.table("migrasi").delete().eq("id_tahun", id_tahun).execute()
+        response = supabase.table("migrasi").delete().eq("id_tahun", id_tahun).execute()
+        publish("migrasi", "delete", [{"id_tahun": id_tahun}], old=response.data)
         st.success(f"Data untuk tahun {id_tahun} berhasil dihapus!")
     except Exception as e:
         st.error(f"Gagal menghapus data: {str(e)}")
@@ -66,10 +75,18 @@ def delete_population_data(id_tahun):
 # Fungsi untuk memperbarui data
 def update_population_data(id_tahun, migrasi_masuk, migrasi_keluar):
     try:
-        supabase.table("migrasi").update({
+        values = {
             "migrasi_masuk": int(migrasi_masuk),  # Konversi ke integer
             "migrasi_keluar": int(migrasi_keluar),  # Konversi ke integer
-        }).eq("id_tahun", int(id_tahun)).execute()  # Konversi ke integer
+        }
+        valid, pesan = periksa("migrasi", [{"id_tahun": int(id_tahun), **values}])
+        if not valid:
+            st.error("Data tidak valid: " + "; ".join(pesan))
+            return
+        row = {"id_tahun": int(id_tahun), **values}
+        lama = sebelum(supabase, "migrasi", row)
+        supabase.table("migrasi").update(values).eq("id_tahun", int(id_tahun)).execute()  # Konversi ke integer
+        publish("migrasi", "update", [row], old=[lama])
         st.success(f"Data untuk tahun {id_tahun} berhasil diperbarui!")
     except Exception as e:
         st.error(f"Gagal memperbarui data: {str(e)}")
@@ -85,6 +102,7 @@ def app():
 
     # Ambil data kepala migrasi
     df = get_population_data()
+    tampilkan_pelanggaran("migrasi")
 
     # Tampilkan tabel dengan tombol hapus per baris
     col1, col2, col3, col4= st.columns([2, 3, 3, 2])
@@ -160,8 +178,10 @@ def app():
             migrasi_keluar = st.number_input("Jumlah Migrasi Keluar", min_value=0, step=1, key=f"keluar_input_{st.session_state.form_key}")
         
         if st.form_submit_button("Tambah Data"):
-            if migrasi_masuk == 0 and migrasi_keluar == 0:
-                st.error("Jumlah migrasi tidak boleh nol!")
+            valid, pesan = periksa("migrasi", [{"id_tahun": tahun_baru, "migrasi_masuk": migrasi_masuk, "migrasi_keluar": migrasi_keluar}])
+            if not valid:
+                for p in pesan:
+                    st.error(p)
             elif check_year_exists(tahun_baru):
                 st.error(f"Data migrasi untuk tahun {tahun_baru} sudah ada!")
             else:
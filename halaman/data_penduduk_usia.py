@@ -3,6 +3,10 @@ import pandas as pd
 from supabase import create_client, Client
 import os
 from dotenv import load_dotenv
+from perubahan import publish
+from audit import sebelum
+from validasi import periksa, tampilkan_pelanggaran
+from repositori import jalankan, halaman
 
 load_dotenv()
 
@@ -21,13 +25,8 @@ ITEMS_PER_PAGE = 10
 
 # Fungsi untuk mendapatkan data dengan pagination
 def get_age_population_data(page=1, items_per_page=ITEMS_PER_PAGE):
-    offset = (page - 1) * items_per_page
-    count_response = supabase.table("penduduk_usia").select("count", count="exact").execute()
-    total_count = count_response.count
-    
-    response = supabase.table("penduduk_usia").select("*").order("id_tahun").range(offset, offset + items_per_page - 1).execute()
-    df = pd.DataFrame(response.data)
-    return df.replace([float("inf"), float("-inf")], 0).fillna(0), total_count
+    # Count dan isi halaman diambil bersamaan
+    return jalankan(halaman("penduduk_usia", page, items_per_page, client=supabase))
 
 # Fungsi untuk mendapatkan semua data tanpa pagination
 def get_all_age_population_data():
@@ -52,13 +51,19 @@ def check_year_exists(id_tahun):
 def add_age_population_data(id_tahun, kategori_usia, laki_laki, perempuan):
     try:
         total = laki_laki + perempuan
-        response = supabase.table("penduduk_usia").insert({
+        row = {
             "id_tahun": int(id_tahun),
             "kategori_usia": kategori_usia,
             "laki_laki": int(laki_laki),
             "perempuan": int(perempuan),
             "total": int(total)
-        }).execute()
+        }
+        valid, pesan = periksa("penduduk_usia", [row])
+        if not valid:
+            return False, "Data tidak valid: " + "; ".join(pesan)
+        response = supabase.table("penduduk_usia").insert(row).execute()
+        if response.data:
+            publish("penduduk_usia", "insert", [row])
         return bool(response.data), "Data berhasil ditambahkan!" if response.data else "Gagal menambahkan data"
     except Exception as e:
         return False, f"Gagal menambahkan data: {str(e)}"
@@ -88,16 +93,12 @@ def add_all_age_population_data(id_tahun, data_0_14, data_15_60, data_60_plus):
         return False, f"Gagal menambahkan data: {str(e)}"
 
 def get_age_population_data(page=1):
-    offset = (page - 1) * ITEMS_PER_PAGE
-    count_response = supabase.table("penduduk_usia").select("count", count="exact").execute()
-    total_count = count_response.count
-    response = supabase.table("penduduk_usia").select("*").order("id_tahun").range(offset, offset + ITEMS_PER_PAGE - 1).execute()
-    df = pd.DataFrame(response.data)
-    return df.replace([float("inf"), float("-inf")], 0).fillna(0), total_count
+    return jalankan(halaman("penduduk_usia", page, ITEMS_PER_PAGE, client=supabase))
 
 def delete_age_population_data(id_tahun, kategori_usia):
     try:
-        supabase.table("penduduk_usia").delete().eq("id_tahun", int(id_tahun)).eq("kategori_usia", kategori_usia).execute()
+        response = supabase.table("penduduk_usia").delete().eq("id_tahun", int(id_tahun)).eq("kategori_usia", kategori_usia).execute()
+        publish("penduduk_usia", "delete", [{"id_tahun": int(id_tahun), "kategori_usia": kategori_usia}], old=response.data)
         return True, f"Data tahun {id_tahun} kelompok {kategori_usia} berhasil dihapus!"
     except Exception as e:
         return False, f"Gagal menghapus data: {str(e)}"
@@ -105,11 +106,18 @@ def delete_age_population_data(id_tahun, kategori_usia):
 def update_age_population_data(id_tahun, kategori_usia, laki_laki, perempuan):
     try:
         total = laki_laki + perempuan
-        supabase.table("penduduk_usia").update({
+        values = {
             "laki_laki": int(laki_laki),
             "perempuan": int(perempuan),
             "total": int(total)
-        }).eq("id_tahun", int(id_tahun)).eq("kategori_usia", kategori_usia).execute()
+        }
+        valid, pesan = periksa("penduduk_usia", [{"id_tahun": int(id_tahun), "kategori_usia": kategori_usia, **values}])
+        if not valid:
+            return False, "Data tidak valid: " + "; ".join(pesan)
+        row = {"id_tahun": int(id_tahun), "kategori_usia": kategori_usia, **values}
+        lama = sebelum(supabase, "penduduk_usia", row)
+        supabase.table("penduduk_usia").update(values).eq("id_tahun", int(id_tahun)).eq("kategori_usia", kategori_usia).execute()
+        publish("penduduk_usia", "update", [row], old=[lama])
         return True, f"Data tahun {id_tahun} kelompok {kategori_usia} berhasil diperbarui!"
     except Exception as e:
         return False, f"Gagal memperbarui data: {str(e)}"
@@ -205,6 +213,9 @@ def app():
                 st.session_state.page += 1
                 st.rerun()
 
+    # Validasi seluruh tabel (bukan hanya halaman ini) dari cache Arrow
+    tampilkan_pelanggaran("penduduk_usia")
+
     # Tampilkan tabel dengan tombol hapus per baris
     col1, col2, col3, col4, col5, col6 = st.columns([2, 3, 2, 2, 2, 2])
     with col1:
@@ -284,21 +295,18 @@ def app():
         st.write(f"**Total Keseluruhan: {total_all}**")
         
         if st.form_submit_button("Tambah Data Semua Kategori"):
-            # Validasi: semua input laki-laki dan perempuan tidak boleh nol
-            if males_0_14 == 0:
-                st.error("Jumlah laki-laki kategori 0-14 tidak boleh nol!")
-            elif females_0_14 == 0:
-                st.error("Jumlah perempuan kategori 0-14 tidak boleh nol!")
-            elif males_15_60 == 0:
-                st.error("Jumlah laki-laki kategori 15-60 tidak boleh nol!")
-            elif females_15_60 == 0:
-                st.error("Jumlah perempuan kategori 15-60 tidak boleh nol!")
-            elif males_60_plus == 0:
-                st.error("Jumlah laki-laki kategori 60+ tidak boleh nol!")
-            elif females_60_plus == 0:
-                st.error("Jumlah perempuan kategori 60+ tidak boleh nol!")
-            elif total_all == 0:
-                st.error("Total penduduk tidak boleh nol!")
+            # Validasi ketiga kategori sekaligus
+            valid, pesan = periksa("penduduk_usia", [
+                {"id_tahun": new_year, "kategori_usia": kategori, "laki_laki": laki_laki, "perempuan": perempuan, "total": laki_laki + perempuan}
+                for kategori, laki_laki, perempuan in [
+                    ("0-14", males_0_14, females_0_14),
+                    ("15-60", males_15_60, females_15_60),
+                    ("60+", males_60_plus, females_60_plus)
+                ]
+            ])
+            if not valid:
+                for p in pesan:
+                    st.error(p)
             elif check_year_exists(new_year):
                 st.error(f"Data untuk tahun {new_year} sudah ada!")
             else:
@@ -2,6 +2,9 @@ import streamlit as st
 import pandas as pd
 from supabase import create_client, Client
 from model import fetch_data
+from perubahan import publish
+from audit import sebelum
+from validasi import periksa, tampilkan_pelanggaran
 import os
 from dotenv import load_dotenv
 
@@ -26,13 +29,18 @@ def add_year_if_not_exists(id_tahun):
 # Fungsi untuk menambahkan data kepala putus_sekolah
 def add_population_data(id_tahun, jumlah_putus_sekolah):
     try:
-        response = supabase.table("putus_sekolah").insert({
+        row = {
             "id_tahun": int(id_tahun),  # Konversi ke integer
             "jumlah_putus_sekolah": int(jumlah_putus_sekolah)  # Konversi ke integer
-        }).execute()
+        }
+        valid, pesan = periksa("putus_sekolah", [row])
+        if not valid:
+            return False, "Data tidak valid: " + "; ".join(pesan)
+        response = supabase.table("putus_sekolah").insert(row).execute()
         
         # Cek apakah data berhasil ditambahkan
         if response.data:  # Jika ada data yang dikembalikan, berarti sukses
+            publish("putus_sekolah", "insert", [row])
             return True, "Data berhasil ditambahkan!"
         else:
             return False, "Gagal menambahkan data: Tidak ada data yang dikembalikan."
@@ -57,7 +65,8 @@ def delete_population_data(id_tahun):
     try:
         # Konversi id_tahun ke integer
         id_tahun = int(id_tahun)
-        supabase.table("putus_sekolah").delete().eq("id_tahun", id_tahun).execute()
+        response = supabase.table("putus_sekolah").delete().eq("id_tahun", id_tahun).execute()
+        publish("putus_sekolah", "delete", [{"id_tahun": id_tahun}], old=response.data)
         st.success(f"Data untuk tahun {id_tahun} berhasil dihapus!")
     except Exception as e:
         st.error(f"Gagal menghapus data: {str(e)}")
@@ -65,9 +74,17 @@ def delete_population_data(id_tahun):
 # Fungsi untuk memperbarui data
 def update_population_data(id_tahun, jumlah_putus_sekolah):
     try:
-        supabase.table("putus_sekolah").update({
+        values = {
             "jumlah_putus_sekolah": int(jumlah_putus_sekolah),  # Konversi ke integer
-        }).eq("id_tahun", int(id_tahun)).execute()  # Konversi ke integer
+        }
+        valid, pesan = periksa("putus_sekolah", [{"id_tahun": int(id_tahun), **values}])
+        if not valid:
+            st.error("Data tidak valid: " + "; ".join(pesan))
+            return
+        row = {"id_tahun": int(id_tahun), **values}
+        lama = sebelum(supabase, "putus_sekolah", row)
+        supabase.table("putus_sekolah").update(values).eq("id_tahun", int(id_tahun)).execute()  # Konversi ke integer
+        publish("putus_sekolah", "update", [row], old=[lama])
         st.success(f"Data untuk tahun {id_tahun} berhasil diperbarui!")
     except Exception as e:
         st.error(f"Gagal memperbarui data: {str(e)}")
@@ -83,6 +100,7 @@ def app():
 
     # Ambil data kepala putus_sekolah
     df = get_population_data()
+    tampilkan_pelanggaran("putus_sekolah")
 
     # Tampilkan tabel dengan tombol hapus per baris
     col1, col2, col3 = st.columns([2, 3, 2])
@@ -153,8 +171,10 @@ def app():
             st.write("")  # Spacer
         
         if st.form_submit_button("Tambah Data"):
-            if jumlah_putus_sekolah == 0:
-                st.error("Jumlah Putus Sekolah tidak boleh nol!")
+            valid, pesan = periksa("putus_sekolah", [{"id_tahun": tahun_baru, "jumlah_putus_sekolah": jumlah_putus_sekolah}])
+            if not valid:
+                for p in pesan:
+                    st.error(p)
             elif check_year_exists(tahun_baru):
                 st.error(f"Data putus sekolah untuk tahun {tahun_baru} sudah ada!")
             else:
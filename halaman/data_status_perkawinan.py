@@ -2,6 +2,9 @@ import streamlit as st
 import pandas as pd
 from supabase import create_client, Client
 from model import fetch_data
+from perubahan import publish
+from audit import sebelum
+from validasi import periksa, tampilkan_pelanggaran
 import os
 from dotenv import load_dotenv
 
@@ -26,14 +29,19 @@ def add_year_if_not_exists(id_tahun):
 # Fungsi untuk menambahkan data kepala status_perkawinan
 def add_population_data(id_tahun, status_kawin, cerai_hidup):
     try:
-        response = supabase.table("status_perkawinan").insert({
+        row = {
             "id_tahun": int(id_tahun),  # Konversi ke integer
             "status_kawin": int(status_kawin),  # Konversi ke integer
             "cerai_hidup": int(cerai_hidup)  # Konversi ke integer
-        }).execute()
+        }
+        valid, pesan = periksa("status_perkawinan", [row])
+        if not valid:
+            return False, "Data tidak valid: " + "; ".join(pesan)
+        response = supabase.table("status_perkawinan").insert(row).execute()
         
         # Cek apakah data berhasil ditambahkan
         if response.data:  # Jika ada data yang dikembalikan, berarti sukses
+            publish("status_perkawinan", "insert", [row])
             return True, "Data berhasil ditambahkan!"
         else:
             return False, "Gagal menambahkan data: Tidak ada data yang dikembalikan."
@@ -58,7 +66,8 @@ def delete_population_data(id_tahun):
     try:
         # Konversi id_tahun ke integer
         id_tahun = int(id_tahun)
-        supabase.table("status_perkawinan").delete().eq("id_tahun", id_tahun).execute()
+        response = supabase.table("status_perkawinan").delete().eq("id_tahun", id_tahun).execute()
+        publish("status_perkawinan", "delete", [{"id_tahun": id_tahun}], old=response.data)
         st.success(f"Data untuk tahun {id_tahun} berhasil dihapus!")
     except Exception as e:
         st.error(f"Gagal menghapus data: {str(e)}")
@@ -66,10 +75,18 @@ def delete_population_data(id_tahun):
 # Fungsi untuk memperbarui data
 def update_population_data(id_tahun, status_kawin, cerai_hidup):
     try:
-        supabase.table("status_perkawinan").update({
+        values = {
             "status_kawin": int(status_kawin),
             "cerai_hidup": int(cerai_hidup)  # Konversi ke integer
-        }).eq("id_tahun", int(id_tahun)).execute()  # Konversi ke integer
+        }
+        valid, pesan = periksa("status_perkawinan", [{"id_tahun": int(id_tahun), **values}])
+        if not valid:
+            st.error("Data tidak valid: " + "; ".join(pesan))
+            return
+        row = {"id_tahun": int(id_tahun), **values}
+        lama = sebelum(supabase, "status_perkawinan", row)
+        supabase.table("status_perkawinan").update(values).eq("id_tahun", int(id_tahun)).execute()  # Konversi ke integer
+        publish("status_perkawinan", "update", [row], old=[lama])
         st.success(f"Data untuk tahun {id_tahun} berhasil diperbarui!")
     except Exception as e:
         st.error(f"Gagal memperbarui data: {str(e)}")
@@ -85,6 +102,7 @@ def app():
 
     # Ambil data kepala status_perkawinan
     df = get_population_data()
+    tampilkan_pelanggaran("status_perkawinan")
 
     # Tampilkan tabel dengan tombol hapus per baris
     col1, col2, col3, col4 = st.columns([2, 2, 2, 2])
@@ -160,8 +178,10 @@ def app():
             cerai_hidup = st.number_input("Jumlah Cerai Hidup", min_value=0, step=1, key=f"cerai_input_{st.session_state.form_key}")
         
         if st.form_submit_button("Tambah Data"):
-            if status_kawin == 0 and cerai_hidup == 0:
-                st.error("Jumlah status tidak boleh nol!")
+            valid, pesan = periksa("status_perkawinan", [{"id_tahun": tahun_baru, "status_kawin": status_kawin, "cerai_hidup": cerai_hidup}])
+            if not valid:
+                for p in pesan:
+                    st.error(p)
             elif check_year_exists(tahun_baru):
                 st.error(f"Data status perkawinan untuk tahun {tahun_baru} sudah ada!")
             else:
@@ -0,0 +1,111 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+import plotly.express as px
+from data_utils import load_penduduk_desa_data
+from model_desa import normalisasi_penduduk_desa, koefisien_desa, prediksi_desa
+from rekonsiliasi import prediksi_kecamatan
+
+@st.cache_data
+def fetch_desa_data():
+    """Load dan normalisasi data penduduk per desa dengan caching"""
+    raw = load_penduduk_desa_data()
+    if raw.empty:
+        return pd.DataFrame()
+    return normalisasi_penduduk_desa(raw)
+
+@st.cache_data
+def train_desa_models(df_desa):
+    """Latih model semua desa sekali, hasilnya tabel koefisien yang di-cache"""
+    return koefisien_desa(df_desa)
+
+def prediksi_desa_koheren(df_desa, koef, years):
+    """
+    Prediksi semua desa setelah direkonsiliasi bersama total kecamatan dan kelompok
+    umur (jumlah desa = total kecamatan); prediksi dasar jika rekonsiliasi gagal
+    """
+    pred_df = prediksi_desa(koef, years)
+    try:
+        hasil = prediksi_kecamatan(years, df_desa=df_desa)
+    except Exception as e:
+        st.warning(f"Prediksi desa belum direkonsiliasi dengan total kecamatan: {e}")
+        return pred_df
+    kolom = 'nama_desa' if 'nama_desa' in pred_df.columns else 'id_desa'
+    pred_df['jumlah_penduduk'] = np.round(
+        hasil.stack().loc[list(zip('desa:' + pred_df[kolom].astype(str), pred_df['id_tahun']))].to_numpy(), 2
+    )
+    return pred_df
+
+def app():
+    st.title("Prediksi Jumlah Penduduk per Desa")
+    st.markdown("---")
+
+    df = fetch_desa_data()
+    if df.empty:
+        st.warning("Tidak ada data yang ditemukan!")
+        st.stop()
+
+    koef = train_desa_models(df)
+    if koef.empty:
+        st.error("Tidak dapat membuat prediksi karena data tidak cukup")
+        st.stop()
+
+    # ======= PREDICTION LOGIC =======
+    last_year = df['id_tahun'].max()
+    next_years = np.array([last_year + 1, last_year + 2, last_year + 3])
+    pred_df = prediksi_desa_koheren(df, koef, next_years)
+
+    # ======= PREDICTION DISPLAY =======
+    nama_desa = koef['nama_desa'].tolist()
+    selected_desa = st.selectbox("Pilih Desa:", nama_desa)
+
+    hist_desa = df[df['nama_desa'] == selected_desa]
+    pred_desa = pred_df[pred_df['nama_desa'] == selected_desa]
+    last_value = hist_desa[hist_desa['id_tahun'] == last_year]['jumlah_penduduk']
+
+    cols = st.columns(3)
+    for i, year in enumerate(next_years):
+        value = pred_desa['jumlah_penduduk'].values[i]
+        delta = (value - last_value.values[0]) / last_value.values[0] * 100 if not last_value.empty else 0
+        with cols[i]:
+            st.metric(f"Prediksi {selected_desa} {year}", f"{value:,.0f}", delta=f"{delta:+.1f}%")
+
+    # ======= VISUALIZATION =======
+    st.header("Trend Historis & Prediksi")
+    viz_df = pd.concat([
+        hist_desa.assign(Type='Historical'),
+        pred_desa.assign(Type='Predicted')
+    ])
+    fig = px.line(
+        viz_df,
+        x="id_tahun",
+        y="jumlah_penduduk",
+        color="Type",
+        markers=True,
+        title=f"Trend Jumlah Penduduk Desa {selected_desa}",
+        labels={"id_tahun": "Tahun", "jumlah_penduduk": "Jumlah Penduduk"},
+        color_discrete_map={"Historical": "#2ecc71", "Predicted": "#e74c3c"}
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+    # Tabel prediksi semua desa (desa x tahun)
+    st.header("Prediksi Seluruh Desa")
+    tabel = pred_df.pivot(index='nama_desa', columns='id_tahun', values='jumlah_penduduk')
+    tabel.columns = [str(c) for c in tabel.columns]
+    st.dataframe(
+        tabel.reset_index().rename(columns={'nama_desa': 'Desa'}).style.format(
+            {str(y): "{:,.0f}" for y in next_years}
+        ),
+        use_container_width=True,
+        hide_index=True
+    )
+
+    # ======= MODEL PERFORMANCE =======
+    st.header("Model Prediksi Berdasarkan MAPE dan R²")
+    perf_df = koef[['nama_desa', 'MAPE', 'R²']].rename(columns={'nama_desa': 'Desa', 'MAPE': 'MAPE (%)'})
+    perf_df['MAPE (%)'] = perf_df['MAPE (%)'].apply(lambda x: f"{x:.1f}%")
+    perf_df['R²'] = perf_df['R²'].apply(lambda x: f"{x:.3f}")
+    st.dataframe(perf_df, use_container_width=True, hide_index=True)
+
+    st.markdown("---")
+    st.caption("© 2025 - Yudith Nico Priambodo")
@@ -1,4 +1,109 @@
 import streamlit as st
+import pandas as pd
+import plotly.express as px
+from model import fetch_data
+from instrumentasi import tahap
+from repositori import muat_tabel
+from kohort import proyeksi_kohort, KELOMPOK_USIA
+from perubahan import subscribe
+
+@st.cache_data
+def fetch_usia_data():
+    """Data penduduk per kelompok umur untuk proyeksi kohort"""
+    return fetch_data(
+        table_name="penduduk_usia",
+        feature_columns=["id_tahun"],
+        target_columns=["kategori_usia", "laki_laki", "perempuan", "total"]
+    )[["id_tahun", "kategori_usia", "laki_laki", "perempuan", "total"]]
+
+@st.cache_data
+def fetch_migrasi_data():
+    """Data migrasi masuk/keluar untuk migrasi neto; kosong jika tabel tidak tersedia"""
+    try:
+        return fetch_data(
+            table_name="migrasi",
+            feature_columns=["id_tahun"],
+            target_columns=["migrasi_masuk", "migrasi_keluar"]
+        )
+    except Exception:
+        return pd.DataFrame()
+
+@subscribe
+def _invalidate_cache(table, op, rows):
+    """Buang cache data kohort setiap kali tabel sumbernya diubah"""
+    if table == "penduduk_usia":
+        fetch_usia_data.clear()
+    elif table == "migrasi":
+        fetch_migrasi_data.clear()
+
+@st.cache_data
+def hitung_proyeksi_kohort(df_usia, df_migrasi, horizon):
+    """Proyeksi kohort-komponen (cepat, tetapi tetap di-cache per data & horizon)"""
+    return proyeksi_kohort(df_usia, df_migrasi, horizon=horizon)
 
 def app():
-    st.header("Prediksi Angka Kelahiran dan Kematian")
\ No newline at end of file
+    st.header("Prediksi Angka Kelahiran dan Kematian")
+    st.markdown("---")
+
+    # Kedua tabel diambil bersamaan ke cache Arrow sebelum fetch per tabel
+    muat_tabel("penduduk_usia", "migrasi")
+    df_usia = fetch_usia_data()
+    df_migrasi = fetch_migrasi_data()
+    if df_usia.empty or not set(KELOMPOK_USIA).issubset(df_usia['kategori_usia'].unique()):
+        st.warning("Data penduduk per kelompok umur (0-14, 15-60, 60+) tidak lengkap!")
+        st.stop()
+
+    horizon = st.slider("Lama proyeksi (tahun)", min_value=5, max_value=50, value=30, step=5)
+    proyeksi, komponen = hitung_proyeksi_kohort(df_usia, df_migrasi, horizon)
+
+    # ======= ASUMSI & KOMPONEN =======
+    cols = st.columns(3)
+    with cols[0]:
+        st.metric("Kelahiran per 1.000 perempuan 15-60", f"{komponen['fertilitas'] * 1000:,.1f}")
+    with cols[1]:
+        st.metric(f"Kelahiran {komponen['tahun'][0]}", f"{komponen['kelahiran'][0]:,.0f}")
+    with cols[2]:
+        st.metric(f"Kematian {komponen['tahun'][0]}", f"{komponen['kematian'][0]:,.0f}")
+    st.write(f"*Migrasi neto rata-rata: {komponen['net_migrasi']:,.0f} jiwa per tahun")
+
+    tahap("chart")
+    st.header("Kelahiran dan Kematian per Tahun")
+    komp_df = pd.DataFrame({
+        'Tahun': komponen['tahun'],
+        'Kelahiran': komponen['kelahiran'],
+        'Kematian': komponen['kematian']
+    })
+    fig = px.line(
+        komp_df.melt(id_vars='Tahun', var_name='Komponen', value_name='Jumlah'),
+        x='Tahun', y='Jumlah', color='Komponen', markers=True,
+        color_discrete_map={'Kelahiran': '#2ecc71', 'Kematian': '#e74c3c'}
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+    st.header("Proyeksi Penduduk per Kelompok Umur")
+    hist = df_usia[df_usia['kategori_usia'].isin(KELOMPOK_USIA)].assign(Type='Historical')
+    viz_df = pd.concat([hist, proyeksi.assign(Type='Proyeksi Kohort')])
+    fig = px.line(
+        viz_df, x='id_tahun', y='total', color='kategori_usia', line_dash='Type',
+        labels={'id_tahun': 'Tahun', 'total': 'Jumlah Penduduk', 'kategori_usia': 'Kelompok Umur'},
+        color_discrete_map={'0-14': '#3498db', '15-60': '#2ecc71', '60+': '#e74c3c'}
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+    tahap("table")
+    st.header("Tabel Proyeksi")
+    tabel = proyeksi.pivot(index='id_tahun', columns='kategori_usia', values='total')[KELOMPOK_USIA]
+    tabel['Total'] = tabel.sum(axis=1)
+    tabel = tabel.join(komp_df.set_index('Tahun')).reset_index().rename(columns={'id_tahun': 'Tahun'})
+    st.dataframe(
+        tabel.style.format({col: "{:,.0f}" for col in tabel.columns if col != 'Tahun'}),
+        use_container_width=True,
+        hide_index=True
+    )
+
+    st.write("*Proyeksi kohort-komponen: setiap tahun penduduk bertahan hidup, naik kelompok umur, "
+             "ditambah kelahiran dan migrasi neto. Laju naik kelompok dan angka kelahiran dikalibrasi dari data historis; "
+             "angka kematian memakai asumsi per kelompok umur.")
+
+    st.markdown("---")
+    st.caption("© 2025 - Yudith Nico Priambodo")
@@ -0,0 +1,89 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+import plotly.express as px
+from data_utils import load_geografi_data, load_fasilitas_data
+from analitik_spasial import buat_indeks_desa, hitung_indikator_desa, hitung_fasilitas_per_kapita
+from halaman.jumlah_penduduk_desa import fetch_desa_data, train_desa_models, prediksi_desa_koheren
+
+@st.cache_data
+def compute_spatial_indicators(df_desa, pred_desa, geografi, fasilitas):
+    """Hitung semua indikator spasial (historis + prediksi) sekali lalu di-cache"""
+    semua = pd.concat([
+        df_desa.assign(Type='Historical'),
+        pred_desa.assign(Type='Predicted')
+    ], ignore_index=True)
+
+    indeks = buat_indeks_desa(geografi)
+    return hitung_indikator_desa(semua, indeks), hitung_fasilitas_per_kapita(semua, fasilitas)
+
+def app():
+    st.title("Kepadatan Penduduk & Fasilitas per Desa")
+    st.markdown("---")
+
+    df_desa = fetch_desa_data()
+    geografi = load_geografi_data()
+    fasilitas = load_fasilitas_data()
+    if df_desa.empty or geografi.empty:
+        st.warning("Tidak ada data yang ditemukan!")
+        st.stop()
+
+    koef = train_desa_models(df_desa)
+    last_year = df_desa['id_tahun'].max()
+    next_years = np.array([last_year + 1, last_year + 2, last_year + 3])
+    pred_desa = prediksi_desa_koheren(df_desa, koef, next_years)
+    indikator, fasilitas_rasio = compute_spatial_indicators(df_desa, pred_desa, geografi, fasilitas)
+
+    years = sorted(indikator['id_tahun'].unique())
+    selected_year = st.select_slider("Pilih Tahun:", options=years, value=years[-1])
+    tahun_df = indikator[indikator['id_tahun'] == selected_year].sort_values('kepadatan', ascending=False)
+
+    # ======= VISUALIZATION =======
+    fig = px.bar(
+        tahun_df,
+        x='nama_desa',
+        y='kepadatan',
+        color='Type',
+        title=f"Kepadatan Penduduk per Desa Tahun {selected_year}",
+        labels={'nama_desa': 'Desa', 'kepadatan': 'Jiwa/km²'},
+        color_discrete_map={"Historical": "#2ecc71", "Predicted": "#e74c3c"}
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+    # ======= DETAIL TABLE =======
+    st.header("Detail per Desa")
+    display_df = tahun_df[['nama_desa', 'jumlah_penduduk', 'luas_daerah', 'kepadatan', 'penduduk_per_rw', 'penduduk_per_rt']].rename(columns={
+        'nama_desa': 'Desa',
+        'jumlah_penduduk': 'Jumlah Penduduk',
+        'luas_daerah': 'Luas (km²)',
+        'kepadatan': 'Kepadatan (jiwa/km²)',
+        'penduduk_per_rw': 'Penduduk per RW',
+        'penduduk_per_rt': 'Penduduk per RT'
+    })
+    st.dataframe(
+        display_df.style.format({
+            'Jumlah Penduduk': "{:,.0f}",
+            'Luas (km²)': "{:.2f}",
+            'Kepadatan (jiwa/km²)': "{:,.0f}",
+            'Penduduk per RW': "{:,.0f}",
+            'Penduduk per RT': "{:,.0f}"
+        }),
+        use_container_width=True,
+        hide_index=True
+    )
+
+    # ======= FASILITAS =======
+    if not fasilitas_rasio.empty:
+        st.header("Fasilitas per 1.000 Penduduk")
+        rasio_df = fasilitas_rasio.rename(columns={'id_tahun': 'Tahun', 'jumlah_penduduk': 'Jumlah Penduduk'})
+        rasio_df['Tahun'] = rasio_df['Tahun'].astype(str)
+        kategori_cols = [c for c in rasio_df.columns if c not in ('Tahun', 'Jumlah Penduduk')]
+        st.dataframe(
+            rasio_df.style.format({'Jumlah Penduduk': "{:,.0f}", **{c: "{:.2f}" for c in kategori_cols}}),
+            use_container_width=True,
+            hide_index=True
+        )
+        st.write("*Jumlah fasilitas saat ini dibandingkan dengan jumlah penduduk historis dan prediksi")
+
+    st.markdown("---")
+    st.caption("© 2025 - Yudith Nico Priambodo")
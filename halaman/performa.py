@@ -0,0 +1,83 @@
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+from instrumentasi import get_spans, clear_spans, ringkasan, TRACE_FILE
+from model_store import anomali_report
+from anomali import MODE, METODE, AMBANG
+
+def tampilkan_anomali():
+    """Tahun yang ditandai anomali oleh model yang sedang dipakai"""
+    st.header("Anomali Data Training")
+    aksi = {"flag": "hanya dicatat", "weight": "diberi bobot kecil", "off": "deteksi nonaktif"}.get(MODE, MODE)
+    st.caption(f"Metode {METODE}, ambang {AMBANG}; tahun anomali {aksi} (SIDAREJA_ANOMALY).")
+    report = anomali_report()
+    if report.empty:
+        st.info("Tidak ada tahun anomali pada model yang sudah dimuat.")
+        return
+    st.dataframe(
+        report.rename(columns={
+            'table': 'Tabel', 'target': 'Target', 'group': 'Kelompok', 'id_tahun': 'Tahun', 'skor': 'Skor',
+            'mode': 'Mode', 'metode': 'Metode', 'engine': 'Engine', 'versi': 'Versi Model'
+        }),
+        column_config={'Tahun': st.column_config.NumberColumn(format="%d")},
+        use_container_width=True,
+        hide_index=True
+    )
+
+def app():
+    st.title("Performance")
+    st.markdown("---")
+
+    tampilkan_anomali()
+
+    spans = get_spans()
+    if not spans:
+        st.info("Belum ada data waktu. Buka beberapa halaman terlebih dahulu.")
+        return
+
+    # ======= RINGKASAN PERSENTIL =======
+    st.header("Persentil Durasi per Halaman dan Tahap")
+    summary = ringkasan(spans)
+    st.dataframe(
+        summary.rename(columns={
+            'page': 'Halaman', 'stage': 'Tahap', 'count': 'Jumlah',
+            'mean': 'Rata-rata (ms)', 'p50': 'p50 (ms)', 'p90': 'p90 (ms)', 'p99': 'p99 (ms)', 'max': 'Maks (ms)'
+        }).style.format({c: "{:,.1f}" for c in ['Rata-rata (ms)', 'p50 (ms)', 'p90 (ms)', 'p99 (ms)', 'Maks (ms)']}),
+        use_container_width=True,
+        hide_index=True
+    )
+
+    render_df = summary[summary['stage'] == 'render']
+    if not render_df.empty:
+        fig = px.bar(
+            render_df,
+            x='page',
+            y=['p50', 'p90', 'p99'],
+            barmode='group',
+            title="Waktu Render per Halaman",
+            labels={'page': 'Halaman', 'value': 'Durasi (ms)', 'variable': 'Persentil'}
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+    # ======= RERUN TERAKHIR =======
+    st.header("Span Rerun Terakhir")
+    df = pd.DataFrame(spans)
+    rerun_ids = df['rerun_id'].dropna().unique()[::-1][:20]
+    if len(rerun_ids) > 0:
+        selected = st.selectbox(
+            "Pilih rerun:",
+            rerun_ids,
+            format_func=lambda r: f"{r} - {df[df['rerun_id'] == r]['page'].iloc[0]}"
+        )
+        detail = df[df['rerun_id'] == selected].drop(columns=['rerun_id'])
+        detail['ts'] = pd.to_datetime(detail['ts'], unit='s')
+        st.dataframe(detail, use_container_width=True, hide_index=True)
+
+    if TRACE_FILE:
+        st.caption(f"Span juga diekspor ke {TRACE_FILE} (JSON lines)")
+    else:
+        st.caption("Set SIDAREJA_TRACE_FILE untuk mengekspor span ke file JSON lines")
+
+    if st.button("Hapus Data Waktu"):
+        clear_spans()
+        st.rerun()
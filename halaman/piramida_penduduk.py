@@ -1,66 +1,168 @@
+import io
+import re
+import hashlib
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
+from instrumentasi import tahap
+from rekonsiliasi import prediksi_kecamatan
+from halaman.kelahiran_kematian import fetch_usia_data
 
-def app():
-    st.header("Piramida Penduduk")
-    # Judul aplikasi
-    st.title("Piramida Penduduk Berdasarkan Jenis Kelamin")
+KOLOM_UPLOAD = ['Usia', 'Laki-laki', 'Perempuan']
+
+@st.cache_data(max_entries=16)
+def parse_workbook(file_hash, _content):
+    """
+    Baca sheet "Piramida" sekali per isi file (cache berdasarkan hash, bukan objek upload).
+    Hasil: DataFrame panjang (id_tahun, kategori_usia, laki_laki, perempuan);
+    kolom opsional 'Tahun' membuat satu piramida per tahun.
+    """
+    data = pd.read_excel(io.BytesIO(_content), sheet_name="Piramida")
+    if not set(KOLOM_UPLOAD).issubset(data.columns):
+        raise ValueError("Sheet 'Piramida' harus memiliki kolom 'Usia', 'Laki-laki', dan 'Perempuan'.")
+    data = data[data['Usia'].astype(str).str.strip().str.lower() != 'total']
+    return pd.DataFrame({
+        'id_tahun': data['Tahun'].astype(int) if 'Tahun' in data.columns else 0,
+        'kategori_usia': data['Usia'].astype(str).str.strip(),
+        'laki_laki': pd.to_numeric(data['Laki-laki'], errors='coerce').fillna(0),
+        'perempuan': pd.to_numeric(data['Perempuan'], errors='coerce').fillna(0)
+    })
+
+@st.cache_data
+def piramida_dari_usia(df_usia, tahun_prediksi):
+    """
+    Gabungkan penduduk_usia historis dengan prediksi yang sudah direkonsiliasi
+    (rekonsiliasi.prediksi_kecamatan), sehingga total piramida tahun prediksi sama
+    dengan dashboard dan halaman kelompok umur
+    """
+    hist = df_usia[['id_tahun', 'kategori_usia', 'laki_laki', 'perempuan']].assign(Type='Historical')
+    if tahun_prediksi <= 0:
+        return hist
+    last_year = df_usia['id_tahun'].max()
+    years = np.arange(last_year + 1, last_year + tahun_prediksi + 1)
+    reconciled = prediksi_kecamatan(years, df_usia=df_usia)
+    groups = sorted({name.split(':')[1] for name in reconciled.index if name.startswith('usia:')})
+    pred = pd.DataFrame({
+        'id_tahun': np.tile(years, len(groups)),
+        'kategori_usia': np.repeat(groups, len(years)),
+        'laki_laki': np.concatenate([reconciled.loc[f'usia:{g}:laki_laki'].to_numpy() for g in groups]),
+        'perempuan': np.concatenate([reconciled.loc[f'usia:{g}:perempuan'].to_numpy() for g in groups]),
+        'Type': 'Predicted'
+    })
+    pred[['laki_laki', 'perempuan']] = pred[['laki_laki', 'perempuan']].clip(lower=0)
+    return pd.concat([hist, pred], ignore_index=True)
+
+def urutan_usia(kategori):
+    """Urutkan kelompok umur berdasarkan angka awalnya ('0-4' < '5-9' < '60+')"""
+    def awal(label):
+        match = re.match(r'\s*(\d+)', str(label))
+        return int(match.group(1)) if match else float('inf')
+    return sorted(kategori, key=awal)
 
-    # Upload file Excel
-    uploaded_file = st.file_uploader("Unggah file Excel", type="xlsx")
+def skala_sumbu(maks, n_ticks=4):
+    """Tick simetris dengan langkah 'bulat' (1, 2, 2.5, 5 x 10^k) yang mencakup nilai terbesar"""
+    if maks <= 0:
+        return [0], ["0"], 1
+    kasar = maks / n_ticks
+    pangkat = 10 ** np.floor(np.log10(kasar))
+    langkah = next(f * pangkat for f in (1, 2, 2.5, 5, 10) if f * pangkat >= kasar)
+    batas = langkah * np.ceil(maks / langkah)
+    positif = np.arange(langkah, batas + langkah / 2, langkah)
+    tickvals = [float(v) for v in np.concatenate([-positif[::-1], [0.0], positif])]
+    ticktext = [f"{abs(v):,.0f}" for v in tickvals]
+    return tickvals, ticktext, float(batas) * 1.05
 
-    if uploaded_file:
-        # Membaca data dari sheet "piramida"
-        data = pd.read_excel(uploaded_file, sheet_name="Piramida")
-        
-        # Pastikan kolom sesuai format
-        if {'Usia', 'Laki-laki', 'Perempuan'}.issubset(data.columns):
-            # Membuat piramida
-            fig = go.Figure()
-            data = data.sort_values(by="Usia", ascending=False)
-             # Filter baris Total
-            non_total_data = data[data["Usia"] != "Total"].copy()  # Baris selain "Total"
-            total_data = data[data["Usia"] == "Total"].copy()  # Baris "Total"
-        
-            # Perbesar data untuk baris selain "Total"
-            non_total_data["Laki-laki"] *= 10
-            non_total_data["Perempuan"] *= 10
+def _bars(frame, kategori):
+    frame = frame.set_index('kategori_usia').reindex(kategori).fillna(0)
+    return [
+        go.Bar(y=kategori, x=-frame['laki_laki'], name='Laki-laki', orientation='h', marker_color='#3498db',
+               customdata=frame['laki_laki'], hovertemplate='%{y}: %{customdata:,.0f}'),
+        go.Bar(y=kategori, x=frame['perempuan'], name='Perempuan', orientation='h', marker_color='#e84393',
+               customdata=frame['perempuan'], hovertemplate='%{y}: %{customdata:,.0f}')
+    ]
+
+def buat_piramida(data, tahun_awal=None):
+    """
+    Figure piramida dengan satu frame animasi per tahun; skala sumbu dihitung
+    dari nilai terbesar semua tahun sehingga tidak berubah saat animasi berjalan.
+    """
+    kategori = urutan_usia(data['kategori_usia'].unique())
+    tickvals, ticktext, batas = skala_sumbu(data[['laki_laki', 'perempuan']].to_numpy().max())
+    years = sorted(data['id_tahun'].unique())
+    tahun_awal = tahun_awal if tahun_awal in years else years[-1]
+    per_tahun = {year: frame for year, frame in data.groupby('id_tahun')}
+    label = {year: f"{year}{' (prediksi)' if 'Type' in frame and (frame['Type'] == 'Predicted').any() else ''}"
+             for year, frame in per_tahun.items()}
+
+    fig = go.Figure(
+        data=_bars(per_tahun[tahun_awal], kategori),
+        frames=[go.Frame(data=_bars(per_tahun[year], kategori), name=str(year)) for year in years]
+    )
+    fig.update_layout(
+        barmode='overlay',
+        bargap=0.1,
+        xaxis=dict(title="Jumlah Penduduk", tickvals=tickvals, ticktext=ticktext, range=[-batas, batas]),
+        yaxis=dict(title="Kelompok Usia", categoryorder='array', categoryarray=kategori),
+        legend=dict(title="Jenis Kelamin"),
+        template="plotly_white"
+    )
+    if len(years) > 1:
+        fig.update_layout(
+            updatemenus=[dict(type='buttons', showactive=False, x=0, y=-0.15, buttons=[
+                dict(label='▶ Putar', method='animate',
+                     args=[None, dict(frame=dict(duration=600, redraw=True), fromcurrent=True)]),
+                dict(label='⏸ Jeda', method='animate',
+                     args=[[None], dict(frame=dict(duration=0, redraw=False), mode='immediate')])
+            ])],
+            sliders=[dict(active=years.index(tahun_awal), x=0.1, len=0.9, y=-0.1, steps=[
+                dict(label=label[year], method='animate',
+                     args=[[str(year)], dict(frame=dict(duration=0, redraw=True), mode='immediate')])
+                for year in years
+            ])]
+        )
+    return fig
+
+def app():
+    st.title("Piramida Penduduk Berdasarkan Jenis Kelamin")
+    st.markdown("---")
 
-            # Menggabungkan kembali data
-            processed_data = pd.concat([non_total_data, total_data])
-    
-            # Bar untuk laki-laki (negatif agar arah ke kiri)
-            fig.add_trace(go.Bar(
-                y=processed_data["Usia"], 
-                x=-processed_data["Laki-laki"], 
-                name="Laki-laki", 
-                orientation='h',
-                marker_color='blue'
-            ))
+    sumber = st.radio("Sumber data:", ["Data penduduk per kelompok umur", "Unggah file Excel"], horizontal=True)
 
-            # Bar untuk perempuan
-            fig.add_trace(go.Bar(
-                y=processed_data["Usia"], 
-                x=processed_data["Perempuan"], 
-                name="Perempuan", 
-                orientation='h',
-                marker_color='pink'
-            ))
+    if sumber == "Unggah file Excel":
+        uploaded_file = st.file_uploader("Unggah file Excel (sheet 'Piramida')", type="xlsx")
+        if not uploaded_file:
+            st.stop()
+        content = uploaded_file.getvalue()
+        try:
+            data = parse_workbook(hashlib.sha256(content).hexdigest(), content)
+        except ValueError as e:
+            st.error(str(e))
+            st.stop()
+    else:
+        df_usia = fetch_usia_data()
+        if df_usia.empty:
+            st.warning("Tidak ada data yang ditemukan!")
+            st.stop()
+        tahun_prediksi = st.slider("Tambahkan tahun prediksi", 0, 10, 3)
+        data = piramida_dari_usia(df_usia, tahun_prediksi)
 
-            # Layout piramida
-            fig.update_layout(
-                title="Piramida Penduduk Berdasarkan Jenis Kelamin",
-                barmode='overlay',
-                xaxis=dict(title="Jumlah Penduduk", tickvals=[-500, -250, 0, 250, 500],
-                        ticktext=["500", "250", "0", "250", "500"]),
-                yaxis=dict(title="Kelompok Usia"),
-                legend=dict(title="Jenis Kelamin"),
-                template="plotly_white",
-            )
+    tahap("chart")
+    years = sorted(data['id_tahun'].unique())
+    tahun = years[-1]
+    if len(years) > 1:
+        tahun = st.select_slider("Tahun", options=years, value=years[-1])
+    st.plotly_chart(buat_piramida(data, tahun), use_container_width=True)
 
-            # Tampilkan grafik di Streamlit
-            st.plotly_chart(fig)
+    tahap("table")
+    frame = data[data['id_tahun'] == tahun]
+    cols = st.columns(3)
+    with cols[0]:
+        st.metric("Laki-laki", f"{frame['laki_laki'].sum():,.0f}")
+    with cols[1]:
+        st.metric("Perempuan", f"{frame['perempuan'].sum():,.0f}")
+    with cols[2]:
+        st.metric("Total", f"{frame[['laki_laki', 'perempuan']].to_numpy().sum():,.0f}")
 
-        else:
-            st.error("Sheet 'piramida' harus memiliki kolom 'Usia', 'Laki-laki', dan 'Perempuan'.")
+    st.markdown("---")
+    st.caption("© 2025 - Yudith Nico Priambodo")
@@ -0,0 +1,106 @@
+import streamlit as st
+import plotly.graph_objects as go
+from instrumentasi import tahap
+from repositori import muat_tabel
+from kohort import KELOMPOK_USIA
+from simulasi import simulasi_skenario, ringkas_persentil
+from halaman.kelahiran_kematian import fetch_usia_data, fetch_migrasi_data
+
+@st.cache_data
+def hitung_skenario(df_usia, df_migrasi, tahun, paths, faktor_migrasi, faktor_fertilitas, faktor_mortalitas):
+    """Simulasi Monte Carlo untuk satu kombinasi skenario, hasilnya pita persentil"""
+    years, hasil = simulasi_skenario(
+        df_usia, df_migrasi, tahun=tahun, paths=paths, faktor_migrasi=faktor_migrasi,
+        faktor_fertilitas=faktor_fertilitas, faktor_mortalitas=faktor_mortalitas
+    )
+    return ringkas_persentil(years, hasil)
+
+def fan_chart(hist, ringkas, warna):
+    """Grafik historis + median dengan pita persentil 5-95 dan 25-75"""
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=ringkas['id_tahun'], y=ringkas['p95'], line=dict(width=0), showlegend=False, hoverinfo='skip'))
+    fig.add_trace(go.Scatter(x=ringkas['id_tahun'], y=ringkas['p5'], fill='tonexty', line=dict(width=0),
+                             fillcolor=f'rgba({warna}, 0.15)', name='Persentil 5-95'))
+    fig.add_trace(go.Scatter(x=ringkas['id_tahun'], y=ringkas['p75'], line=dict(width=0), showlegend=False, hoverinfo='skip'))
+    fig.add_trace(go.Scatter(x=ringkas['id_tahun'], y=ringkas['p25'], fill='tonexty', line=dict(width=0),
+                             fillcolor=f'rgba({warna}, 0.35)', name='Persentil 25-75'))
+    fig.add_trace(go.Scatter(x=ringkas['id_tahun'], y=ringkas['p50'], mode='lines',
+                             line=dict(color=f'rgb({warna})', width=3, dash='dash'), name='Median'))
+    fig.add_trace(go.Scatter(x=hist['id_tahun'], y=hist['total'], mode='lines+markers',
+                             line=dict(color=f'rgb({warna})', width=3), name='Historical'))
+    fig.update_layout(xaxis_title='Tahun', yaxis_title='Jumlah Penduduk', hovermode='x unified')
+    return fig
+
+def app():
+    st.title("Simulasi Skenario Penduduk")
+    st.markdown("---")
+
+    # Kedua tabel diambil bersamaan ke cache Arrow sebelum fetch per tabel
+    muat_tabel("penduduk_usia", "migrasi")
+    df_usia = fetch_usia_data()
+    df_migrasi = fetch_migrasi_data()
+    if df_usia.empty or not set(KELOMPOK_USIA).issubset(df_usia['kategori_usia'].unique()):
+        st.warning("Data penduduk per kelompok umur (0-14, 15-60, 60+) tidak lengkap!")
+        st.stop()
+
+    # ======= PARAMETER SKENARIO =======
+    cols = st.columns(3)
+    with cols[0]:
+        faktor_migrasi = st.slider("Migrasi neto (x kali kondisi sekarang)", 0.0, 3.0, 1.0, 0.25)
+    with cols[1]:
+        kelahiran = st.slider("Perubahan angka kelahiran (%)", -50, 50, 0, 5)
+    with cols[2]:
+        kematian = st.slider("Perubahan angka kematian (%)", -50, 50, 0, 5)
+    cols = st.columns(2)
+    with cols[0]:
+        tahun = st.slider("Lama proyeksi (tahun)", 5, 50, 30, 5)
+    with cols[1]:
+        paths = st.select_slider("Jumlah simulasi", options=[1000, 5000, 10000, 20000], value=10000)
+
+    ringkas = hitung_skenario(
+        df_usia, df_migrasi, tahun, paths,
+        faktor_migrasi, 1 + kelahiran / 100, 1 + kematian / 100
+    )
+
+    total = ringkas[ringkas['kategori_usia'] == 'Total']
+    akhir = total.iloc[-1]
+    cols = st.columns(3)
+    with cols[0]:
+        st.metric(f"Median {int(akhir['id_tahun'])}", f"{akhir['p50']:,.0f}")
+    with cols[1]:
+        st.metric("Persentil 5", f"{akhir['p5']:,.0f}")
+    with cols[2]:
+        st.metric("Persentil 95", f"{akhir['p95']:,.0f}")
+
+    # ======= VISUALIZATION =======
+    tahap("chart")
+    st.header("Total Penduduk")
+    hist_total = df_usia.groupby('id_tahun', as_index=False)['total'].sum()
+    st.plotly_chart(fan_chart(hist_total, total, '52, 152, 219'), use_container_width=True)
+
+    st.header("Per Kelompok Umur")
+    warna = {'0-14': '52, 152, 219', '15-60': '46, 204, 113', '60+': '231, 76, 60'}
+    selected_group = st.selectbox("Pilih Kelompok Umur:", KELOMPOK_USIA)
+    st.plotly_chart(
+        fan_chart(df_usia[df_usia['kategori_usia'] == selected_group],
+                  ringkas[ringkas['kategori_usia'] == selected_group], warna[selected_group]),
+        use_container_width=True
+    )
+
+    tahap("table")
+    st.header("Tabel Persentil")
+    tabel = ringkas.pivot(index='id_tahun', columns='kategori_usia', values=['p5', 'p50', 'p95'])
+    tabel.columns = [f"{kel} {p.upper()}" for p, kel in tabel.columns]
+    st.dataframe(
+        tabel.reset_index().rename(columns={'id_tahun': 'Tahun'}).style.format(
+            {col: "{:,.0f}" for col in tabel.columns}
+        ),
+        use_container_width=True,
+        hide_index=True
+    )
+
+    st.write("*Setiap simulasi memberi guncangan acak pada kelahiran, kematian dan migrasi neto per tahun "
+             "(migrasi mengikuti variasi historis). Pita menunjukkan rentang hasil dari seluruh simulasi.")
+
+    st.markdown("---")
+    st.caption("© 2025 - Yudith Nico Priambodo")
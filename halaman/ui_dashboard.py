@@ -4,7 +4,11 @@ import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from supabase import create_client, Client
-from model import fetch_data, train_svm_model, predict_population
+from model import fetch_data, predict_population
+from instrumentasi import tahap
+from indikator import tambah_perubahan
+from model_store import get_model
+from rekonsiliasi import prediksi_kecamatan
 import os
 
 # Koneksi ke Supabase
@@ -23,19 +27,18 @@ def app():
     
     # Calculate jumlah_penduduks and changes
     df['Jumlah Penduduk'] = df['laki_laki'] + df['perempuan']
-    df["% Perubahan Laki_laki"] = df["laki_laki"].pct_change() * 100
-    df["% Perubahan Perempuan"] = df["perempuan"].pct_change() * 100
-    df["% Perubahan Jumlah Penduduk"] = df["jumlah_penduduk"].pct_change() * 100
+    # % perubahan tahunan sudah dihitung di tabel indikator
+    tambah_perubahan(df, {
+        "laki_laki": "% Perubahan Laki_laki",
+        "perempuan": "% Perubahan Perempuan",
+        "jumlah_penduduk": "% Perubahan Jumlah Penduduk"
+    })
     
     # Train model for each category
     models = {}
     metrics = {}
     for target in ['laki_laki', 'perempuan', 'jumlah_penduduk']:
-        model, mae, mape, r2 = train_svm_model(
-            table_name="penduduk_tahunan",
-            feature_columns=["id_tahun"],
-            target_column=target
-        )
+        model, mae, mape, r2 = get_model("penduduk_tahunan", target, df)
         models[target] = model
         metrics[target] = {'MAPE': mape, 'R²': r2}
 
@@ -43,10 +46,13 @@ def app():
     last_year = df['id_tahun'].max()
     next_years = np.array([last_year + 1, last_year + 2, last_year + 3]).reshape(-1, 1)  # 3 tahun prediksi
 
-    # Mendapatkan prediksi untuk 3 tahun
+    # Prediksi jenis kelamin, kelompok umur dan desa direkonsiliasi bersama sehingga
+    # total = laki-laki + perempuan = jumlah kelompok umur = jumlah desa
+    reconciled = prediksi_kecamatan(next_years, df_tahunan=df)
     predictions = {
-        'laki_laki': models['laki_laki'].predict(next_years),
-        'perempuan': models['perempuan'].predict(next_years)
+        'laki_laki': reconciled.loc['laki_laki'].to_numpy(),
+        'perempuan': reconciled.loc['perempuan'].to_numpy(),
+        'jumlah_penduduk': reconciled.loc['jumlah_penduduk'].to_numpy()
     }
 
     # Menghitung perubahan persentase
@@ -54,7 +60,7 @@ def app():
     changes = {
         'laki_laki': (predictions['laki_laki'] - last_values['laki_laki']) / last_values['laki_laki'] * 100,
         'perempuan': (predictions['perempuan'] - last_values['perempuan']) / last_values['perempuan'] * 100,
-        'jumlah_penduduk': ((predictions['laki_laki'] + predictions['perempuan']) - last_values['jumlah_penduduk']) / last_values['jumlah_penduduk'] * 100
+        'jumlah_penduduk': (predictions['jumlah_penduduk'] - last_values['jumlah_penduduk']) / last_values['jumlah_penduduk'] * 100
     }
 
     # ======= PREDICTION DISPLAY =======
@@ -97,21 +103,22 @@ def app():
     with cols[2]:
         st.metric(
             f"Total Penduduk {last_year+1}",
-            f"{predictions['laki_laki'][0] + predictions['perempuan'][0]:,.0f}",
+            f"{predictions['jumlah_penduduk'][0]:,.0f}",
             delta=f"{changes['jumlah_penduduk'][0]:+.1f}%"
         )
         st.metric(
             f"Total Penduduk {last_year+2}",
-            f"{predictions['laki_laki'][1] + predictions['perempuan'][1]:,.0f}",
+            f"{predictions['jumlah_penduduk'][1]:,.0f}",
             delta=f"{changes['jumlah_penduduk'][1]:+.1f}%"
         )
         st.metric(
             f"Total Penduduk {last_year+3}",
-            f"{predictions['laki_laki'][2] + predictions['perempuan'][2]:,.0f}",
+            f"{predictions['jumlah_penduduk'][2]:,.0f}",
             delta=f"{changes['jumlah_penduduk'][2]:+.1f}%"
         )
 
     # ======= VISUALIZATION =======
+    tahap("chart")
     viz_df = df.tail(8).copy()
     viz_df['Type'] = 'Historical'
 
@@ -120,7 +127,7 @@ def app():
         'id_tahun': next_years.flatten(),
         'laki_laki': predictions['laki_laki'],
         'perempuan': predictions['perempuan'],
-        'jumlah_penduduk': predictions['laki_laki'] + predictions['perempuan'],
+        'jumlah_penduduk': predictions['jumlah_penduduk'],
         'Type': ['Predicted'] * 3
     })
 
@@ -190,6 +197,7 @@ def app():
     st.plotly_chart(fig_line, use_container_width=True)
     
     # ======= DETAIL TABLE =======
+    tahap("table")
     st.header("Data Historis")
 
     # Define all possible columns we might want to display
@@ -207,17 +215,14 @@ def app():
         st.error("No valid population data columns found in the DataFrame!")
         return
 
-    # Calculate percentage changes only for columns that exist
-    if "laki_laki" in df.columns:
-        df["% Perubahan Laki_laki"] = df["laki_laki"].pct_change() * 100
+    # Percentage changes (from the indicator table) only for columns that exist
+    if "% Perubahan Laki_laki" in df.columns:
         available_cols["% Perubahan Laki_laki"] = "% Δ Laki-laki"
 
-    if "perempuan" in df.columns:
-        df["% Perubahan Perempuan"] = df["perempuan"].pct_change() * 100
+    if "% Perubahan Perempuan" in df.columns:
         available_cols["% Perubahan Perempuan"] = "% Δ Perempuan"
 
-    if "jumlah_penduduk" in df.columns:
-        df["% Perubahan Jumlah Penduduk"] = df["jumlah_penduduk"].pct_change() * 100
+    if "% Perubahan Jumlah Penduduk" in df.columns:
         available_cols["% Perubahan Jumlah Penduduk"] = "% Δ Total"
 
     # Create the display DataFrame with only available columns
@@ -273,7 +278,19 @@ def app():
         hide_index=True
     )
     
+    # MAPE backtest per horizon (1, 2, 3 tahun ke depan) sesuai prediksi yang ditampilkan
+    horizon_rows = []
+    for target, model in models.items():
+        horizons = getattr(model, 'backtest_', {}).get('horizons', {})
+        row = {'Kategori': target, 'Engine': getattr(model, 'engine_', 'svr')}
+        for h, scores in horizons.items():
+            row[f'MAPE +{h} tahun'] = f"{scores['mape']:,.1f}%"
+        horizon_rows.append(row)
+    if any(len(row) > 2 for row in horizon_rows):
+        st.dataframe(pd.DataFrame(horizon_rows), use_container_width=True, hide_index=True)
+
     st.write("*MAPE (Mean Absolute Precentage Error) : Rata - rata presentase dibandingkan dengan nilai aslinya. " \
+    "Dihitung dari backtest: model dilatih dengan data sampai tahun tertentu lalu diuji pada 1-3 tahun berikutnya. " \
     "Semakin kecil MAPE semakin akurat model")
     st.write("*R-squared : Mengukur seberapa baik model menjelaskan variasi data. " \
     "Semakin mendekati angka 1 semakin baik model menjelaskan variasi data")
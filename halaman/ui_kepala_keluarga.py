@@ -3,7 +3,10 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
-from model import fetch_data, train_svm_model, predict_population
+from model import fetch_data, predict_population
+from instrumentasi import tahap
+from indikator import tambah_perubahan
+from model_store import get_model
 
 def style_negative_positive(val):
     if not isinstance(val, str) or len(val) == 0:
@@ -29,19 +32,17 @@ def app():
     
     # Calculate jumlah_kepala_keluargas and changes
     df['jumlah_kepala_keluarga'] = df['pria'] + df['wanita']
-    df["% Perubahan Pria"] = df["pria"].pct_change() * 100
-    df["% Perubahan Wanita"] = df["wanita"].pct_change() * 100
-    df["% Perubahan jumlah_kepala_keluarga"] = df["jumlah_kepala_keluarga"].pct_change() * 100
+    tambah_perubahan(df, {
+        "pria": "% Perubahan Pria",
+        "wanita": "% Perubahan Wanita",
+        "jumlah_kepala_keluarga": "% Perubahan jumlah_kepala_keluarga"
+    })
     
     # Train model for each category
     models = {}
     metrics = {}
     for target in ['pria', 'wanita', 'jumlah_kepala_keluarga']:
-        model, mae, mape, r2 = train_svm_model(
-            table_name="keluarga",
-            feature_columns=["id_tahun"],
-            target_column=target
-        )
+        model, mae, mape, r2 = get_model("keluarga", target, df)
         models[target] = model
         metrics[target] = {'MAPE': mape, 'R²': r2}
 
@@ -118,6 +119,7 @@ def app():
         )
 
     # ======= VISUALIZATION =======
+    tahap("chart")
     viz_df = df.tail(8).copy()
     viz_df['Type'] = 'Historical'
 
@@ -177,6 +179,7 @@ def app():
     st.plotly_chart(fig_bar, use_container_width=True)
     
     # ======= HISTORICAL DATA TABLE =======
+    tahap("table")
     st.header("Data Historis")
     
     # Format the historical data
@@ -3,7 +3,11 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
-from model import fetch_data, train_svm_model, predict_population
+from model import fetch_data, predict_population
+from instrumentasi import tahap
+from indikator import tambah_perubahan
+from model_store import get_model
+from arrow_store import get_table, persen_perubahan, tampilkan_tabel
 
 def app():
     st.title("Prediksi Migrasi Penduduk")
@@ -17,18 +21,13 @@ def app():
     ).sort_values("id_tahun")
     
     # Hitung perubahan
-    df["% Perubahan Masuk"] = df["migrasi_masuk"].pct_change() * 100
-    df["% Perubahan Keluar"] = df["migrasi_keluar"].pct_change() * 100
+    tambah_perubahan(df, {"migrasi_masuk": "% Perubahan Masuk", "migrasi_keluar": "% Perubahan Keluar"})
     
     # Train model untuk kedua kategori
     models = {}
     metrics = {}
     for target in ['migrasi_masuk', 'migrasi_keluar']:
-        model, mae, mape, r2 = train_svm_model(
-            table_name="migrasi",
-            feature_columns=["id_tahun"],
-            target_column=target
-        )
+        model, mae, mape, r2 = get_model("migrasi", target, df)
         models[target] = model
         metrics[target] = {'MAPE': mape, 'R²': r2}
     
@@ -86,6 +85,7 @@ def app():
         )
     
     # ======= VISUALIZATION =======
+    tahap("chart")
     st.header("Trend Historis & Prediksi")
     
     # Siapkan data untuk visualisasi
@@ -158,45 +158,26 @@ def app():
     st.plotly_chart(fig, use_container_width=True)
     
     # ======= TABEL DETAIL =======
+    tahap("table")
     st.header("Detail Data Historis")
     
-    # Format tabel
-    display_df = df.rename(columns={
-        "id_tahun": "Tahun",
-        "migrasi_masuk": "Migrasi Masuk",
-        "% Perubahan Masuk": "% Δ Masuk",
-        "migrasi_keluar": "Migrasi Keluar", 
-        "% Perubahan Keluar": "% Δ Keluar"
-    })
-    
-    # Konversi ke string dengan format yang tepat
-    display_df['Tahun'] = display_df['Tahun'].astype(str)  # Pastikan tahun sebagai string
-    display_df['Migrasi Masuk'] = display_df['Migrasi Masuk'].apply(lambda x: f"{int(x):,}")
-    display_df['Migrasi Keluar'] = display_df['Migrasi Keluar'].apply(lambda x: f"{int(x):,}")
-    display_df['% Δ Masuk'] = display_df['% Δ Masuk'].apply(lambda x: f"{x:+.1f}%" if pd.notnull(x) else "")
-    display_df['% Δ Keluar'] = display_df['% Δ Keluar'].apply(lambda x: f"{x:+.1f}%" if pd.notnull(x) else "")
-    
-    # Fungsi styling khusus
-    def style_negative_positive(val):
-        if not isinstance(val, str) or len(val) == 0:
-            return ''
-        if (val.startswith('+') or val[0].isdigit()) and '%' in val:
-            color = '#2ecc71'  # Hijau untuk positif
-        elif val.startswith('-') and '%' in val:
-            color = '#e74c3c'  # Merah untuk negatif
-        else:
-            return ''
-        return f'color: {color}'
-    
-    # Terapkan styling
-    styled_df = (
-        display_df.style
-        .map(style_negative_positive, subset=["% Δ Masuk", "% Δ Keluar"])
-        .format(None, na_rep="")  # Handle nilai kosong
-    )
-    
-    st.dataframe(
-        styled_df,
+    # Tabel historis langsung dari cache Arrow; format angka lewat column_config
+    hist_table = persen_perubahan(
+        get_table("migrasi", ["id_tahun", "migrasi_masuk", "migrasi_keluar"]).sort_by("id_tahun"),
+        ["migrasi_masuk", "migrasi_keluar"],
+        ["% Δ Masuk", "% Δ Keluar"]
+    ).rename_columns(["Tahun", "Migrasi Masuk", "Migrasi Keluar", "% Δ Masuk", "% Δ Keluar"])
+
+    tampilkan_tabel(
+        hist_table,
+        name="migrasi",
+        column_config={
+            "Tahun": st.column_config.NumberColumn(format="%d"),
+            "Migrasi Masuk": st.column_config.NumberColumn(format="%d"),
+            "Migrasi Keluar": st.column_config.NumberColumn(format="%d"),
+            "% Δ Masuk": st.column_config.NumberColumn(format="%+.1f%%"),
+            "% Δ Keluar": st.column_config.NumberColumn(format="%+.1f%%")
+        },
         use_container_width=True,
         hide_index=True
     )
@@ -3,7 +3,14 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-from model import fetch_data, train_svm_model, predict_population
+from model import fetch_data, predict_population
+from instrumentasi import tahap
+from repositori import muat_tabel
+from model_store import train_table_models
+from perubahan import subscribe
+from rekonsiliasi import prediksi_kecamatan
+from kohort import KELOMPOK_USIA
+from halaman.kelahiran_kematian import fetch_migrasi_data, hitung_proyeksi_kohort
 
 @st.cache_data
 def fetch_population_data():
@@ -34,10 +41,18 @@ def fetch_population_data():
         st.error(f"Gagal mengambil data: {str(e)}")
         return pd.DataFrame()
 
+@subscribe
+def _invalidate_cache(table, op, rows):
+    """Data penduduk_usia di-cache, jadi buang cache setiap kali tabelnya diubah"""
+    if table == "penduduk_usia":
+        fetch_population_data.clear()
+
 def app():
     st.title("Prediksi Jumlah Penduduk per Kelompok Umur")
     st.markdown("---")
     
+    # Kedua tabel diambil bersamaan ke cache Arrow sebelum fetch per tabel
+    muat_tabel("penduduk_usia", "migrasi")
     # Load data dengan caching
     df = fetch_population_data()
     if df.empty:
@@ -62,32 +77,20 @@ def app():
     models = {}
     metrics = {}
     
+    # Model semua kelompok diambil dari model store (dilatih hanya bila datanya berubah)
+    table_models = train_table_models("penduduk_usia", df, ['total', 'laki_laki', 'perempuan'], group_by='kategori_usia')
+    
     for group in age_groups:
-        # Filter data for the current age group
-        group_data = df[df['kategori_usia'] == group]
-        
-        if len(group_data) < 2:
+        if (group, 'total') not in table_models:
             st.warning(f"Data tidak cukup untuk kelompok {group}")
             continue
         
         # Train models
-        model_total, mae_total, mape_total, r2_total = train_svm_model(
-            feature_columns=['id_tahun'],
-            target_column='total',
-            data=group_data
-        )
+        model_total, mae_total, mape_total, r2_total = table_models[(group, 'total')]
         
-        model_laki, mae_laki, mape_laki, r2_laki = train_svm_model(
-            feature_columns=['id_tahun'],
-            target_column='laki_laki',
-            data=group_data
-        )
+        model_laki, mae_laki, mape_laki, r2_laki = table_models[(group, 'laki_laki')]
         
-        model_perempuan, mae_perempuan, mape_perempuan, r2_perempuan = train_svm_model(
-            feature_columns=['id_tahun'],
-            target_column='perempuan',
-            data=group_data
-        )
+        model_perempuan, mae_perempuan, mape_perempuan, r2_perempuan = table_models[(group, 'perempuan')]
         
         models[group] = {
             'total': model_total,
@@ -108,15 +111,38 @@ def app():
     last_year = df['id_tahun'].max()
     next_years = np.array([last_year + 1, last_year + 2, last_year + 3]).reshape(-1, 1)
     
+    # Mode alternatif: proyeksi kohort-komponen (penuaan, kelahiran, kematian, migrasi) untuk semua kelompok sekaligus
+    metode_options = ["SVR per kelompok"]
+    if set(KELOMPOK_USIA).issubset(age_groups):
+        metode_options.append("Kohort-komponen")
+    metode = st.radio("Metode prediksi:", metode_options, horizontal=True)
+    pred_kohort = None
+    if metode == "Kohort-komponen":
+        kohort_df, _ = hitung_proyeksi_kohort(
+            df[['id_tahun', 'kategori_usia', 'laki_laki', 'perempuan', 'total']], fetch_migrasi_data(), len(next_years)
+        )
+        pred_kohort = {
+            group: {col: part[col].to_numpy() for col in ['total', 'laki_laki', 'perempuan']}
+            for group, part in kohort_df.sort_values('id_tahun').groupby('kategori_usia')
+        }
+
+    # Prediksi semua kelompok (SVR atau kohort) direkonsiliasi bersama prediksi kecamatan dan desa
+    # (total = laki-laki + perempuan, jumlah kelompok = total kecamatan)
+    reconciled = prediksi_kecamatan(next_years, df_usia=df, pred_usia=pred_kohort)
+    reconciled = reconciled[reconciled.index.str.startswith('usia:')].rename(index=lambda name: name[len('usia:'):])
+    if pred_kohort is not None:
+        st.info("Proyeksi kohort telah direkonsiliasi dengan total kecamatan di dashboard, "
+                "sehingga jumlah semua kelompok umur sama dengan total tersebut.")
+
     pred_data = []
     for group in age_groups:
         if group not in models:
             continue
             
         # Get predictions
-        pred_total = models[group]['total'].predict(next_years)
-        pred_laki = models[group]['laki_laki'].predict(next_years)
-        pred_perempuan = models[group]['perempuan'].predict(next_years)
+        pred_total = reconciled.loc[f'{group}:total'].to_numpy()
+        pred_laki = reconciled.loc[f'{group}:laki_laki'].to_numpy()
+        pred_perempuan = reconciled.loc[f'{group}:perempuan'].to_numpy()
         
         # Get last historical values
         filtered_df = df[(df['id_tahun'] == last_year) & (df['kategori_usia'] == group)]
@@ -187,6 +213,7 @@ def app():
             )
     
     # Combined visualization for all age groups
+    tahap("chart")
     st.header("Trend Historis & Prediksi per Kelompok Umur")
 
     # Prepare data for visualization - group by age categories
@@ -264,6 +291,7 @@ def app():
     st.plotly_chart(fig, use_container_width=True)
 
     # Display prediction table
+    tahap("table")
     st.header("Tabel Prediksi Detail")
     
     def format_value(x, is_pct=False):
@@ -300,8 +328,12 @@ def app():
     st.write("*% Δ Perempuan : presentase perubahan jumlah perempuan dari data sebelumnya")
     st.write("*% Δ Total : presentase perubahan jumlah penduduk (laki-laki dan perempuan) dari data sebelumnya")
 
-    # Model performance table
-    st.header("Model Prediksi Berdasarkan MAPE dan R²")
+    # Model performance table (metrik backtest model SVR per kelompok)
+    if pred_kohort is None:
+        st.header("Model Prediksi Berdasarkan MAPE dan R²")
+    else:
+        st.header("Pembanding: Model SVR per Kelompok (MAPE dan R²)")
+        st.caption("Metrik di bawah milik model SVR per kelompok, bukan proyeksi kohort yang ditampilkan di atas.")
 
     perf_df = pd.DataFrame([
         {
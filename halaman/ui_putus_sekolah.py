@@ -3,7 +3,10 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
-from model import fetch_data, train_svm_model, predict_population
+from model import fetch_data, predict_population
+from instrumentasi import tahap
+from indikator import tambah_perubahan
+from model_store import get_model
 
 def app():
     st.title("Analisis & Prediksi Anak Putus Sekolah")
@@ -17,17 +20,13 @@ def app():
     ).sort_values("id_tahun")
     
     # Hitung perubahan
-    df["% Perubahan"] = df["jumlah_putus_sekolah"].pct_change() * 100
+    tambah_perubahan(df, {"jumlah_putus_sekolah": "% Perubahan"})
     
     # ======= MODEL TRAINING =======
     st.header("Prediksi 3 Tahun ke Depan")
     
     # Train model
-    model, mae, mape, r2 = train_svm_model(
-        table_name="putus_sekolah",
-        feature_columns=["id_tahun"],
-        target_column="jumlah_putus_sekolah"
-    )
+    model, mae, mape, r2 = get_model("putus_sekolah", "jumlah_putus_sekolah", df)
     
     # ======= PREDICTION LOGIC =======
     last_year = df['id_tahun'].max()
@@ -64,6 +63,7 @@ def app():
         )
     
     # ======= VISUALIZATION =======
+    tahap("chart")
     st.header("Trend Historis & Prediksi")
     
     # Siapkan data untuk visualisasi
@@ -115,6 +115,7 @@ def app():
     st.plotly_chart(fig, use_container_width=True)
     
         # ======= TABEL DETAIL =======
+    tahap("table")
     st.header("Detail Data Historis")
 
     # Format tabel
@@ -0,0 +1,92 @@
+import streamlit as st
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+from instrumentasi import tahap
+from ikhtisar import ambil_indikator, prakiraan_utama, data_tabel, SERI_UTAMA, HORIZON
+
+def grafik_ringkasan(wide, hasil):
+    """Grafik kecil per seri: historis (garis) dan prediksi (titik-titik)"""
+    ncols = 3
+    nrows = -(-len(SERI_UTAMA) // ncols)
+    fig = make_subplots(rows=nrows, cols=ncols, subplot_titles=[label for label, *_ in SERI_UTAMA],
+                        vertical_spacing=0.12, horizontal_spacing=0.08)
+    per_label = {h['label']: h for h in hasil}
+    for i, (label, table, target, group) in enumerate(SERI_UTAMA):
+        row, col = i // ncols + 1, i % ncols + 1
+        hist = data_tabel(wide, table, group)
+        fig.add_trace(go.Scatter(x=hist['id_tahun'], y=hist[target], mode='lines', line=dict(color='#3498db'),
+                                 name=label, showlegend=False), row=row, col=col)
+        h = per_label.get(label, {})
+        if h.get('status') == 'ok':
+            fig.add_trace(go.Scatter(x=[h['last_year'], *h['years']], y=[h['last_value'], *h['forecast']],
+                                     mode='lines+markers', line=dict(color='#e74c3c', dash='dot'),
+                                     name=f"{label} (prediksi)", showlegend=False), row=row, col=col)
+    fig.update_layout(height=260 * nrows, margin=dict(t=40, b=20), template="plotly_white")
+    return fig
+
+def app():
+    st.title("Ringkasan Kecamatan Sidareja")
+    st.markdown("---")
+
+    try:
+        wide = ambil_indikator()
+    except Exception as e:
+        st.error(f"Gagal mengambil data: {str(e)}")
+        st.stop()
+
+    hasil = prakiraan_utama(wide)
+
+    # ======= PREDIKSI UTAMA =======
+    st.header(f"Prediksi {HORIZON} Tahun ke Depan")
+    cols = st.columns(3)
+    for i, h in enumerate(hasil):
+        with cols[i % 3]:
+            if h['status'] == 'ok':
+                st.metric(
+                    f"{h['label']} {h['years'][-1]}",
+                    f"{h['forecast'][-1]:,.0f}",
+                    delta=f"{h['change']:+.1f}% dari {h['last_year']}"
+                )
+            elif h['status'] == 'dilatih':
+                st.metric(h['label'], "…", help="Model sedang dilatih")
+            else:
+                st.metric(h['label'], "-", help="Data tidak cukup untuk prediksi")
+
+    pending = [h['label'] for h in hasil if h['status'] == 'dilatih']
+    if pending:
+        st.info(f"Model untuk {', '.join(pending)} masih dilatih. Muat ulang halaman beberapa saat lagi.")
+
+    # ======= VISUALIZATION =======
+    tahap("chart")
+    st.plotly_chart(grafik_ringkasan(wide, hasil), use_container_width=True)
+
+    # ======= TABEL =======
+    tahap("table")
+    st.header("Tabel Prediksi")
+    rows = []
+    for h in hasil:
+        if h['status'] != 'ok':
+            continue
+        row = {'Indikator': h['label'], f"Aktual {h['last_year']}": h['last_value']}
+        row.update({f"Prediksi {year}": value for year, value in zip(h['years'], h['forecast'])})
+        row.update({'Perubahan (%)': h['change'], 'MAPE (%)': h['mape'], 'Engine': h['engine']})
+        rows.append(row)
+    if rows:
+        tabel = pd.DataFrame(rows)
+        angka = [col for col in tabel.columns if col.startswith(('Aktual', 'Prediksi'))]
+        st.dataframe(
+            tabel,
+            column_config={
+                **{col: st.column_config.NumberColumn(format="%.0f") for col in angka},
+                'Perubahan (%)': st.column_config.NumberColumn(format="%+.1f"),
+                'MAPE (%)': st.column_config.NumberColumn(format="%.2f"),
+            },
+            use_container_width=True,
+            hide_index=True
+        )
+
+    st.write("*Semua indikator diambil dalam satu request; prediksi memakai model yang sama dengan halaman masing-masing.")
+
+    st.markdown("---")
+    st.caption("© 2025 - Yudith Nico Priambodo")
@@ -3,7 +3,10 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
-from model import fetch_data, train_svm_model, predict_population
+from model import fetch_data, predict_population
+from instrumentasi import tahap
+from indikator import tambah_perubahan
+from model_store import get_model
 
 def app():
     st.title("Prediksi Status Perkawinan")
@@ -17,18 +20,13 @@ def app():
     ).sort_values("id_tahun")
     
     # Hitung perubahan
-    df["% Perubahan Kawin"] = df["status_kawin"].pct_change() * 100
-    df["% Perubahan Cerai"] = df["cerai_hidup"].pct_change() * 100
+    tambah_perubahan(df, {"status_kawin": "% Perubahan Kawin", "cerai_hidup": "% Perubahan Cerai"})
     
     # Train model untuk kedua kategori
     models = {}
     metrics = {}
     for target in ['status_kawin', 'cerai_hidup']:
-        model, mae, mape, r2 = train_svm_model(
-            table_name="status_perkawinan",
-            feature_columns=["id_tahun"],
-            target_column=target
-        )
+        model, mae, mape, r2 = get_model("status_perkawinan", target, df)
         models[target] = model
         metrics[target] = {'MAPE': mape, 'R²': r2}
     
@@ -86,6 +84,7 @@ def app():
         )
     
     # ======= VISUALIZATION =======
+    tahap("chart")
     st.header("Trend Historis & Prediksi")
     
     # Siapkan data untuk visualisasi
@@ -145,6 +144,7 @@ def app():
     st.plotly_chart(fig_bar, use_container_width=True)
     
     # ======= TABEL DETAIL =======
+    tahap("table")
     st.header("Detail Data Historis")
     
     # Format tabel
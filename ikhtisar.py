@@ -0,0 +1,171 @@
+"""
+Data dan prediksi untuk halaman Ringkasan kecamatan.
+
+Semua indikator tahunan diambil dalam satu request dari view
+`indikator_tahunan` (lihat sql/indikator_tahunan.sql). Jika view belum dibuat,
+keenam tabel diambil bersamaan lewat repositori dan digabung di sini dengan
+kolom yang sama. Prediksi memakai model_store (model yang sama dengan halaman
+per tabel) dan dihitung paralel dalam batas waktu RENDER_BUDGET.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import numpy as np
+
+from arrow_store import get_table, to_pandas, invalidate
+from instrumentasi import timed, span
+from logging_setup import get_logger
+from artefak import prakiraan_atau_latih
+from model_store import MODEL_SPECS, FEATURE_COLUMNS
+from perubahan import subscribe
+from repositori import muat_tabel
+
+logger = get_logger("ikhtisar")
+
+VIEW = "indikator_tahunan"
+HORIZON = 3
+# Batas waktu (detik) menunggu prediksi; seri yang belum selesai tetap dilatih di latar
+RENDER_BUDGET = float(os.getenv("SIDAREJA_OVERVIEW_BUDGET", "2.0"))
+# Jeda (detik) sebelum view dicoba lagi setelah error sementara (timeout, jaringan)
+VIEW_RETRY = float(os.getenv("SIDAREJA_OVERVIEW_VIEW_RETRY", "60"))
+_executor = ThreadPoolExecutor(max_workers=int(os.getenv("SIDAREJA_OVERVIEW_THREADS", "4")), thread_name_prefix="ikhtisar")
+
+USIA_PREFIX = {"0-14": "usia_0_14", "15-60": "usia_15_60", "60+": "usia_60_plus"}
+
+# Seri utama halaman Ringkasan: (label, tabel, target, kelompok umur)
+SERI_UTAMA = [
+    ("Jumlah Penduduk", "penduduk_tahunan", "jumlah_penduduk", None),
+    ("Kepala Keluarga", "keluarga", "jumlah_kepala_keluarga", None),
+    ("Migrasi Masuk", "migrasi", "migrasi_masuk", None),
+    ("Migrasi Keluar", "migrasi", "migrasi_keluar", None),
+    ("Status Kawin", "status_perkawinan", "status_kawin", None),
+    ("Putus Sekolah", "putus_sekolah", "jumlah_putus_sekolah", None),
+    ("Usia 0-14", "penduduk_usia", "total", "0-14"),
+    ("Usia 15-60", "penduduk_usia", "total", "15-60"),
+    ("Usia 60+", "penduduk_usia", "total", "60+"),
+]
+
+_TABLE_SPECS = {spec["table"]: spec for spec in MODEL_SPECS.values()}
+_view = {"ada": True, "coba_lagi": 0.0}  # ada=False hanya jika view belum dibuat di database
+_berjalan = {}       # (tabel, target, kelompok) -> Future prediksi yang belum selesai
+_lock = threading.Lock()
+
+def kolom_view(target, group=None):
+    """Nama kolom di view untuk satu target (kolom penduduk_usia diberi prefix kelompok)"""
+    return target if group is None else f"{USIA_PREFIX[group]}_{target}"
+
+def _dari_tabel():
+    """Bentuk ulang isi view dari keenam tabel (diambil bersamaan)"""
+    tables = muat_tabel(*_TABLE_SPECS)
+    wide = None
+    for table, spec in _TABLE_SPECS.items():
+        if table not in tables:
+            continue
+        df = to_pandas(tables[table])
+        if spec.get("group_by"):
+            df = df[df[spec["group_by"]].isin(list(USIA_PREFIX))]
+            df = df.pivot_table(index="id_tahun", columns=spec["group_by"], values=spec["targets"], aggfunc="sum")
+            df.columns = [kolom_view(target, group) for target, group in df.columns]
+            df = df.reset_index()
+        else:
+            df = df[FEATURE_COLUMNS + spec["targets"]]
+        wide = df if wide is None else wide.merge(df, on="id_tahun", how="outer")
+    if wide is None:
+        raise ValueError("No data found for overview")
+    return wide
+
+def _view_tidak_ada(error):
+    """Error PostgREST untuk relasi yang belum dibuat (42P01 / PGRST205)"""
+    pesan = str(error)
+    return any(tanda in pesan for tanda in ("42P01", "PGRST205", "does not exist", "Could not find the table"))
+
+@timed("fetch_indikator")
+def ambil_indikator():
+    """Semua indikator tahunan sebagai satu DataFrame lebar, urut id_tahun"""
+    wide = None
+    if _view["ada"] and time.monotonic() >= _view["coba_lagi"]:
+        try:
+            table = get_table(VIEW)
+            if table.num_rows:
+                wide = to_pandas(table)
+        except Exception as e:
+            invalidate(VIEW)
+            if _view_tidak_ada(e):
+                _view["ada"] = False    # fallback sampai proses restart
+            else:
+                _view["coba_lagi"] = time.monotonic() + VIEW_RETRY
+            logger.warning("overview_view_fallback", extra={"table": VIEW, "error": str(e)})
+    if wide is None:
+        wide = _dari_tabel()
+    return wide.sort_values("id_tahun").reset_index(drop=True)
+
+def data_tabel(wide, table, group=None):
+    """
+    Potongan view dengan nama kolom asli tabel sehingga fingerprint (dan model
+    di model_store) sama dengan yang dipakai halaman per tabel.
+    """
+    spec = _TABLE_SPECS[table]
+    columns = {kolom_view(target, group): target for target in spec["targets"]}
+    df = wide[FEATURE_COLUMNS + list(columns)].rename(columns=columns).dropna()
+    df = df.astype({"id_tahun": int})
+    if group is not None:
+        df[spec["group_by"]] = group
+    return df
+
+def _prakiraan(wide, label, table, target, group, horizon):
+    data = data_tabel(wide, table, group)
+    if len(data) < 3:
+        raise ValueError(f"Not enough data for {label}")
+    hasil = prakiraan_atau_latih(table, target, data, group, horizon)
+    last_year = int(data["id_tahun"].max())
+    years, values = hasil["years"], hasil["forecast"]
+    last_value = float(data.loc[data["id_tahun"] == last_year, target].iloc[0])
+    return {
+        "label": label,
+        "status": "ok",
+        "last_year": last_year,
+        "last_value": last_value,
+        "years": years,
+        "forecast": values,
+        "change": (values[-1] - last_value) / last_value * 100 if last_value else np.nan,
+        "mape": hasil["mape"],
+        "engine": hasil["engine"],
+    }
+
+def prakiraan_utama(wide, horizon=HORIZON, budget=RENDER_BUDGET):
+    """
+    Prediksi semua SERI_UTAMA secara paralel. Menunggu paling lama `budget` detik;
+    seri yang belum selesai diberi status "dilatih" dan future-nya tetap berjalan
+    sehingga rerun berikutnya mendapat model dari cache.
+    """
+    futures = {}
+    with _lock:
+        for label, table, target, group in SERI_UTAMA:
+            key = (table, target, group)
+            future = _berjalan.get(key)
+            if future is None or future.done():
+                future = _executor.submit(_prakiraan, wide, label, table, target, group, horizon)
+                _berjalan[key] = future
+            futures[label] = future
+
+    with span("overview_wait", series=len(futures)) as tags:
+        _, pending = wait(futures.values(), timeout=budget)
+        tags["pending"] = len(pending)
+    hasil = []
+    for label, future in futures.items():
+        if not future.done():
+            hasil.append({"label": label, "status": "dilatih"})
+        elif future.exception() is not None:
+            logger.warning("overview_forecast_error", extra={"target": label, "error": str(future.exception())})
+            hasil.append({"label": label, "status": "gagal"})
+        else:
+            hasil.append(future.result())
+    return hasil
+
+@subscribe
+def _invalidate_view(table, op, rows):
+    """View ikut basi saat salah satu tabel sumbernya ditulis"""
+    if table in _TABLE_SPECS:
+        invalidate(VIEW)
@@ -0,0 +1,203 @@
+"""
+Tabel indikator tahunan yang dimaterialisasi (satu baris per id_tahun).
+
+Isi view indikator_tahunan (lihat ikhtisar.py) ditambah kolom turunan yang
+dihitung sekali saat dibangun: perubahan tahunan `pct_<kolom>`, rasio per 1.000
+penduduk, migrasi neto dan rasio ketergantungan. Disimpan sebagai Feather di
+STORE_FILE dan dibangun ulang saat tabel sumbernya ditulis, sehingga halaman
+dan API cukup membaca rentang baris tanpa menghitung ulang pct_change.
+
+Metadata file mencatat id snapshot (arrow_store) view dan tabel sumber saat
+dibangun. File hanya dipakai selama id itu sama dengan isi sumber yang di-cache
+proses ini, jadi file lama atau dari database lain tidak pernah dipakai.
+"""
+import os
+import json
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from instrumentasi import timed
+from logging_setup import get_logger
+from perubahan import subscribe
+
+logger = get_logger("indikator")
+
+STORE_FILE = os.getenv("SIDAREJA_INDICATOR_FILE", os.path.join("cache", "indikator.feather"))
+
+SUMBER = ("penduduk_tahunan", "keluarga", "migrasi", "status_perkawinan", "putus_sekolah", "penduduk_usia")
+
+# nama kolom: (pembilang, penyebut, skala)
+RASIO = {
+    "putus_sekolah_per_1000": ("jumlah_putus_sekolah", "jumlah_penduduk", 1000),
+    "kepala_keluarga_per_1000": ("jumlah_kepala_keluarga", "jumlah_penduduk", 1000),
+    "migrasi_masuk_per_1000": ("migrasi_masuk", "jumlah_penduduk", 1000),
+    "migrasi_keluar_per_1000": ("migrasi_keluar", "jumlah_penduduk", 1000),
+    "cerai_hidup_per_1000": ("cerai_hidup", "jumlah_penduduk", 1000),
+    "rasio_jenis_kelamin": ("laki_laki", "perempuan", 100),
+    "penduduk_per_keluarga": ("jumlah_penduduk", "jumlah_kepala_keluarga", 1),
+}
+
+_state = {"table": None, "years": None, "kotor": False, "versi": 0}
+_lock = threading.Lock()
+
+def _pct(values):
+    """% perubahan dari tahun sebelumnya yang punya nilai (tahun kosong dilewati, seperti pct_change per tabel)"""
+    hasil = np.full(len(values), np.nan)
+    idx = np.flatnonzero(~np.isnan(values))
+    if len(idx) > 1:
+        prev, cur = values[idx[:-1]], values[idx[1:]]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            hasil[idx[1:]] = np.where(prev != 0, (cur - prev) / prev * 100, np.nan)
+    return hasil
+
+def _bagi(a, b, skala):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(b > 0, a / b * skala, np.nan)
+
+def hitung(wide):
+    """Tambahkan semua kolom turunan ke DataFrame lebar (urut id_tahun)"""
+    wide = wide.sort_values("id_tahun").reset_index(drop=True)
+    dasar = [col for col in wide.columns if col != "id_tahun"]
+    values = {col: wide[col].to_numpy(dtype=float) for col in dasar}
+    kolom = {"id_tahun": wide["id_tahun"].to_numpy(dtype=np.int64)}
+    kolom.update(values)
+
+    if {"migrasi_masuk", "migrasi_keluar"} <= values.keys():
+        kolom["migrasi_neto"] = values["migrasi_masuk"] - values["migrasi_keluar"]
+        if "jumlah_penduduk" in values:
+            kolom["migrasi_neto_per_1000"] = _bagi(kolom["migrasi_neto"], values["jumlah_penduduk"], 1000)
+    for nama, (pembilang, penyebut, skala) in RASIO.items():
+        if pembilang in values and penyebut in values:
+            kolom[nama] = _bagi(values[pembilang], values[penyebut], skala)
+    if {"usia_0_14_total", "usia_15_60_total", "usia_60_plus_total"} <= values.keys():
+        kolom["rasio_ketergantungan"] = _bagi(
+            values["usia_0_14_total"] + values["usia_60_plus_total"], values["usia_15_60_total"], 100
+        )
+    for col in dasar:
+        kolom[f"pct_{col}"] = _pct(values[col])
+    return pd.DataFrame(kolom)
+
+@timed("build_indikator")
+def segarkan():
+    """Bangun ulang tabel dari Supabase dan simpan ke STORE_FILE (beserta id snapshot sumbernya)"""
+    from ikhtisar import ambil_indikator
+
+    table = pa.Table.from_pandas(hitung(ambil_indikator()), preserve_index=False)
+    metadata = {**(table.schema.metadata or {}), b"snapshot": json.dumps(_snapshot_sumber()).encode()}
+    table = table.replace_schema_metadata(metadata)
+    try:
+        os.makedirs(os.path.dirname(STORE_FILE) or ".", exist_ok=True)
+        tmp = f"{STORE_FILE}.{os.getpid()}.tmp"
+        feather.write_feather(table, tmp)
+        os.replace(tmp, STORE_FILE)
+    except Exception as e:
+        logger.warning("indicator_save_error", extra={"error": str(e)})
+    logger.info("indicator_build", extra={"rows": table.num_rows})
+    return table
+
+def _snapshot_sumber():
+    """id snapshot view indikator dan tabel sumber yang sedang di-cache arrow_store"""
+    from arrow_store import snapshot_id
+    from ikhtisar import VIEW
+
+    return {name: snapshot_id(name) for name in (VIEW,) + SUMBER}
+
+def _berlaku(table, ambil=False):
+    """
+    Tabel indikator masih sesuai sumbernya: tidak ada sumber yang di-cache
+    dengan id snapshot lain dari yang dicatat saat dibangun. ambil=True (file
+    dari proses lain) mengambil dulu sumber yang tercatat lewat arrow_store.
+    """
+    from arrow_store import get_table
+
+    meta = (table.schema.metadata or {}).get(b"snapshot")
+    if meta is None:
+        return False
+    tercatat = json.loads(meta)
+    if ambil:
+        if not any(tercatat.values()):
+            return False
+        for name, snapshot_id in tercatat.items():
+            if snapshot_id is not None:
+                try:
+                    get_table(name)
+                except Exception:
+                    return False
+    sekarang = _snapshot_sumber()
+    return all(sekarang[name] is None or sekarang[name] == tercatat.get(name) for name in sekarang)
+
+def _tabel():
+    with _lock:
+        if _state["table"] is None and not _state["kotor"] and os.path.exists(STORE_FILE):
+            try:
+                table = feather.read_table(STORE_FILE, memory_map=True)
+                if _berlaku(table, ambil=True):
+                    _state["table"] = table
+            except Exception as e:
+                logger.warning("indicator_load_error", extra={"error": str(e)})
+        elif _state["table"] is not None and not _berlaku(_state["table"]):
+            _state["kotor"] = True     # sumber diambil ulang dengan isi berbeda
+        if _state["table"] is None or _state["kotor"]:
+            _state["kotor"] = False
+            _state["table"] = segarkan()
+            _state["years"] = None
+        table = _state["table"]
+        if _state["years"] is None:
+            _state["years"] = table.column("id_tahun").to_numpy()
+            _state["versi"] += 1
+        return table, _state["years"]
+
+@timed("read_indikator")
+def baca(tahun_awal=None, tahun_akhir=None, columns=None):
+    """
+    Baris id_tahun dalam [tahun_awal, tahun_akhir] sebagai DataFrame. Tabel urut
+    id_tahun, jadi rentangnya dicari dengan searchsorted dan dipotong tanpa salinan.
+    """
+    table, years = _tabel()
+    lo = 0 if tahun_awal is None else int(np.searchsorted(years, tahun_awal, side="left"))
+    hi = len(years) if tahun_akhir is None else int(np.searchsorted(years, tahun_akhir, side="right"))
+    table = table.slice(lo, max(hi - lo, 0))
+    if columns:
+        table = table.select(["id_tahun"] + [col for col in columns if col != "id_tahun"])
+    return table.to_pandas()
+
+def tambah_perubahan(df, kolom):
+    """
+    Isi kolom % perubahan halaman dari tabel indikator, misal
+    tambah_perubahan(df, {"laki_laki": "% Perubahan Laki_laki"}).
+    Tahun yang belum ada di tabel indikator dihitung dari df sendiri (pct_change).
+    """
+    sumber = baca(columns=[f"pct_{col}" for col in kolom]).set_index("id_tahun")
+    hilang = ~df["id_tahun"].isin(sumber.index)
+    urut = df.sort_values("id_tahun")
+    for col, nama in kolom.items():
+        nilai = df["id_tahun"].map(sumber[f"pct_{col}"])
+        if hilang.any():
+            lokal = urut[col].pct_change(fill_method=None) * 100
+            nilai[hilang] = lokal.reindex(df.index)[hilang]
+        df[nama] = nilai.to_numpy()
+    return df
+
+def versi():
+    """Nomor versi tabel yang sedang dipakai; naik setiap kali tabel dibangun ulang atau dimuat"""
+    _tabel()
+    return _state["versi"]
+
+def kolom_tersedia():
+    table, _ = _tabel()
+    return table.column_names
+
+def invalidate():
+    """Bangun ulang tabel saat dibaca berikutnya"""
+    with _lock:
+        _state["kotor"] = True
+
+@subscribe
+def _tandai_kotor(table, op, rows):
+    """Tulis ke tabel sumber membuat tabel indikator dibangun ulang saat dibaca berikutnya"""
+    if table in SUMBER:
+        invalidate()
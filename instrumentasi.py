@@ -0,0 +1,119 @@
+import os
+import json
+import time
+import uuid
+import inspect
+import threading
+import functools
+from collections import deque
+from contextlib import contextmanager
+
+import pandas as pd
+
+# Buffer span bersama semua sesi (dibatasi agar memori tetap konstan)
+MAX_SPANS = int(os.getenv("SIDAREJA_MAX_SPANS", "20000"))
+# Jika di-set, setiap span juga ditulis sebagai satu baris JSON ke file ini
+TRACE_FILE = os.getenv("SIDAREJA_TRACE_FILE")
+
+_spans = deque(maxlen=MAX_SPANS)
+_lock = threading.Lock()
+_context = threading.local()  # Streamlit menjalankan setiap rerun di thread-nya sendiri
+
+def mulai_rerun(page):
+    """Tandai awal rerun baru untuk halaman tertentu"""
+    _context.rerun_id = uuid.uuid4().hex[:12]
+    _context.page = page
+    _context.tahap = None
+
+def _catat(stage, start, duration_ms, tags):
+    record = {
+        "ts": start,
+        "rerun_id": getattr(_context, "rerun_id", None),
+        "page": getattr(_context, "page", None),
+        "stage": stage,
+        "duration_ms": round(duration_ms, 3),
+        **tags
+    }
+    with _lock:
+        _spans.append(record)
+        if TRACE_FILE:
+            with open(TRACE_FILE, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, default=str) + "\n")
+
+@contextmanager
+def span(stage, **tags):
+    """
+    Ukur durasi sebuah blok kode, misal: with span("fetch", table="migrasi"): ...
+    Yield dict tag sehingga blok bisa menambah tag yang baru diketahui di akhir.
+    """
+    start = time.time()
+    t0 = time.perf_counter()
+    try:
+        yield tags
+    finally:
+        _catat(stage, start, (time.perf_counter() - t0) * 1000, tags)
+
+def timed(stage, tag_args=()):
+    """
+    Decorator versi span untuk fungsi. Argumen yang disebut di tag_args
+    (misal "table_name") ikut dicatat sebagai tag span.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            tags = {"func": func.__name__}
+            if tag_args:
+                bound = signature.bind_partial(*args, **kwargs).arguments
+                tags.update({name: bound[name] for name in tag_args if bound.get(name) is not None})
+            with span(stage, **tags):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def tahap(stage):
+    """
+    Penanda tahap berurutan di dalam halaman (misal "chart", "table").
+    Tahap sebelumnya otomatis ditutup saat tahap baru dimulai atau saat rerun selesai.
+    """
+    selesai_tahap()
+    _context.tahap = (stage, time.time(), time.perf_counter())
+
+def selesai_tahap():
+    current = getattr(_context, "tahap", None)
+    if current is not None:
+        stage, start, t0 = current
+        _catat(stage, start, (time.perf_counter() - t0) * 1000, {})
+        _context.tahap = None
+
+@contextmanager
+def render(page):
+    """Bungkus satu rerun halaman: memulai konteks rerun dan mengukur total render"""
+    mulai_rerun(page)
+    try:
+        with span("render"):
+            yield
+    finally:
+        selesai_tahap()
+
+def get_spans():
+    with _lock:
+        return list(_spans)
+
+def clear_spans():
+    with _lock:
+        _spans.clear()
+
+def ringkasan(spans=None):
+    """Persentil durasi (ms) per halaman dan tahap"""
+    df = pd.DataFrame(get_spans() if spans is None else spans)
+    if df.empty:
+        return pd.DataFrame(columns=["page", "stage", "count", "mean", "p50", "p90", "p99", "max"])
+    df["page"] = df["page"].fillna("-")
+    grouped = df.groupby(["page", "stage"])["duration_ms"]
+    hasil = grouped.agg(["count", "mean", "max"])
+    quantiles = grouped.quantile([0.5, 0.9, 0.99]).unstack()
+    quantiles.columns = ["p50", "p90", "p99"]
+    hasil = hasil.join(quantiles).reset_index()
+    return hasil[["page", "stage", "count", "mean", "p50", "p90", "p99", "max"]].sort_values("p90", ascending=False)
@@ -0,0 +1,158 @@
+import numpy as np
+import pandas as pd
+
+# Kelompok umur di tabel penduduk_usia dan lebar rentang umurnya (60+ terbuka)
+KELOMPOK_USIA = ["0-14", "15-60", "60+"]
+LEBAR_KELOMPOK = np.array([15.0, 46.0, np.inf])
+JENIS_KELAMIN = ["laki_laki", "perempuan"]
+
+# Asumsi angka kematian per tahun per kelompok umur (belum ada data kematian per desa)
+DEFAULT_MORTALITAS = {
+    "laki_laki": [0.0020, 0.0040, 0.0450],
+    "perempuan": [0.0015, 0.0030, 0.0400],
+}
+RASIO_JK_LAHIR = 1.05                      # laki-laki per perempuan saat lahir
+DISTRIBUSI_MIGRASI = [0.25, 0.65, 0.10]    # sebaran umur migran neto
+KELOMPOK_IBU = 1                           # indeks kelompok 15-60 (perempuan usia subur)
+
+# Urutan state: [L 0-14, L 15-60, L 60+, P 0-14, P 15-60, P 60+]
+N_STATE = len(JENIS_KELAMIN) * len(KELOMPOK_USIA)
+IDX_IBU = len(KELOMPOK_USIA) + KELOMPOK_IBU
+
+def laju_naik_default():
+    """Laju naik kelompok per tahun bila umur tersebar merata: 1 / lebar kelompok"""
+    naik = np.where(np.isinf(LEBAR_KELOMPOK), 0.0, 1.0 / LEBAR_KELOMPOK)
+    return np.tile(naik, (len(JENIS_KELAMIN), 1))
+
+def matriks_proyeksi(fertilitas, mortalitas=None, naik=None, rasio_lahir=RASIO_JK_LAHIR):
+    """
+    Matriks transisi satu tahun (6 x 6): bertahan hidup, naik kelompok umur
+    (naik[jk, kelompok] per tahun) dan kelahiran dari perempuan 15-60.
+    fertilitas boleh berdimensi (...) dan mortalitas[jk] (..., 3), misal satu
+    nilai per jalur simulasi; hasilnya (..., 6, 6).
+    """
+    mortalitas = mortalitas or DEFAULT_MORTALITAS
+    naik = laju_naik_default() if naik is None else np.asarray(naik, dtype=float)
+    fertilitas = np.asarray(fertilitas, dtype=float)
+    hidup = 1.0 - np.stack([np.asarray(mortalitas[jk], dtype=float) for jk in JENIS_KELAMIN], axis=-2)
+    n = len(KELOMPOK_USIA)
+    i = np.arange(n)
+
+    L = np.zeros(np.broadcast_shapes(fertilitas.shape, hidup.shape[:-2]) + (N_STATE, N_STATE))
+    for s in range(len(JENIS_KELAMIN)):
+        L[..., s * n + i, s * n + i] = hidup[..., s, :] * (1.0 - naik[s])
+        L[..., s * n + i[1:], s * n + i[:-1]] = (hidup[..., s, :] * naik[s])[..., :-1]
+
+    porsi_laki = rasio_lahir / (1.0 + rasio_lahir)
+    L[..., 0, IDX_IBU] += fertilitas * porsi_laki
+    L[..., n, IDX_IBU] += fertilitas * (1.0 - porsi_laki)
+    return L
+
+def vektor_migrasi(net_migrasi, distribusi=DISTRIBUSI_MIGRASI):
+    """Sebar migrasi neto per tahun ke 6 state (laki-laki/perempuan sama besar)"""
+    per_kelompok = np.multiply.outer(np.asarray(net_migrasi, dtype=float), np.asarray(distribusi)) / 2.0
+    return np.concatenate([per_kelompok, per_kelompok], axis=-1)
+
+def state_dari_tabel(df_usia):
+    """
+    Ubah tabel penduduk_usia (id_tahun, kategori_usia, laki_laki, perempuan)
+    menjadi (tahun, array tahun x 6) untuk tahun yang lengkap ketiga kelompoknya.
+    """
+    wide = df_usia.pivot_table(index="id_tahun", columns="kategori_usia", values=JENIS_KELAMIN, aggfunc="sum")
+    kolom = [(jk, kel) for jk in JENIS_KELAMIN for kel in KELOMPOK_USIA]
+    wide = wide.reindex(columns=pd.MultiIndex.from_tuples(kolom)).dropna()
+    return wide.index.to_numpy(dtype=int), wide.to_numpy(dtype=float)
+
+def _kuadrat_terkecil(sisa, x):
+    """Koefisien least squares tanpa intercept per kolom: sisa ~ koef * x"""
+    penyebut = (x * x).sum(axis=0)
+    return np.divide((sisa * x).sum(axis=0), penyebut, out=np.zeros_like(penyebut), where=penyebut > 0)
+
+def kalibrasi(states, net_migrasi=0.0, mortalitas=None):
+    """
+    Perkirakan laju naik kelompok umur dan kelahiran per perempuan 15-60 dari
+    pasangan tahun berurutan. Dari kelompok tertua ke termuda: pertambahan yang
+    tidak dijelaskan oleh kematian dan migrasi diregresikan terhadap kelompok
+    di bawahnya (naik), dan sisa kelompok 0-14 terhadap perempuan 15-60 (kelahiran).
+    Mengembalikan (fertilitas, naik[jk, kelompok]).
+    """
+    mortalitas = mortalitas or DEFAULT_MORTALITAS
+    naik = laju_naik_default()
+    if len(states) < 2:
+        return 0.0, naik
+
+    n = len(KELOMPOK_USIA)
+    hidup = 1.0 - np.array([mortalitas[jk] for jk in JENIS_KELAMIN])          # (2, 3)
+    sekarang = states[:-1].reshape(-1, len(JENIS_KELAMIN), n)                # (t, 2, 3)
+    berikut = states[1:].reshape(-1, len(JENIS_KELAMIN), n)
+    migrasi = vektor_migrasi(net_migrasi).reshape(len(JENIS_KELAMIN), n)
+
+    for k in range(n - 1, 0, -1):
+        tetap = hidup[:, k] * (1.0 - naik[:, k]) * sekarang[:, :, k]
+        sisa = berikut[:, :, k] - tetap - migrasi[:, k]
+        naik[:, k - 1] = np.clip(_kuadrat_terkecil(sisa, hidup[:, k - 1] * sekarang[:, :, k - 1]), 0.0, 1.0)
+
+    sisa_anak = (berikut[:, :, 0] - hidup[:, 0] * (1.0 - naik[:, 0]) * sekarang[:, :, 0] - migrasi[:, 0]).sum(axis=1)
+    fertilitas = max(float(_kuadrat_terkecil(sisa_anak, states[:-1, IDX_IBU])), 0.0)
+    return fertilitas, naik
+
+def proyeksi(state_awal, L, migrasi, tahun):
+    """
+    Proyeksikan state sejauh `tahun` langkah: x(t+1) = L x(t) + m.
+    state_awal boleh berdimensi (..., 6) (misal banyak skenario sekaligus);
+    L (6, 6) atau (..., 6, 6); migrasi (6,) atau (..., 6).
+    Mengembalikan array (tahun + 1, ..., 6) termasuk state awal.
+    """
+    x = np.asarray(state_awal, dtype=float)
+    hasil = np.empty((tahun + 1,) + x.shape)
+    hasil[0] = x
+    for t in range(tahun):
+        x = np.einsum("...ij,...j->...i", L, x) + migrasi
+        hasil[t + 1] = x
+    return hasil
+
+def net_migrasi_rata2(df_migrasi, tahun_terakhir=5):
+    """Rata-rata migrasi neto (masuk - keluar) beberapa tahun terakhir"""
+    if df_migrasi is None or df_migrasi.empty:
+        return 0.0
+    terakhir = df_migrasi.sort_values("id_tahun").tail(tahun_terakhir)
+    return float((terakhir["migrasi_masuk"] - terakhir["migrasi_keluar"]).mean())
+
+def proyeksi_kohort(df_usia, df_migrasi=None, horizon=30, mortalitas=None):
+    """
+    Proyeksi kohort-komponen kecamatan per kelompok umur dan jenis kelamin.
+    Mengembalikan (DataFrame panjang seperti penduduk_usia untuk tahun proyeksi,
+    dict komponen: fertilitas, net_migrasi, laju naik, kelahiran dan kematian per tahun).
+    """
+    mortalitas = mortalitas or DEFAULT_MORTALITAS
+    years, states = state_dari_tabel(df_usia)
+    if len(years) == 0:
+        raise ValueError("penduduk_usia must contain groups " + ", ".join(KELOMPOK_USIA))
+
+    net = net_migrasi_rata2(df_migrasi)
+    fertilitas, naik = kalibrasi(states, net, mortalitas)
+    L = matriks_proyeksi(fertilitas, mortalitas, naik)
+    jalur = proyeksi(states[-1], L, vektor_migrasi(net), horizon)[1:]
+
+    tahun = years[-1] + np.arange(1, horizon + 1)
+    n = len(KELOMPOK_USIA)
+    hasil = pd.DataFrame({
+        "id_tahun": np.repeat(tahun, n),
+        "kategori_usia": np.tile(KELOMPOK_USIA, horizon),
+        "laki_laki": jalur[:, :n].ravel(),
+        "perempuan": jalur[:, n:].ravel(),
+    })
+    hasil["total"] = hasil["laki_laki"] + hasil["perempuan"]
+
+    # Komponen per tahun proyeksi dari state tahun sebelumnya
+    sebelum = np.vstack([states[-1:], jalur[:-1]])
+    mati = np.concatenate([mortalitas[jk] for jk in JENIS_KELAMIN])
+    komponen = {
+        "fertilitas": fertilitas,
+        "net_migrasi": net,
+        "naik": naik,
+        "tahun": tahun,
+        "kelahiran": fertilitas * sebelum[:, IDX_IBU],
+        "kematian": sebelum @ mati,
+    }
+    return hasil, komponen
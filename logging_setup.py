@@ -0,0 +1,99 @@
+import os
+import sys
+import json
+import queue
+import atexit
+import random
+import logging
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+LOGGER_NAME = "sidareja"
+LOG_LEVEL = os.getenv("SIDAREJA_LOG_LEVEL", "INFO").upper()
+# Batas antrean log; jika penuh, record dibuang (render tidak pernah menunggu I/O log)
+QUEUE_SIZE = int(os.getenv("SIDAREJA_LOG_QUEUE", "10000"))
+
+# Rasio sampling per event frekuensi tinggi (1 = semua dicatat). WARNING ke atas tidak pernah di-sampling.
+# Bisa diubah lewat env, contoh: SIDAREJA_LOG_SAMPLE="train=1,predict=0.05"
+DEFAULT_SAMPLE_RATES = {"fetch": 0.1, "train": 0.2, "predict": 0.01}
+
+# Field terstruktur yang diteruskan dari `extra`
+FIELDS = ("table", "target", "engine", "rows", "fit_ms", "mae", "mape", "r2", "mae_std", "r2_std", "peak_kb", "arrow_kb", "years", "snapshot", "error")
+
+def _parse_sample_rates(value):
+    rates = dict(DEFAULT_SAMPLE_RATES)
+    for item in (value or "").split(","):
+        if "=" in item:
+            event, rate = item.split("=", 1)
+            rates[event.strip()] = float(rate)
+    return rates
+
+class JsonFormatter(logging.Formatter):
+    """Satu baris JSON per record agar mudah diolah mesin"""
+    def format(self, record):
+        payload = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "event": record.getMessage()
+        }
+        for field in FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                payload[field] = round(value, 4) if isinstance(value, float) else value
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+class SamplingFilter(logging.Filter):
+    """Loloskan hanya sebagian record INFO/DEBUG untuk event frekuensi tinggi"""
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(record.msg, 1.0)
+        return rate >= 1.0 or random.random() < rate
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler yang membuang record saat antrean penuh, bukan memblokir"""
+    dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DroppingQueueHandler.dropped += 1
+
+_listener = None
+_setup_lock = threading.Lock()
+
+def setup_logging():
+    """Pasang handler berbasis antrean sekali per proses"""
+    global _listener
+    with _setup_lock:
+        logger = logging.getLogger(LOGGER_NAME)
+        if _listener is not None:
+            return logger
+
+        log_queue = queue.Queue(maxsize=QUEUE_SIZE)
+        handler = DroppingQueueHandler(log_queue)
+        handler.addFilter(SamplingFilter(_parse_sample_rates(os.getenv("SIDAREJA_LOG_SAMPLE"))))
+
+        output = logging.StreamHandler(sys.stderr)
+        output.setFormatter(JsonFormatter())
+        _listener = QueueListener(log_queue, output, respect_handler_level=False)
+        _listener.start()
+        atexit.register(_listener.stop)
+
+        logger.addHandler(handler)
+        logger.setLevel(LOG_LEVEL)
+        logger.propagate = False
+        return logger
+
+def get_logger(name=None):
+    """Logger anak dari 'sidareja', misal get_logger("model")"""
+    setup_logging()
+    return logging.getLogger(f"{LOGGER_NAME}.{name}" if name else LOGGER_NAME)
@@ -1,13 +1,18 @@
 import numpy as np
-import pandas as pd
 from supabase import create_client, Client
 from sklearn.svm import SVR
-from sklearn.model_selection import train_test_split, GridSearchCV, TimeSeriesSplit, cross_val_score, KFold
-from sklearn.metrics import mean_absolute_error, mean_absolute_percentage_error, r2_score
+from sklearn.model_selection import train_test_split, GridSearchCV, TimeSeriesSplit
+from sklearn.metrics import mean_absolute_error, r2_score
 from sklearn.preprocessing import PolynomialFeatures, StandardScaler
 from sklearn.pipeline import Pipeline
+from sklearn.base import BaseEstimator, RegressorMixin
 import os
+import time
 from dotenv import load_dotenv
+from instrumentasi import timed
+from logging_setup import get_logger
+from backtest import backtest
+from anomali import catatan as catat_anomali
 
 load_dotenv()
 
@@ -16,13 +21,27 @@ SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv('SUPABASE_KEY')
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
-def fetch_data(table_name, feature_columns, target_columns):
+logger = get_logger("model")
+
+@timed("fetch", tag_args=("table_name",))
+def fetch_data(table_name, feature_columns, target_columns, snapshot=None):
+    """
+    snapshot: id snapshot (snapshot.py) untuk memakai isi tabel pada versi tertentu;
+    id snapshot data yang dikembalikan ada di df.attrs["snapshot"]
+    """
     try:
-        # Fetch data from Supabase
-        response = supabase.table(table_name).select("*").execute()
+        # Fetch data from Supabase (didekode langsung ke Arrow dan di-cache per proses)
+        from arrow_store import get_table, to_pandas, snapshot_id
+        if snapshot is not None:
+            from snapshot import muat
+            table = muat(snapshot)
+        else:
+            table = get_table(table_name)
+            snapshot = snapshot_id(table_name)
         
-        if response.data:
-            df = pd.DataFrame(response.data)
+        if table.num_rows:
+            df = to_pandas(table)
+            df.attrs["snapshot"] = snapshot
             
             # Ensure all required columns exist
             required_columns = feature_columns + target_columns
@@ -36,14 +55,175 @@ def fetch_data(table_name, feature_columns, target_columns):
             raise ValueError(f"No data found in table {table_name}")
             
     except Exception as e:
-        print(f"Error fetching data from {table_name}: {str(e)}")
+        logger.error("fetch_error", extra={"table": table_name, "error": str(e)})
         raise
 
-def train_svm_model(feature_columns, target_column, data=None, table_name=None, filter_condition=None):
+def build_svr_pipeline(C=250, epsilon=0.01, kernel='linear', poly_degree=1):
+    """
+    Pipeline standar (StandardScaler + SVR) yang dipakai semua model prediksi.
+    poly_degree > 1 menambah PolynomialFeatures (interaksi antar fitur) sebelum scaler.
+    """
+    steps = [('scaler', StandardScaler()), ('svr', SVR(kernel=kernel, C=C, epsilon=epsilon))]
+    if poly_degree > 1:
+        steps.insert(0, ('poly', PolynomialFeatures(degree=poly_degree, include_bias=False)))
+    return Pipeline(steps)
+
+def linear_coefficients(model):
+    """
+    Ambil slope dan intercept (dalam satuan asli) dari pipeline SVR linear
+    dengan satu fitur, sehingga prediksi bisa dihitung sebagai intercept + slope * tahun
+    """
+    scaler = model.named_steps['scaler']
+    svr = model.named_steps['svr']
+    coef = float(svr.coef_.ravel()[0])
+    slope = coef / scaler.scale_[0]
+    intercept = float(svr.intercept_[0]) - slope * scaler.mean_[0]
+    return slope, intercept
+
+def cross_validate_model(model, X, y, mode="expanding", n_jobs=None):
+    """
+    Evaluasi backtest time-series (tanpa kebocoran tahun masa depan ke data latih).
+    Mengembalikan dict berisi mae, mape, r2 out-of-sample dan error per horizon 1-3 tahun.
+    """
+    return backtest(model, X, y, mode=mode, n_jobs=n_jobs)
+
+# ======= ENGINE PREDIKSI =======
+# Semua engine memakai antarmuka sklearn (fit/predict/score) sehingga bisa dipakai
+# backtest() dan halaman tanpa perubahan. Baseline menerima y 1D atau 2D (tahun x seri)
+# sehingga banyak seri bisa di-fit sekaligus.
+
+ENGINES = {}            # nama -> factory, urut dari yang paling murah
+ENGINE_TOLERANCE = 0.05  # engine murah dipilih jika MAE backtest-nya maks. 5% di atas yang terbaik
+
+def register_engine(name):
+    """Daftarkan factory engine, contoh: @register_engine("linear")"""
+    def decorator(factory):
+        ENGINES[name] = factory
+        return factory
+    return decorator
+
+def _as_2d(y):
+    y = np.asarray(y, dtype=float)
+    return (y.reshape(-1, 1), True) if y.ndim == 1 else (y, False)
+
+def _weighted_trend(x, Y, w):
+    """Slope dan intercept least squares berbobot (w per tahun) untuk semua kolom Y"""
+    w = np.ones(len(x)) if w is None else np.asarray(w, dtype=float)
+    mx = (w @ x) / w.sum()
+    my = (w @ Y) / w.sum()
+    dx = x - mx
+    denom = (w * dx ** 2).sum()
+    slope = ((w * dx) @ (Y - my)) / denom if denom > 0 else np.zeros(Y.shape[1])
+    return slope, my - slope * mx
+
+class _BaselineModel(RegressorMixin, BaseEstimator):
+    def _output(self, values):
+        return values[:, 0] if self.single_ else values
+
+    @staticmethod
+    def _tarik_ke_tren(x, Y, sample_weight):
+        """
+        Engine tanpa bobot alami (CAGR, Holt): nilai tahun berbobot < 1 ditarik ke
+        tren linear berbobot sebanding bobotnya, sehingga tahun anomali tidak mendominasi.
+        """
+        if sample_weight is None:
+            return Y
+        w = np.asarray(sample_weight, dtype=float)
+        slope, intercept = _weighted_trend(x, Y, w)
+        trend = intercept + np.outer(x, slope)
+        w = np.clip(w, 0.0, 1.0)[:, None]
+        return w * Y + (1 - w) * trend
+
+@register_engine("linear")
+class LinearTrendModel(_BaselineModel):
+    """Tren linear least squares terhadap tahun"""
+    def fit(self, X, y, sample_weight=None):
+        x = np.asarray(X, dtype=float)[:, 0]
+        Y, self.single_ = _as_2d(y)
+        self.slope_, self.intercept_ = _weighted_trend(x, Y, sample_weight)
+        return self
+
+    def predict(self, X):
+        x = np.asarray(X, dtype=float)[:, 0]
+        return self._output(self.intercept_ + np.outer(x, self.slope_))
+
+@register_engine("cagr")
+class CAGRModel(_BaselineModel):
+    """Pertumbuhan majemuk tahunan dari tahun pertama ke tahun terakhir"""
+    def fit(self, X, y, sample_weight=None):
+        x = np.asarray(X, dtype=float)[:, 0]
+        Y, self.single_ = _as_2d(y)
+        Y = self._tarik_ke_tren(x, Y, sample_weight)
+        order = np.argsort(x, kind="stable")
+        first, last = Y[order[0]], Y[order[-1]]
+        span = x[order[-1]] - x[order[0]]
+        valid = (first > 0) & (last > 0) & (span > 0)
+        ratio = np.where(valid, last / np.where(valid, first, 1.0), 1.0)
+        self.rate_ = ratio ** (1.0 / span if span > 0 else 0.0) - 1.0
+        self.last_year_ = x[order[-1]]
+        self.last_value_ = last
+        return self
+
+    def predict(self, X):
+        steps = np.asarray(X, dtype=float)[:, 0] - self.last_year_
+        return self._output(self.last_value_ * (1.0 + self.rate_) ** steps[:, None])
+
+@register_engine("holt")
+class HoltModel(_BaselineModel):
+    """Holt linear exponential smoothing (level + tren)"""
+    def __init__(self, alpha=0.8, beta=0.2):
+        self.alpha = alpha
+        self.beta = beta
+
+    def fit(self, X, y, sample_weight=None):
+        x = np.asarray(X, dtype=float)[:, 0]
+        Y, self.single_ = _as_2d(y)
+        Y = self._tarik_ke_tren(x, Y, sample_weight)
+        order = np.argsort(x, kind="stable")
+        x, Y = x[order], Y[order]
+        level = Y[0].copy()
+        trend = (Y[1] - Y[0]) / max(x[1] - x[0], 1.0) if len(x) > 1 else np.zeros(Y.shape[1])
+        for t in range(1, len(x)):
+            dt = max(x[t] - x[t - 1], 1.0)
+            previous = level
+            level = self.alpha * Y[t] + (1 - self.alpha) * (level + trend * dt)
+            trend = self.beta * (level - previous) / dt + (1 - self.beta) * trend
+        self.level_, self.trend_, self.last_year_ = level, trend, x[-1]
+        return self
+
+    def predict(self, X):
+        steps = np.asarray(X, dtype=float)[:, 0] - self.last_year_
+        return self._output(self.level_ + np.outer(steps, self.trend_))
+
+register_engine("svr")(build_svr_pipeline)
+
+@timed("select_engine")
+def select_engine(X, y, engines=None, tolerance=ENGINE_TOLERANCE):
+    """
+    Pilih engine berdasarkan MAE backtest untuk satu seri: engine termurah yang
+    MAE-nya tidak lebih dari `tolerance` di atas MAE terbaik.
+    Mengembalikan (nama engine, {nama: hasil backtest}).
+    """
+    names = engines or list(ENGINES)
+    scores = {name: cross_validate_model(ENGINES[name](), X, y) for name in names}
+    valid = {name: result["mae"] for name, result in scores.items() if np.isfinite(result["mae"])}
+    if not valid:
+        return ("svr" if "svr" in names else names[0]), scores
+    best = min(valid.values())
+    for name in names:
+        if name in valid and valid[name] <= best * (1 + tolerance):
+            return name, scores
+
+@timed("train", tag_args=("table_name", "target_column"))
+def train_svm_model(feature_columns, target_column, data=None, table_name=None, filter_condition=None, params=None, poly_degree=1,
+                    sample_weight=None):
     """
     Versi fleksibel yang bisa terima:
     - DataFrame langsung (data)
     - Atau query dari Supabase (table_name + filter_condition)
+    params: hasil tuning (C, epsilon, kernel); default parameter standar pipeline
+    feature_columns boleh lebih dari satu (misal dari fitur.py); poly_degree untuk PolynomialFeatures
+    sample_weight: bobot per baris untuk fit akhir (misal dari anomali.py); backtest tetap tanpa bobot
     """
     try:
         # Get data
@@ -58,38 +238,84 @@ def train_svm_model(feature_columns, target_column, data=None, table_name=None,
         X = df[feature_columns].values
         y = df[target_column].values
         
-        model = Pipeline([
-        ('scaler', StandardScaler()),
-        ('svr', SVR(kernel='linear', C=250, epsilon=0.01))
-        ])
+        model = build_svr_pipeline(**(params or {}), poly_degree=poly_degree)
+        start = time.perf_counter()
         
-        # Cross-Validation untuk evaluasi
-        kfold = KFold(n_splits=3, shuffle=True, random_state=42)
-        mae_scores = -cross_val_score(model, X, y, cv=kfold, scoring='neg_mean_absolute_error')
-        r2_scores = cross_val_score(model, X, y, cv=kfold, scoring='r2')
-        
-        # Calculate metrics
-        mae = mae_scores.mean()
-        r2 = r2_scores.mean()
-        
-        # Calculate MAPE manually
-        model.fit(X, y)
-        y_pred = model.predict(X)
-        mape = mean_absolute_percentage_error(y, y_pred) * 100
-        
-        print("Cross-Validation Results:")
-        print(f"MAE: {mae:.2f} (±{mae_scores.std():.2f})")
-        print(f"MAPE: {mape:.2f}%")
-        print(f"R²: {r2:.4f} (±{r2_scores.std():.4f})")
+        # Backtest time-series untuk evaluasi (MAE, MAPE, R² out-of-sample)
+        evaluation = cross_validate_model(model, X, y)
+        mae, mape, r2 = evaluation["mae"], evaluation["mape"], evaluation["r2"]
         
         # Latih model dengan seluruh data untuk penggunaan akhir
-        model.fit(X, y)
+        if sample_weight is None:
+            model.fit(X, y)
+        else:
+            model.fit(X, y, svr__sample_weight=sample_weight)
+        model.backtest_ = evaluation
+        svr = model.named_steps['svr']
+        model.best_params = {"C": svr.C, "epsilon": svr.epsilon, "kernel": svr.kernel}
+        
+        logger.info("train", extra={
+            "table": table_name,
+            "target": target_column,
+            "rows": len(y),
+            "fit_ms": (time.perf_counter() - start) * 1000,
+            "mae": float(mae),
+            "mae_std": evaluation["mae_std"],
+            "mape": float(mape),
+            "r2": float(r2)
+        })
         return model, mae, mape, r2
         
     except Exception as e:
-        print(f"Error in train_svm_model: {str(e)}")
+        logger.error("train_error", extra={"table": table_name, "target": target_column, "error": str(e)})
         raise
 
+def train_forecast_model(feature_columns, target_column, data, table_name=None, engine="auto", params=None, anomaly_mode=None,
+                         anomali=None):
+    """
+    Latih model dengan engine tertentu, atau engine="auto" untuk memilih lewat backtest.
+    Mengembalikan (model, mae, mape, r2) seperti train_svm_model; nama engine di model.engine_.
+    Tahun anomali (anomali.py) dicatat di model.anomali_ dan, pada mode "weight",
+    diberi bobot kecil saat fit akhir. anomali: keputusan yang sudah dihitung per
+    tabel (anomali.catatan_tabel); jika None seri ini dideteksi sendiri.
+    """
+    X = data[feature_columns].values
+    y = data[target_column].values
+    keputusan, weights = catat_anomali(X[:, 0], y, mode=anomaly_mode, keputusan=anomali)
+    if keputusan and keputusan["tahun"]:
+        logger.info("anomaly", extra={"table": table_name, "target": target_column, "years": keputusan["tahun"]})
+    scores = {}
+    if engine == "auto":
+        engine, scores = select_engine(X, y)
+
+    if engine == "svr":
+        result = train_svm_model(feature_columns, target_column, data=data, table_name=table_name, params=params,
+                                 sample_weight=weights)
+        result[0].engine_ = engine
+        result[0].engine_scores_ = {name: score["mae"] for name, score in scores.items()}
+        result[0].anomali_ = keputusan
+        return result
+
+    start = time.perf_counter()
+    evaluation = scores.get(engine) or cross_validate_model(ENGINES[engine](), X, y)
+    model = ENGINES[engine]().fit(X, y, sample_weight=weights)
+    model.engine_ = engine
+    model.engine_scores_ = {name: score["mae"] for name, score in scores.items()}
+    model.backtest_ = evaluation
+    model.anomali_ = keputusan
+    logger.info("train", extra={
+        "table": table_name,
+        "target": target_column,
+        "engine": engine,
+        "rows": len(y),
+        "fit_ms": (time.perf_counter() - start) * 1000,
+        "mae": evaluation["mae"],
+        "mape": evaluation["mape"],
+        "r2": evaluation["r2"]
+    })
+    return model, evaluation["mae"], evaluation["mape"], evaluation["r2"]
+
+@timed("predict")
 def predict_population(years, model):
     """
     Predict population for given years using trained model
@@ -104,5 +330,5 @@ def predict_population(years, model):
         
         return np.round(predictions, 2)
     except Exception as e:
-        print(f"Error in prediction: {str(e)}")
+        logger.error("predict_error", extra={"error": str(e)})
         raise
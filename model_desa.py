@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from model import train_svm_model, linear_coefficients
+
+KOLOM_DESA = ["id_desa", "id_tahun", "jumlah_penduduk"]
+
+def normalisasi_penduduk_desa(raw):
+    """
+    Ubah data penduduk_perdesa (format lebar & sebagian terdenormalisasi)
+    menjadi tabel panjang (id_desa, nama_desa, id_tahun, jumlah_penduduk)
+    """
+    df = raw.loc[:, [c for c in raw.columns if str(c).strip() != '']].copy()
+    nama_col = df.columns[0]  # kolom tanpa judul berisi nama desa
+    df = df.rename(columns={nama_col: "nama_desa"})
+    df = df[df["id_desa"].notna()]
+    df["id_desa"] = df["id_desa"].astype(int)
+
+    # Baris panjang: satu baris per (desa, tahun)
+    panjang = df[KOLOM_DESA].dropna()
+
+    # Kolom tahun lebar (2016, 2017, ...) yang hanya terisi di baris pertama tiap desa
+    kolom_tahun = [c for c in df.columns if str(c).isdigit()]
+    lebar = df[["id_desa"] + kolom_tahun].melt(
+        id_vars=["id_desa"],
+        value_vars=kolom_tahun,
+        var_name="id_tahun",
+        value_name="jumlah_penduduk"
+    ).dropna()
+
+    # Baris panjang diutamakan bila tahun yang sama muncul di kedua format
+    hasil = pd.concat([panjang, lebar], ignore_index=True)
+    hasil["id_tahun"] = pd.to_numeric(hasil["id_tahun"]).astype(int)
+    hasil["jumlah_penduduk"] = pd.to_numeric(hasil["jumlah_penduduk"]).astype(int)
+    hasil = hasil.drop_duplicates(subset=["id_desa", "id_tahun"], keep="first")
+
+    # Nama desa hanya ditulis di baris pertama, sebarkan ke seluruh baris desa
+    nama = df.dropna(subset=["nama_desa"]).drop_duplicates("id_desa").set_index("id_desa")["nama_desa"]
+    hasil["nama_desa"] = hasil["id_desa"].map(nama)
+
+    return hasil.sort_values(["id_desa", "id_tahun"]).reset_index(drop=True)[
+        ["id_desa", "nama_desa", "id_tahun", "jumlah_penduduk"]
+    ]
+
+def _latih_satu_desa(id_desa, data):
+    model, mae, mape, r2 = train_svm_model(
+        feature_columns=["id_tahun"],
+        target_column="jumlah_penduduk",
+        data=data
+    )
+    slope, intercept = linear_coefficients(model)
+    return {
+        "id_desa": id_desa,
+        "slope": slope,
+        "intercept": intercept,
+        "tahun_terakhir": int(data["id_tahun"].max()),
+        "MAE": mae,
+        "MAPE": mape,
+        "R²": r2
+    }
+
+def latih_model_desa(df_desa, n_jobs=-1):
+    """
+    Latih model SVR untuk semua desa sekaligus secara paralel.
+    Hasilnya tabel koefisien (satu baris per desa) sehingga prediksi
+    tidak perlu memanggil model per desa.
+    """
+    hasil = Parallel(n_jobs=n_jobs)(
+        delayed(_latih_satu_desa)(id_desa, group[["id_tahun", "jumlah_penduduk"]])
+        for id_desa, group in df_desa.groupby("id_desa", sort=True)
+        if len(group) >= 3  # backtest butuh min_train (default 3) tahun sebelum origin pertama
+    )
+    koef = pd.DataFrame(hasil)
+    if "nama_desa" in df_desa.columns and not koef.empty:
+        nama = df_desa.drop_duplicates("id_desa").set_index("id_desa")["nama_desa"]
+        koef["nama_desa"] = koef["id_desa"].map(nama)
+    return koef
+
+_koef = {}  # fingerprint data desa -> tabel koefisien (hanya versi data terbaru)
+
+def koefisien_desa(df_desa):
+    """Tabel koefisien latih_model_desa, dilatih ulang hanya bila data desa berubah"""
+    from model_store import data_fingerprint
+
+    key = data_fingerprint(df_desa, KOLOM_DESA)
+    koef = _koef.get(key)
+    if koef is None:
+        koef = latih_model_desa(df_desa)
+        _koef.clear()
+        _koef[key] = koef
+    return koef
+
+def prediksi_desa(koef, years):
+    """
+    Prediksi jumlah penduduk semua desa untuk tahun-tahun yang diberikan
+    dalam satu operasi matriks (desa x tahun)
+    """
+    years = np.asarray(years, dtype=float).ravel()
+    nilai = koef["intercept"].to_numpy()[:, None] + koef["slope"].to_numpy()[:, None] * years[None, :]
+
+    hasil = pd.DataFrame({
+        "id_desa": np.repeat(koef["id_desa"].to_numpy(), len(years)),
+        "id_tahun": np.tile(years.astype(int), len(koef)),
+        "jumlah_penduduk": np.round(nilai.ravel(), 2)
+    })
+    if "nama_desa" in koef.columns:
+        hasil.insert(1, "nama_desa", np.repeat(koef["nama_desa"].to_numpy(), len(years)))
+    return hasil
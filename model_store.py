@@ -0,0 +1,381 @@
+import os
+import json
+import time
+import threading
+from functools import partial
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.base import clone
+from model import train_forecast_model, build_svr_pipeline, cross_validate_model, ENGINES
+from anomali import catatan as catat_anomali, catatan_tabel
+from logging_setup import get_logger
+from perubahan import subscribe
+from tuning import stored_params
+from validasi import saring
+
+logger = get_logger("model_store")
+
+STORE_DIR = os.getenv("SIDAREJA_MODEL_DIR", os.path.join("cache", "models"))
+READY_FILE = os.path.join(STORE_DIR, "READY.json")
+STORE_VERSION = 1  # naikkan bila format model tersimpan berubah (READY.json lama jadi tidak berlaku)
+
+# Model yang dipakai setiap halaman ui_* (tabel, target, dan kolom pengelompokan)
+MODEL_SPECS = {
+    "Dashboard": {"table": "penduduk_tahunan", "targets": ["laki_laki", "perempuan", "jumlah_penduduk"]},
+    "Penduduk Berdasarkan Usia": {"table": "penduduk_usia", "targets": ["total", "laki_laki", "perempuan"], "group_by": "kategori_usia"},
+    "Keluarga": {"table": "keluarga", "targets": ["pria", "wanita", "jumlah_kepala_keluarga"]},
+    "Migrasi": {"table": "migrasi", "targets": ["migrasi_masuk", "migrasi_keluar"]},
+    "Status Perkawinan": {"table": "status_perkawinan", "targets": ["status_kawin", "cerai_hidup"]},
+    "Putus Sekolah": {"table": "putus_sekolah", "targets": ["jumlah_putus_sekolah"]},
+}
+
+FEATURE_COLUMNS = ["id_tahun"]
+# Engine prediksi: "auto" memilih per seri lewat backtest, atau nama engine di model.ENGINES
+ENGINE = os.getenv("SIDAREJA_ENGINE", "auto")
+_TABLE_SPECS = {spec["table"]: spec for spec in MODEL_SPECS.values()}
+
+_memory = {}        # (table, target, group, fingerprint) -> (model, mae, mape, r2); metrik None = belum dihitung
+_tables = {}        # table -> DataFrame terakhir yang dipakai training
+_fingerprints = {}  # (table, target, group) -> [jumlah hash baris, jumlah baris]
+_scaler_stats = {}  # (table, group) -> [n, sum, sum kuadrat] dari id_tahun
+_engines = {}       # (table, target, group) -> engine terpilih
+_lock = threading.Lock()
+
+def _row_hashes(df, columns):
+    return pd.util.hash_pandas_object(df[columns].astype("float64"), index=False).to_numpy()
+
+def _format_fingerprint(hash_sum, n):
+    return f"{int(hash_sum):016x}{int(n):04x}"
+
+def data_fingerprint(df, columns):
+    """
+    Hash isi kolom yang dipakai training. Berupa jumlah (mod 2^64) hash per baris
+    sehingga tidak bergantung urutan dan bisa diperbarui per baris yang berubah.
+    """
+    hashes = _row_hashes(df, columns)
+    return _format_fingerprint(hashes.sum(dtype=np.uint64), len(hashes))
+
+def _model_path(table, target, group, fingerprint):
+    group_part = str(group).replace("/", "_") if group is not None else "-"
+    return os.path.join(STORE_DIR, f"{table}__{group_part}__{target}__{fingerprint[:16]}.joblib")
+
+def _remember(table, target, group, data):
+    """Simpan statistik cukup (fingerprint & statistik scaler) untuk update inkremental"""
+    hashes = _row_hashes(data, FEATURE_COLUMNS + [target])
+    x = data[FEATURE_COLUMNS[0]].to_numpy(dtype=float)
+    with _lock:
+        _fingerprints[(table, target, group)] = [hashes.sum(dtype=np.uint64), len(hashes)]
+        _scaler_stats[(table, group)] = [len(x), x.sum(), (x ** 2).sum()]
+
+def _ensure_metrics(key, data, target):
+    """Hitung metrik CV yang ditunda (setelah update inkremental) saat pertama kali dibutuhkan"""
+    model, mae, mape, r2 = _memory[key]
+    if mae is not None:
+        return _memory[key]
+    X = data[FEATURE_COLUMNS].values
+    y = data[target].values
+    evaluation = cross_validate_model(clone(model), X, y)
+    model.backtest_ = evaluation
+    result = (model, evaluation["mae"], evaluation["mape"], evaluation["r2"])
+    with _lock:
+        _memory[key] = result
+    _save(key, result)
+    return result
+
+def _params_of(model):
+    params = getattr(model, "best_params", None)
+    if params is None:
+        svr = model.named_steps["svr"]
+        params = {"C": svr.C, "epsilon": svr.epsilon, "kernel": svr.kernel}
+    return params
+
+def _params_match(result, params):
+    """Model SVR tersimpan hanya dipakai jika dilatih dengan parameter hasil tuning terbaru"""
+    if params is None or getattr(result[0], "engine_", "svr") != "svr":
+        return True
+    return _params_of(result[0]) == params
+
+def _save(key, result):
+    table, target, group, fingerprint = key
+    try:
+        os.makedirs(STORE_DIR, exist_ok=True)
+        joblib.dump(result, _model_path(table, target, group, fingerprint))
+    except Exception as e:
+        logger.warning("model_save_error", extra={"table": table, "target": target, "error": str(e)})
+
+def get_model(table, target, data, group=None, anomali=None):
+    """
+    Ambil model (model, mae, mape, r2) untuk data tertentu.
+    Urutan: cache memori -> file di STORE_DIR -> training baru (lalu disimpan).
+    Model dikunci dengan fingerprint isi data, jadi data identik tidak dilatih dua kali;
+    model.snapshot_ mencatat snapshot dataset (df.attrs["snapshot"]) tempat model dilatih.
+    Training memakai parameter hasil tuning.py bila ada. anomali: fungsi yang
+    mengembalikan keputusan anomali.catatan_tabel untuk seri ini (dari
+    train_table_models), dipanggil hanya jika model perlu dilatih.
+    """
+    fingerprint = data_fingerprint(data, FEATURE_COLUMNS + [target])
+    key = (table, target, group, fingerprint)
+    if group is None and table in _TABLE_SPECS:
+        with _lock:
+            _tables[table] = data
+    if (table, target, group) not in _fingerprints:
+        _remember(table, target, group, data)
+
+    params = stored_params(table, target, group)
+    cached = _memory.get(key)
+    if cached is not None and _params_match(cached, params):
+        return _ensure_metrics(key, data, target)
+
+    path = _model_path(table, target, group, fingerprint)
+    if cached is None and os.path.exists(path):
+        try:
+            result = joblib.load(path)
+            if _params_match(result, params):
+                with _lock:
+                    _memory[key] = result
+                    _engines[(table, target, group)] = getattr(result[0], "engine_", "svr")
+                return result
+        except Exception as e:
+            logger.warning("model_load_error", extra={"table": table, "target": target, "error": str(e)})
+
+    # Baris yang melanggar aturan validasi (level error) tidak ikut training,
+    # kecuali jika sisanya terlalu sedikit untuk dilatih
+    train_data = saring(table, data)
+    if len(train_data) < 3:
+        train_data = data
+    result = train_forecast_model(
+        feature_columns=FEATURE_COLUMNS,
+        target_column=target,
+        data=train_data,
+        table_name=table,
+        engine=ENGINE,
+        params=params,
+        anomali=anomali() if anomali else None
+    )
+    # Snapshot dataset (snapshot.py) tempat model ini dilatih, untuk reproduksi
+    result[0].snapshot_ = data.attrs.get("snapshot")
+    logger.info("model_snapshot", extra={"table": table, "target": target, "snapshot": result[0].snapshot_})
+    with _lock:
+        _memory[key] = result
+        _engines[(table, target, group)] = getattr(result[0], "engine_", "svr")
+    _remember(table, target, group, data)
+    _save(key, result)
+    return result
+
+def anomali_report():
+    """
+    Keputusan anomali model yang sedang dipakai (satu baris per tahun yang ditandai),
+    beserta fingerprint data sebagai versi model
+    """
+    rows = []
+    with _lock:
+        items = list(_memory.items())
+        current = {key: _format_fingerprint(*state) for key, state in _fingerprints.items()}
+    for (table, target, group, fingerprint), (model, *_) in items:
+        if current.get((table, target, group), fingerprint) != fingerprint:
+            continue  # model versi lama yang masih ada di cache memori
+        keputusan = getattr(model, "anomali_", None)
+        if not keputusan:
+            continue
+        for tahun, skor in zip(keputusan["tahun"], keputusan["skor"]):
+            rows.append({"table": table, "target": target, "group": group, "id_tahun": tahun, "skor": skor,
+                         "mode": keputusan["mode"], "metode": keputusan["metode"],
+                         "engine": getattr(model, "engine_", "svr"), "versi": fingerprint[:16]})
+    return pd.DataFrame(rows, columns=["table", "target", "group", "id_tahun", "skor", "mode", "metode", "engine", "versi"])
+
+def train_table_models(table, data, targets, group_by=None):
+    """
+    Latih/ambil semua model satu tabel, dikelompokkan bila perlu.
+    Anomali semua seri tabel dideteksi sekaligus (sekali, saat model pertama
+    perlu dilatih) lalu diteruskan ke tiap model.
+    """
+    models = {}
+    with _lock:
+        _tables[table] = data
+    anomali = {}
+
+    def anomali_seri(key):
+        if not anomali:
+            anomali.update(catatan_tabel(data, targets, group_by) or {None: None})
+        return anomali.get(key)
+
+    if group_by is None:
+        for target in targets:
+            models[target] = get_model(table, target, data, anomali=partial(anomali_seri, target))
+    else:
+        for group, group_data in data.groupby(group_by):
+            if len(group_data) < 3:
+                continue
+            for target in targets:
+                models[(group, target)] = get_model(table, target, group_data, group=group,
+                                                    anomali=partial(anomali_seri, (group, target)))
+    return models
+
+def table_fingerprint(table, data):
+    """Fingerprint seluruh kolom model satu tabel (tahun, target dan kolom kelompok)"""
+    spec = _TABLE_SPECS[table]
+    numeric = FEATURE_COLUMNS + spec["targets"]
+    frame = data[numeric].astype("float64")
+    if spec.get("group_by"):
+        frame[spec["group_by"]] = data[spec["group_by"]].astype(str)
+    hashes = pd.util.hash_pandas_object(frame, index=False).to_numpy()
+    return _format_fingerprint(hashes.sum(dtype=np.uint64), len(hashes))
+
+def mark_ready(report):
+    """
+    Tandai bahwa warmup selesai, beserta durasi per halaman. Versi store, engine
+    dan fingerprint tabel tiap halaman (report[page]["fingerprint"]) ikut disimpan
+    agar is_ready() tahu kapan hasil warmup sudah kedaluwarsa.
+    """
+    os.makedirs(STORE_DIR, exist_ok=True)
+    with open(READY_FILE, "w", encoding="utf-8") as f:
+        json.dump({"finished_at": time.time(), "versi": STORE_VERSION, "engine": ENGINE, "pages": report}, f, indent=2)
+
+def _read_ready():
+    try:
+        with open(READY_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def is_ready():
+    """
+    Warmup selesai untuk versi store dan engine saat ini, dan tabel yang sudah
+    dimuat proses ini (termasuk perubahan lewat apply_delta) masih sama dengan
+    data saat warmup
+    """
+    ready = _read_ready()
+    if ready is None or ready.get("versi") != STORE_VERSION or ready.get("engine") != ENGINE:
+        return False
+    with _lock:
+        tables = dict(_tables)
+    for info in ready.get("pages", {}).values():
+        data = tables.get(info.get("table"))
+        if data is not None and info.get("fingerprint") != table_fingerprint(info["table"], data):
+            return False
+    return True
+
+def ready_report():
+    return _read_ready() if is_ready() else None
+
+def _refit(table, target, group, data):
+    """
+    Latih ulang satu target memakai statistik scaler yang sudah diperbarui;
+    metrik CV ditunda sampai halaman membutuhkannya.
+    """
+    n, total, total_sq = _scaler_stats[(table, group)]
+    mean = total / n
+    var = max(total_sq / n - mean ** 2, 0.0)
+
+    scaler = StandardScaler()
+    scaler.mean_ = np.array([mean])
+    scaler.var_ = np.array([var])
+    scaler.scale_ = np.array([np.sqrt(var) if var > 0 else 1.0])
+    scaler.n_samples_seen_ = n
+    scaler.n_features_in_ = 1
+
+    hash_sum, rows = _fingerprints[(table, target, group)]
+    key = (table, target, group, _format_fingerprint(hash_sum, rows))
+
+    keputusan, weights = catat_anomali(data[FEATURE_COLUMNS[0]].values, data[target].values)
+    engine = _engines.get((table, target, group), "svr")
+    if engine != "svr":
+        # Baseline cukup murah untuk di-fit ulang penuh
+        model = ENGINES[engine]().fit(data[FEATURE_COLUMNS].values, data[target].values, sample_weight=weights)
+        model.engine_ = engine
+        model.anomali_ = keputusan
+        with _lock:
+            _memory[key] = (model, None, None, None)
+        return key
+
+    model = build_svr_pipeline(**(stored_params(table, target, group) or {}))
+    svr = model.named_steps["svr"]
+    svr.fit(scaler.transform(data[FEATURE_COLUMNS].values), data[target].values, sample_weight=weights)
+    model = Pipeline([("scaler", scaler), ("svr", svr)])
+    model.engine_ = "svr"
+    model.anomali_ = keputusan
+    with _lock:
+        _memory[key] = (model, None, None, None)
+    return key
+
+def apply_delta(table, op, rows):
+    """
+    Terapkan perubahan (insert/update/delete) dari fungsi tulis data_* ke cache:
+    perbarui tabel, fingerprint dan statistik scaler hanya untuk baris yang
+    berubah, lalu latih ulang target yang terdampak saja.
+    """
+    spec = _TABLE_SPECS.get(table)
+    if spec is None or table not in _tables or not rows:
+        return []
+
+    group_by = spec.get("group_by")
+    key_cols = FEATURE_COLUMNS + ([group_by] if group_by else [])
+    df = _tables[table]
+    delta = pd.DataFrame(rows)
+    if group_by:
+        delta_index = pd.MultiIndex.from_frame(delta[key_cols])
+    else:
+        delta_index = pd.Index(delta[FEATURE_COLUMNS[0]], name=FEATURE_COLUMNS[0])
+    current = df.set_index(key_cols if group_by else FEATURE_COLUMNS[0])
+    old = current.reindex(delta_index)
+    existed = current.index.isin(delta_index)
+
+    if op == "delete":
+        new = old.iloc[0:0]
+    else:
+        new = old.copy()
+        for col in spec["targets"]:
+            if col in delta.columns:
+                new[col] = delta[col].to_numpy()
+    updated = pd.concat([current[~existed], new]).reset_index()
+    updated = updated.sort_values(FEATURE_COLUMNS).reset_index(drop=True)
+
+    affected = set()
+    for i, index in enumerate(delta_index):
+        group = index[1] if group_by else None
+        x = float(index[0] if group_by else index)
+        old_row = old.iloc[i]
+        row_exists = old_row[spec["targets"]].notna().all()
+
+        # Statistik scaler id_tahun hanya berubah saat baris bertambah/berkurang
+        if (table, group) in _scaler_stats:
+            stats = _scaler_stats[(table, group)]
+            if op == "insert" and not row_exists:
+                stats[0] += 1; stats[1] += x; stats[2] += x * x
+            elif op == "delete" and row_exists:
+                stats[0] -= 1; stats[1] -= x; stats[2] -= x * x
+
+        for target in spec["targets"]:
+            state = _fingerprints.get((table, target, group))
+            if state is None:
+                continue
+            new_value = None if op == "delete" else new.iloc[i][target]
+            if op == "update" and row_exists and old_row[target] == new_value:
+                continue
+            cols = FEATURE_COLUMNS + [target]
+            with np.errstate(over="ignore"):  # jumlah hash memang modulo 2^64
+                if row_exists:
+                    old_hash = _row_hashes(pd.DataFrame([[x, old_row[target]]], columns=cols), cols)[0]
+                    state[0] = np.uint64(state[0]) - old_hash
+                    state[1] -= 1
+                if op != "delete":
+                    new_hash = _row_hashes(pd.DataFrame([[x, new_value]], columns=cols), cols)[0]
+                    state[0] = np.uint64(state[0]) + new_hash
+                    state[1] += 1
+            affected.add((target, group))
+
+    with _lock:
+        _tables[table] = updated
+
+    refitted = []
+    for target, group in affected:
+        data = updated if group is None else updated[updated[group_by] == group]
+        if len(data) >= 3 and _scaler_stats.get((table, group), [0])[0] == len(data):
+            refitted.append(_refit(table, target, group, data))
+    logger.info("incremental_update", extra={"table": table, "rows": len(rows), "target": ",".join(sorted({t for t, _ in affected}))})
+    return refitted
+
+subscribe(apply_delta)
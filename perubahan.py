@@ -0,0 +1,45 @@
+import threading
+from logging_setup import get_logger
+
+logger = get_logger("perubahan")
+
+_subscribers = []
+_lock = threading.Lock()
+
+def subscribe(callback):
+    """
+    Daftarkan callback(table, op, rows) yang dipanggil setiap kali fungsi
+    tulis data_* berhasil. op: "insert", "update" atau "delete";
+    rows: list of dict berisi kunci (id_tahun, dst.) dan nilai baru.
+    """
+    with _lock:
+        if callback not in _subscribers:
+            _subscribers.append(callback)
+    return callback
+
+def unsubscribe(callback):
+    with _lock:
+        if callback in _subscribers:
+            _subscribers.remove(callback)
+
+def kirim(table, op, rows):
+    """Teruskan perubahan ke semua subscriber; kegagalan subscriber tidak menggagalkan penulisan"""
+    with _lock:
+        subscribers = list(_subscribers)
+    for callback in subscribers:
+        try:
+            callback(table, op, rows)
+        except Exception as e:
+            logger.error("subscriber_error", extra={"table": table, "error": f"{getattr(callback, '__name__', callback)}: {e}"})
+
+def publish(table, op, rows, old=None):
+    """
+    Catat perubahan ke log audit (audit.py) lalu teruskan ke subscriber.
+    old: nilai baris sebelum update/delete, sejajar dengan rows (opsional).
+    """
+    try:
+        from audit import catat
+        catat(table, op, rows, old=old)
+    except Exception as e:
+        logger.error("audit_error", extra={"table": table, "error": str(e)})
+    kirim(table, op, rows)
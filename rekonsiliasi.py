@@ -0,0 +1,174 @@
+import numpy as np
+import pandas as pd
+
+from logging_setup import get_logger
+
+logger = get_logger("rekonsiliasi")
+
+TARGET_JENIS_KELAMIN = ['jumlah_penduduk', 'laki_laki', 'perempuan']
+TARGET_USIA = ['total', 'laki_laki', 'perempuan']
+
+def summing_matrix(hierarki):
+    """
+    Bangun summing matrix S untuk satu hierarki.
+    hierarki: dict {nama_agregat: [nama_seri_bawah, ...]}
+    Baris S = agregat lalu seri bawah, kolom S = seri bawah.
+    """
+    bottom = list(dict.fromkeys(c for children in hierarki.values() for c in children))
+    aggregates = list(hierarki.keys())
+    pos = {name: i for i, name in enumerate(bottom)}
+
+    A = np.zeros((len(aggregates), len(bottom)))
+    for i, children in enumerate(hierarki.values()):
+        A[i, [pos[c] for c in children]] = 1.0
+
+    S = np.vstack([A, np.eye(len(bottom))])
+    return S, aggregates + bottom, bottom
+
+def constraint_matrix(series, hierarki_list):
+    """
+    Ubah satu atau beberapa summing matrix S = [A; I] menjadi matriks
+    kendala C (C @ y = 0) atas seluruh seri. Beberapa hierarki yang berbagi
+    seri (misal total = laki + perempuan dan total = jumlah semua desa)
+    cukup ditumpuk barisnya.
+    """
+    pos = {name: i for i, name in enumerate(series)}
+    rows = []
+    for hierarki in hierarki_list:
+        S, names, bottom = summing_matrix(hierarki)
+        n_agg = len(names) - len(bottom)
+        C = np.zeros((n_agg, len(series)))
+        C[np.arange(n_agg), [pos[a] for a in names[:n_agg]]] = 1.0
+        C[:, [pos[b] for b in bottom]] -= S[:n_agg]
+        rows.append(C)
+    return np.vstack(rows) if rows else np.zeros((0, len(series)))
+
+def reconcile(base, hierarki_list, weights=None):
+    """
+    Rekonsiliasi prediksi dasar supaya koheren (agregat = jumlah komponennya).
+
+    base: DataFrame dengan index = nama seri, kolom = tahun prediksi
+    hierarki_list: list hierarki (lihat summing_matrix)
+    weights: varians error per seri (misal MAE²) untuk WLS, default OLS
+
+    Semua tahun direkonsiliasi sekaligus: Y_rekon = (I - W Cᵀ (C W Cᵀ)⁺ C) Y,
+    bentuk kendala yang setara dengan proyeksi S (SᵀW⁻¹S)⁻¹ SᵀW⁻¹ untuk satu hierarki.
+    """
+    series = list(base.index)
+    Y = base.to_numpy(dtype=float)
+    C = constraint_matrix(series, hierarki_list)
+    if C.shape[0] == 0:
+        return base.copy()
+
+    weights = {k: v for k, v in (weights or {}).items() if v is not None and np.isfinite(v)}
+    if not weights:
+        W = np.ones(len(series))
+    else:
+        default = float(np.median(list(weights.values())))
+        W = np.array([max(float(weights.get(s, default)), 1e-9) for s in series])
+
+    WCt = W[:, None] * C.T
+    P = np.eye(len(series)) - WCt @ np.linalg.pinv(C @ WCt) @ C
+    return pd.DataFrame(P @ Y, index=base.index, columns=base.columns)
+
+def rekonsiliasi_kecamatan(pred_jenis_kelamin, pred_usia=None, pred_desa=None, mae=None):
+    """
+    Rekonsiliasi prediksi kecamatan dalam satu langkah.
+
+    pred_jenis_kelamin: dict {'jumlah_penduduk', 'laki_laki', 'perempuan'} -> array per tahun
+    pred_usia: dict {kelompok_umur: {'total', 'laki_laki', 'perempuan'} -> array}
+    pred_desa: dict {nama_desa: array}
+    mae: dict {nama_seri: MAE} untuk pembobotan (opsional)
+
+    Nama seri hasil: 'jumlah_penduduk', 'laki_laki', 'perempuan',
+    'usia:<kelompok>:<kolom>' dan 'desa:<nama>'.
+    """
+    base = {name: np.asarray(values, dtype=float) for name, values in pred_jenis_kelamin.items()}
+    hierarki_list = [{'jumlah_penduduk': ['laki_laki', 'perempuan']}]
+
+    if pred_usia:
+        for group, values in pred_usia.items():
+            for col, arr in values.items():
+                base[f'usia:{group}:{col}'] = np.asarray(arr, dtype=float)
+        groups = list(pred_usia.keys())
+        hierarki_list.append({
+            f'usia:{g}:total': [f'usia:{g}:laki_laki', f'usia:{g}:perempuan'] for g in groups
+        })
+        hierarki_list.append({
+            'laki_laki': [f'usia:{g}:laki_laki' for g in groups],
+            'perempuan': [f'usia:{g}:perempuan' for g in groups]
+        })
+
+    if pred_desa:
+        for name, arr in pred_desa.items():
+            base[f'desa:{name}'] = np.asarray(arr, dtype=float)
+        hierarki_list.append({'jumlah_penduduk': [f'desa:{name}' for name in pred_desa]})
+
+    base_df = pd.DataFrame(base).T
+    weights = {k: v ** 2 for k, v in mae.items()} if mae else None
+    return reconcile(base_df, hierarki_list, weights)
+
+def _ambil(table_name, target_columns):
+    """Tabel dari Supabase, atau DataFrame kosong jika tidak tersedia (seri itu dilewati)"""
+    from model import fetch_data
+    try:
+        return fetch_data(table_name, ["id_tahun"], target_columns)
+    except Exception as e:
+        logger.warning("reconcile_skip", extra={"table": table_name, "error": str(e)})
+        return pd.DataFrame()
+
+def _data_desa():
+    from data_utils import load_penduduk_desa_data
+    from model_desa import normalisasi_penduduk_desa
+    raw = load_penduduk_desa_data()
+    return normalisasi_penduduk_desa(raw) if not raw.empty else pd.DataFrame()
+
+def prediksi_kecamatan(years, df_tahunan=None, df_usia=None, df_desa=None, pred_usia=None):
+    """
+    Prediksi jenis kelamin (penduduk_tahunan), kelompok umur (penduduk_usia) dan
+    desa (penduduk_perdesa) untuk `years`, direkonsiliasi bersama dalam satu langkah
+    sehingga dashboard, halaman kelompok umur dan halaman desa menampilkan angka yang sama.
+
+    Data yang tidak diberikan diambil sendiri; model dari model_store dan model_desa
+    (dilatih hanya bila datanya berubah). pred_usia menggantikan model kelompok
+    umur dengan prediksi dasar lain (misal proyeksi kohort, format seperti
+    rekonsiliasi_kecamatan); MAE-nya tidak diketahui sehingga diberi bobot median.
+    Hasil: DataFrame (nama seri x tahun), nama seri seperti rekonsiliasi_kecamatan.
+    """
+    from model_store import get_model, train_table_models
+    from model_desa import koefisien_desa, prediksi_desa
+
+    years = np.asarray(years).ravel()
+    X = years.reshape(-1, 1)
+    if df_tahunan is None:
+        df_tahunan = _ambil("penduduk_tahunan", TARGET_JENIS_KELAMIN)
+    if df_usia is None and pred_usia is None:
+        df_usia = _ambil("penduduk_usia", ["kategori_usia"] + TARGET_USIA)
+    if df_desa is None:
+        df_desa = _data_desa()
+
+    pred_jenis_kelamin, mae = {}, {}
+    for target in TARGET_JENIS_KELAMIN:
+        model, mae[target], _, _ = get_model("penduduk_tahunan", target, df_tahunan)
+        pred_jenis_kelamin[target] = model.predict(X)
+
+    if pred_usia is None:
+        pred_usia = {}
+        if not df_usia.empty:
+            table_models = train_table_models("penduduk_usia", df_usia, TARGET_USIA, group_by="kategori_usia")
+            for (group, col), (model, err, _, _) in table_models.items():
+                pred_usia.setdefault(group, {})[col] = model.predict(X)
+                mae[f'usia:{group}:{col}'] = err
+
+    pred_desa = {}
+    koef = koefisien_desa(df_desa) if not df_desa.empty else pd.DataFrame()
+    if not koef.empty:
+        nama = koef["nama_desa"] if "nama_desa" in koef.columns else koef["id_desa"]
+        nilai = prediksi_desa(koef, years)["jumlah_penduduk"].to_numpy().reshape(len(koef), len(years))
+        for name, values, err in zip(nama, nilai, koef["MAE"]):
+            pred_desa[name] = values
+            mae[f'desa:{name}'] = err
+
+    hasil = rekonsiliasi_kecamatan(pred_jenis_kelamin, pred_usia, pred_desa, mae=mae)
+    hasil.columns = years
+    return hasil
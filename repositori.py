@@ -0,0 +1,121 @@
+"""
+Lapisan akses data asyncio di atas tabel Supabase yang sama.
+
+Query yang tidak saling bergantung (count + satu halaman baris, beberapa tabel
+untuk satu dashboard) dijalankan bersamaan dengan asyncio.gather sehingga waktu
+render mendekati query yang paling lambat, bukan jumlah semuanya.
+
+    df, total = jalankan(halaman("penduduk_usia", page=2))        # dari Streamlit (sync)
+    tabel = muat_tabel("penduduk_usia", "migrasi")                 # isi cache Arrow bersamaan
+
+Klien Supabase Python bersifat blocking (httpx sync), jadi setiap query
+dieksekusi di pool thread khusus; coroutine di sini hanya mengatur konkurensinya.
+"""
+import os
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+import model
+from instrumentasi import timed, span
+from logging_setup import get_logger
+
+logger = get_logger("repositori")
+
+# Jumlah query Supabase yang boleh berjalan bersamaan per proses
+DB_THREADS = int(os.getenv("SIDAREJA_DB_THREADS", "8"))
+_executor = ThreadPoolExecutor(max_workers=DB_THREADS, thread_name_prefix="db")
+
+# Event loop latar untuk facade sync; Streamlit menjalankan script di thread
+# biasa, sedangkan API sudah punya loop sendiri, jadi keduanya memakai loop ini.
+_loop = None
+_loop_lock = threading.Lock()
+
+def _get_loop():
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, daemon=True, name="repositori-loop").start()
+        return _loop
+
+def jalankan(coro):
+    """Facade sync: jalankan coroutine repositori dan tunggu hasilnya"""
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop()).result()
+
+def _client(client):
+    return client if client is not None else model.supabase
+
+@timed("db_query", tag_args=("table_name", "kind"))
+def _execute(table_name, kind, build, client=None):
+    return build(_client(client).table(table_name)).execute()
+
+async def _run(table_name, kind, build, client=None):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, _execute, table_name, kind, build, client)
+
+def _bersihkan(df):
+    return df.replace([float("inf"), float("-inf")], 0).fillna(0)
+
+async def hitung(table_name, client=None):
+    """Jumlah baris tabel (count exact tanpa mengambil isinya)"""
+    response = await _run(table_name, "count", lambda q: q.select("count", count="exact"), client)
+    return response.count
+
+async def ambil(table_name, columns="*", order=None, offset=None, limit=None, client=None):
+    """Baris tabel sebagai DataFrame; offset/limit memakai range PostgREST"""
+    def build(query):
+        query = query.select(columns)
+        if order:
+            query = query.order(order)
+        if limit is not None:
+            start = offset or 0
+            query = query.range(start, start + limit - 1)
+        return query
+
+    response = await _run(table_name, "select", build, client)
+    return _bersihkan(pd.DataFrame(response.data))
+
+async def halaman(table_name, page=1, per_page=10, order="id_tahun", client=None):
+    """Satu halaman data + total baris; kedua query dikirim bersamaan"""
+    df, total = await asyncio.gather(
+        ambil(table_name, order=order, offset=(page - 1) * per_page, limit=per_page, client=client),
+        hitung(table_name, client=client)
+    )
+    return df, total
+
+async def ambil_banyak(specs, client=None):
+    """
+    Beberapa query sekaligus, misal {"usia": ("penduduk_usia", "*"), "migrasi": ("migrasi", "*")}.
+    Hasil dict nama -> DataFrame dengan urutan yang sama.
+    """
+    names = list(specs)
+    frames = await asyncio.gather(*(ambil(table, columns, client=client) for table, columns in specs.values()))
+    return dict(zip(names, frames))
+
+async def _muat_tabel(table_names):
+    from arrow_store import get_table
+
+    loop = asyncio.get_running_loop()
+    tables = await asyncio.gather(
+        *(loop.run_in_executor(_executor, get_table, name) for name in table_names),
+        return_exceptions=True
+    )
+    hasil = {}
+    for name, table in zip(table_names, tables):
+        if isinstance(table, Exception):
+            logger.warning("prefetch_error", extra={"table": name, "error": str(table)})
+        else:
+            hasil[name] = table
+    return hasil
+
+def muat_tabel(*table_names):
+    """
+    Ambil beberapa tabel ke cache Arrow bersamaan (sync). Dipanggil di awal
+    halaman yang memakai lebih dari satu tabel sehingga fetch_data berikutnya
+    langsung kena cache. Tabel yang gagal diambil dilewati (dicatat di log).
+    """
+    with span("prefetch", tables=",".join(table_names)):
+        return jalankan(_muat_tabel(table_names))
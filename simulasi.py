@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+from kohort import (
+    KELOMPOK_USIA, JENIS_KELAMIN, DEFAULT_MORTALITAS, DISTRIBUSI_MIGRASI, N_STATE,
+    state_dari_tabel, kalibrasi, net_migrasi_rata2, vektor_migrasi, matriks_proyeksi, proyeksi
+)
+
+PERSENTIL = (5, 25, 50, 75, 95)
+VOLATILITAS_FERTILITAS = 0.05   # simpangan relatif kelahiran per tahun
+VOLATILITAS_MORTALITAS = 0.05   # simpangan relatif kematian per tahun
+MIN_PATHS_PER_JOB = 2000        # di bawah ini overhead proses lebih besar dari hasilnya
+
+def volatilitas_migrasi(df_migrasi):
+    """Simpangan baku migrasi neto historis (0 jika data tidak cukup)"""
+    if df_migrasi is None or len(df_migrasi) < 2:
+        return 0.0
+    return float((df_migrasi["migrasi_masuk"] - df_migrasi["migrasi_keluar"]).std())
+
+def _simulasi_blok(state_awal, fertilitas, naik, mortalitas, net_migrasi, sd_migrasi, tahun, paths, skenario, seed):
+    """
+    Simulasikan `paths` jalur sekaligus; hasil (paths, tahun + 1, 6).
+    Setiap tahun memakai transisi kohort.matriks_proyeksi yang sama dengan
+    proyeksi deterministik, hanya kelahiran dan kematiannya diguncang per jalur.
+    """
+    rng = np.random.default_rng(seed)
+    mati = {jk: np.asarray(mortalitas[jk], dtype=float) * skenario["faktor_mortalitas"] for jk in JENIS_KELAMIN}
+
+    # Semua guncangan acak dibangkitkan sekaligus: (paths, tahun)
+    eps_lahir = rng.lognormal(0.0, VOLATILITAS_FERTILITAS, (paths, tahun))
+    eps_mati = rng.lognormal(0.0, VOLATILITAS_MORTALITAS, (paths, tahun))
+    migrasi = net_migrasi * skenario["faktor_migrasi"] + rng.normal(0.0, sd_migrasi, (paths, tahun))
+    migrasi = vektor_migrasi(migrasi, DISTRIBUSI_MIGRASI)                     # (paths, tahun, 6)
+    lahir = fertilitas * skenario["faktor_fertilitas"] * eps_lahir
+
+    hasil = np.empty((paths, tahun + 1, N_STATE))
+    x = np.broadcast_to(np.asarray(state_awal, dtype=float), (paths, N_STATE)).copy()
+    hasil[:, 0] = x
+    for t in range(tahun):
+        mortalitas_t = {jk: np.minimum(m * eps_mati[:, t, None], 1.0) for jk, m in mati.items()}
+        L = matriks_proyeksi(lahir[:, t], mortalitas_t, naik)             # (paths, 6, 6)
+        x = np.maximum(proyeksi(x, L, migrasi[:, t], 1)[1], 0.0)
+        hasil[:, t + 1] = x
+    return hasil
+
+def simulasi_skenario(df_usia, df_migrasi=None, tahun=30, paths=10000, faktor_migrasi=1.0,
+                      faktor_fertilitas=1.0, faktor_mortalitas=1.0, mortalitas=None, seed=0, n_jobs=1):
+    """
+    Simulasi Monte Carlo proyeksi kohort: kelahiran, kematian dan migrasi neto
+    diberi guncangan acak per jalur per tahun, ditambah faktor skenario dari pengguna
+    (misal faktor_migrasi=2 untuk "migrasi neto dua kali lipat").
+    Mengembalikan (tahun proyeksi, array paths x tahun x 6 tanpa tahun awal).
+    Dengan n_jobs > 1 jalur dibagi ke beberapa proses (seed tiap blok berbeda).
+    """
+    mortalitas = mortalitas or DEFAULT_MORTALITAS
+    years, states = state_dari_tabel(df_usia)
+    if len(years) == 0:
+        raise ValueError("penduduk_usia must contain groups " + ", ".join(KELOMPOK_USIA))
+
+    net = net_migrasi_rata2(df_migrasi)
+    fertilitas, naik = kalibrasi(states, net, mortalitas)
+    skenario = {
+        "faktor_migrasi": faktor_migrasi,
+        "faktor_fertilitas": faktor_fertilitas,
+        "faktor_mortalitas": faktor_mortalitas,
+    }
+    args = (states[-1], fertilitas, naik, mortalitas, net, volatilitas_migrasi(df_migrasi), tahun)
+
+    jobs = 1 if n_jobs in (None, 1) else max(1, min(paths // MIN_PATHS_PER_JOB, n_jobs if n_jobs > 0 else 64))
+    if jobs == 1:
+        hasil = _simulasi_blok(*args, paths, skenario, seed)
+    else:
+        ukuran = np.diff(np.linspace(0, paths, jobs + 1).astype(int))
+        seeds = np.random.SeedSequence(seed).spawn(jobs)
+        blok = Parallel(n_jobs=n_jobs)(
+            delayed(_simulasi_blok)(*args, int(p), skenario, s) for p, s in zip(ukuran, seeds)
+        )
+        hasil = np.concatenate(blok)
+    return years[-1] + np.arange(1, tahun + 1), hasil[:, 1:]
+
+def ringkas_persentil(tahun, hasil, persentil=PERSENTIL):
+    """
+    Ringkas jalur simulasi menjadi pita persentil per tahun untuk tiap
+    kelompok umur (laki-laki + perempuan) dan total.
+    Kolom: id_tahun, kategori_usia, mean, p5, p25, p50, ...
+    """
+    n = len(KELOMPOK_USIA)
+    per_kelompok = hasil[..., :n] + hasil[..., n:]                     # (paths, tahun, 3)
+    seri = np.concatenate([per_kelompok, per_kelompok.sum(axis=-1, keepdims=True)], axis=-1)
+    q = np.percentile(seri, persentil, axis=0)                         # (persentil, tahun, 4)
+    nama = KELOMPOK_USIA + ["Total"]
+    ringkas = pd.DataFrame({
+        "id_tahun": np.repeat(tahun, len(nama)),
+        "kategori_usia": np.tile(nama, len(tahun)),
+        "mean": seri.mean(axis=0).ravel(),
+    })
+    for i, p in enumerate(persentil):
+        ringkas[f"p{p}"] = q[i].ravel()
+    return ringkas
@@ -0,0 +1,139 @@
+"""
+Snapshot dataset berbasis isi (content-addressed) untuk training yang bisa direproduksi.
+
+Setiap kali arrow_store mengambil tabel dari Supabase (pertama kali, setelah TTL,
+atau setelah data ditulis), isinya dinormalkan (baris diurutkan menurut kolom
+kunci) lalu di-hash. Hash yang sama berarti isi yang sama: file tidak ditulis ulang dan model
+di model_store (yang juga dikunci dengan fingerprint isi) tidak dilatih ulang.
+
+Snapshot disimpan sebagai Feather tanpa kompresi di SNAPSHOT_DIR/<tabel>/<hash>.feather
+sehingga dibaca dengan memory map tanpa menyalin. Riwayat per tabel dicatat di
+SNAPSHOT_DIR/<tabel>/riwayat.jsonl. Model menyimpan id snapshot di model.snapshot_.
+
+    python snapshot.py                      # daftar snapshot terbaru per tabel
+    python snapshot.py --tabel migrasi      # riwayat satu tabel
+    python snapshot.py --sisakan 20         # hapus snapshot lama, sisakan 20 per tabel
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from instrumentasi import timed
+from logging_setup import get_logger
+
+logger = get_logger("snapshot")
+
+SNAPSHOT_DIR = os.getenv("SIDAREJA_SNAPSHOT_DIR", os.path.join("cache", "snapshots"))
+RIWAYAT = "riwayat.jsonl"
+
+_terakhir = {}      # table -> id snapshot terakhir yang dibuat/dimuat proses ini
+_lock = threading.Lock()
+
+def _kanonik(table, kunci):
+    """Urutan baris tetap, sehingga isi yang sama selalu menghasilkan byte yang sama"""
+    urut = [col for col in kunci if col in table.column_names] or table.column_names
+    return table.sort_by([(col, "ascending") for col in urut]).combine_chunks()
+
+def hash_isi(table):
+    """SHA-256 dari aliran Arrow IPC tanpa kompresi (skema + buffer kolom)"""
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return hashlib.sha256(sink.getvalue()).hexdigest()[:16]
+
+def _path(snapshot_id):
+    table_name, digest = snapshot_id.rsplit("@", 1)
+    return os.path.join(SNAPSHOT_DIR, table_name, f"{digest}.feather")
+
+@timed("snapshot", tag_args=("table_name",))
+def simpan(table_name, table, **meta):
+    """
+    Simpan snapshot tabel Arrow dan kembalikan id-nya ("<tabel>@<hash>").
+    Isi yang sudah pernah disimpan tidak ditulis ulang. `meta` (misal sumber
+    data) ikut dicatat di baris riwayat.
+    """
+    from audit import kolom_kunci
+
+    if table.num_rows == 0:
+        return None
+    table = _kanonik(table, kolom_kunci(table_name))
+    snapshot_id = f"{table_name}@{hash_isi(table)}"
+    path = _path(snapshot_id)
+    if terakhir(table_name) == snapshot_id and os.path.exists(path) and _meta_sama(table_name, meta):
+        return snapshot_id
+
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        feather.write_feather(table, tmp, compression="uncompressed")
+        os.replace(tmp, path)
+        logger.info("snapshot_saved", extra={"table": table_name, "rows": table.num_rows, "snapshot": snapshot_id})
+    # Riwayat mencatat setiap pergantian isi, termasuk kembali ke snapshot lama
+    with _lock:
+        _terakhir[table_name] = snapshot_id
+        with open(os.path.join(os.path.dirname(path), RIWAYAT), "a", encoding="utf-8") as f:
+            f.write(json.dumps({"id": snapshot_id, "ts": round(time.time(), 3), "rows": table.num_rows, **meta}) + "\n")
+    return snapshot_id
+
+def _meta_sama(table_name, meta):
+    if not meta:
+        return True
+    items = riwayat(table_name)
+    return bool(items) and all(items[-1].get(k) == v for k, v in meta.items())
+
+def muat(snapshot_id):
+    """Tabel Arrow dari snapshot (memory-mapped, tanpa salinan)"""
+    return feather.read_table(_path(snapshot_id), memory_map=True)
+
+def terakhir(table_name):
+    """Id snapshot terakhir tabel di proses ini, atau dari riwayat di disk"""
+    with _lock:
+        if table_name in _terakhir:
+            return _terakhir[table_name]
+    items = riwayat(table_name)
+    return items[-1]["id"] if items else None
+
+def riwayat(table_name):
+    path = os.path.join(SNAPSHOT_DIR, table_name, RIWAYAT)
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def bersihkan(sisakan=20):
+    """Hapus file snapshot lama; `sisakan` snapshot terbaru per tabel dipertahankan"""
+    dihapus = 0
+    if not os.path.isdir(SNAPSHOT_DIR):
+        return dihapus
+    for table_name in os.listdir(SNAPSHOT_DIR):
+        simpan_id = {item["id"] for item in riwayat(table_name)[-sisakan:]}
+        simpan_id.add(terakhir(table_name))
+        folder = os.path.join(SNAPSHOT_DIR, table_name)
+        for name in os.listdir(folder):
+            if name.endswith(".feather") and f"{table_name}@{name[:-8]}" not in simpan_id:
+                os.remove(os.path.join(folder, name))
+                dihapus += 1
+    return dihapus
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Snapshot dataset Sidareja")
+    parser.add_argument("--tabel", default=None)
+    parser.add_argument("--sisakan", type=int, default=None, help="Hapus snapshot lama, sisakan N per tabel")
+    args = parser.parse_args()
+
+    if args.sisakan is not None:
+        print(f"{bersihkan(args.sisakan)} snapshot dihapus")
+    elif args.tabel:
+        for item in riwayat(args.tabel):
+            print(f"{item['id']:<40} {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(item['ts']))} {item['rows']:>8} baris")
+    elif os.path.isdir(SNAPSHOT_DIR):
+        for table_name in sorted(os.listdir(SNAPSHOT_DIR)):
+            items = riwayat(table_name)
+            if items:
+                print(f"{table_name:<20} {items[-1]['id']:<40} ({len(items)} versi)")
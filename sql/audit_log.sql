@@ -0,0 +1,20 @@
+-- Log perubahan append-only untuk semua penulisan data_* dan crud.py (lihat audit.py).
+-- Satu baris per baris data yang berubah. `id` diambil saat insert, bukan saat commit,
+-- jadi bisa terlihat tidak berurutan; pembaca membaca ulang jendela id terakhir dan
+-- melewati id yang sudah diproses (audit.entri_baru). Jalankan sekali di SQL editor Supabase.
+create table if not exists audit_log (
+    id bigserial primary key,
+    ts timestamptz not null default now(),
+    tabel text not null,
+    op text not null check (op in ('insert', 'update', 'delete')),
+    kunci jsonb not null,
+    lama jsonb,
+    baru jsonb,
+    pengguna text,
+    sumber text
+);
+
+create index if not exists audit_log_tabel_id on audit_log (tabel, id);
+
+-- Append-only: baris log tidak boleh diubah atau dihapus lewat API
+revoke update, delete on audit_log from anon, authenticated;
@@ -0,0 +1,53 @@
+-- Semua indikator tahunan dalam satu baris per id_tahun untuk halaman Ringkasan.
+-- Halaman cukup mengirim satu request (GET /rest/v1/indikator_tahunan) alih-alih
+-- enam query terpisah. Jalankan sekali di SQL editor Supabase.
+create or replace view indikator_tahunan as
+with tahun as (
+    select id_tahun from penduduk_tahunan
+    union select id_tahun from keluarga
+    union select id_tahun from migrasi
+    union select id_tahun from status_perkawinan
+    union select id_tahun from putus_sekolah
+    union select id_tahun from penduduk_usia
+),
+usia as (
+    select
+        id_tahun,
+        sum(total)      filter (where kategori_usia = '0-14')  as usia_0_14_total,
+        sum(laki_laki)  filter (where kategori_usia = '0-14')  as usia_0_14_laki_laki,
+        sum(perempuan)  filter (where kategori_usia = '0-14')  as usia_0_14_perempuan,
+        sum(total)      filter (where kategori_usia = '15-60') as usia_15_60_total,
+        sum(laki_laki)  filter (where kategori_usia = '15-60') as usia_15_60_laki_laki,
+        sum(perempuan)  filter (where kategori_usia = '15-60') as usia_15_60_perempuan,
+        sum(total)      filter (where kategori_usia = '60+')   as usia_60_plus_total,
+        sum(laki_laki)  filter (where kategori_usia = '60+')   as usia_60_plus_laki_laki,
+        sum(perempuan)  filter (where kategori_usia = '60+')   as usia_60_plus_perempuan
+    from penduduk_usia
+    group by id_tahun
+)
+select
+    t.id_tahun,
+    p.jumlah_penduduk,
+    p.laki_laki,
+    p.perempuan,
+    k.jumlah_kepala_keluarga,
+    k.pria,
+    k.wanita,
+    m.migrasi_masuk,
+    m.migrasi_keluar,
+    s.status_kawin,
+    s.cerai_hidup,
+    ps.jumlah_putus_sekolah,
+    u.usia_0_14_total, u.usia_0_14_laki_laki, u.usia_0_14_perempuan,
+    u.usia_15_60_total, u.usia_15_60_laki_laki, u.usia_15_60_perempuan,
+    u.usia_60_plus_total, u.usia_60_plus_laki_laki, u.usia_60_plus_perempuan
+from tahun t
+left join penduduk_tahunan p using (id_tahun)
+left join keluarga k using (id_tahun)
+left join migrasi m using (id_tahun)
+left join status_perkawinan s using (id_tahun)
+left join putus_sekolah ps using (id_tahun)
+left join usia u using (id_tahun)
+order by t.id_tahun;
+
+grant select on indikator_tahunan to anon, authenticated;
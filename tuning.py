@@ -0,0 +1,172 @@
+"""
+Pencarian hyperparameter SVR (C, epsilon, kernel) untuk semua tabel & target.
+
+    python tuning.py                    # grid search semua model halaman ui_*
+    python tuning.py --method halving   # successive halving (lebih cepat untuk grid besar)
+    python tuning.py --jobs 4           # batasi jumlah proses
+
+Hasil disimpan per fingerprint data di cache/params.json; training di halaman
+hanya fit dengan parameter pemenang tanpa mencari ulang.
+"""
+import os
+import json
+import time
+import argparse
+import warnings
+import threading
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.model_selection import GridSearchCV
+from sklearn.exceptions import ConvergenceWarning
+
+from backtest import time_series_splits, HORIZONS
+from logging_setup import get_logger
+
+logger = get_logger("tuning")
+
+PARAMS_FILE = os.getenv("SIDAREJA_PARAMS_FILE", os.path.join("cache", "params.json"))
+
+PARAM_GRID = {
+    "svr__kernel": ["linear", "rbf"],
+    "svr__C": [1, 10, 100, 250, 1000],
+    "svr__epsilon": [0.01, 0.1, 1.0],
+}
+
+_params = None   # isi PARAMS_FILE: "table|group|target" -> {"fingerprint", "params", "mae", ...}
+_lock = threading.Lock()
+
+def _key(table, target, group=None):
+    return f"{table}|{'-' if group is None else group}|{target}"
+
+def _load():
+    global _params
+    if _params is None:
+        try:
+            with open(PARAMS_FILE, encoding="utf-8") as f:
+                _params = json.load(f)
+        except (OSError, ValueError):
+            _params = {}
+    return _params
+
+def _write():
+    os.makedirs(os.path.dirname(PARAMS_FILE) or ".", exist_ok=True)
+    tmp = PARAMS_FILE + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(_params, f, indent=2, sort_keys=True)
+    os.replace(tmp, PARAMS_FILE)
+
+def stored_params(table, target, group=None):
+    """
+    Parameter pemenang terakhir untuk model ini, atau None jika belum pernah dituning.
+    Setelah data berubah parameter lama tetap dipakai sampai tuning berikutnya.
+    """
+    with _lock:
+        entry = _load().get(_key(table, target, group))
+    return None if entry is None else entry["params"]
+
+def _is_tuned(table, target, group, fingerprint):
+    with _lock:
+        entry = _load().get(_key(table, target, group))
+    return entry is not None and entry["fingerprint"] == fingerprint
+
+def search_params(X, y, method="grid", n_jobs=1):
+    """
+    Cari kombinasi C/epsilon/kernel terbaik dengan split backtest time-series
+    yang sama untuk semua kandidat. Mengembalikan (params, mae backtest).
+    """
+    from model import build_svr_pipeline
+
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y, dtype=float)
+    order = np.argsort(X[:, 0], kind="stable")
+    X, y = X[order], y[order]
+    splits = list(time_series_splits(len(y), min_train=max(2, min(3, len(y) - 1)), horizon=max(HORIZONS)))
+    if not splits:
+        raise ValueError("Not enough rows for backtest splits")
+
+    if method == "halving":
+        from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+        from sklearn.model_selection import HalvingGridSearchCV
+        search = HalvingGridSearchCV(
+            build_svr_pipeline(), PARAM_GRID, cv=splits, scoring="neg_mean_absolute_error",
+            resource="svr__max_iter", min_resources=1000, max_resources=100000, n_jobs=n_jobs
+        )
+    elif method == "grid":
+        search = GridSearchCV(build_svr_pipeline(), PARAM_GRID, cv=splits, scoring="neg_mean_absolute_error", n_jobs=n_jobs)
+    else:
+        raise ValueError(f"Unknown search method: {method}")
+
+    with warnings.catch_warnings():
+        # Iterasi awal successive halving sengaja dihentikan sebelum konvergen
+        warnings.simplefilter("ignore", ConvergenceWarning)
+        search.fit(X, y)
+    params = {name.split("__", 1)[1]: value for name, value in search.best_params_.items() if name in PARAM_GRID}
+    return params, float(-search.best_score_)
+
+def _tune_one(table, target, group, data, fingerprint, method):
+    from model_store import FEATURE_COLUMNS
+
+    start = time.perf_counter()
+    params, mae = search_params(data[FEATURE_COLUMNS].values, data[target].values, method=method)
+    return _key(table, target, group), {
+        "fingerprint": fingerprint,
+        "params": params,
+        "mae": mae,
+        "method": method,
+        "duration_s": round(time.perf_counter() - start, 3),
+    }
+
+def tune_tables(tables, method="grid", jobs=-1, force=False):
+    """
+    Tuning semua target untuk {table: (DataFrame, targets, group_by)} secara paralel.
+    Target yang fingerprint datanya belum berubah sejak tuning terakhir dilewati.
+    """
+    from model_store import FEATURE_COLUMNS, data_fingerprint
+
+    tasks = []
+    for table, (data, targets, group_by) in tables.items():
+        groups = [(None, data)] if group_by is None else list(data.groupby(group_by))
+        for group, group_data in groups:
+            if len(group_data) < 3:
+                continue
+            for target in targets:
+                fingerprint = data_fingerprint(group_data, FEATURE_COLUMNS + [target])
+                if not force and _is_tuned(table, target, group, fingerprint):
+                    continue
+                tasks.append((table, target, group, group_data, fingerprint))
+
+    results = Parallel(n_jobs=jobs)(
+        delayed(_tune_one)(table, target, group, data, fingerprint, method)
+        for table, target, group, data, fingerprint in tasks
+    )
+    with _lock:
+        _load().update(dict(results))
+        _write()
+    for key, entry in results:
+        logger.info("tune", extra={"table": key, "mae": entry["mae"], "fit_ms": entry["duration_s"] * 1000})
+    return dict(results)
+
+def run_tuning(method="grid", jobs=-1, force=False):
+    """Ambil data semua halaman ui_* lalu tuning semua modelnya"""
+    from model import fetch_data
+    from model_store import MODEL_SPECS, FEATURE_COLUMNS
+
+    tables = {}
+    for spec in MODEL_SPECS.values():
+        group_by = spec.get("group_by")
+        columns = spec["targets"] + ([group_by] if group_by else [])
+        df = fetch_data(spec["table"], FEATURE_COLUMNS, columns)
+        tables[spec["table"]] = (df, spec["targets"], group_by)
+    return tune_tables(tables, method=method, jobs=jobs, force=force)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tuning hyperparameter model prediksi Sidareja")
+    parser.add_argument("--method", choices=["grid", "halving"], default="grid")
+    parser.add_argument("--jobs", type=int, default=-1, help="Jumlah proses paralel (default: semua core)")
+    parser.add_argument("--force", action="store_true", help="Tuning ulang walau data tidak berubah")
+    args = parser.parse_args()
+
+    results = run_tuning(method=args.method, jobs=args.jobs, force=args.force)
+    for key, entry in sorted(results.items()):
+        print(f"{key:<50} {entry['params']}  MAE={entry['mae']:,.2f}")
+    print(f"{len(results)} model dituning, hasil di {PARAMS_FILE}")
@@ -0,0 +1,220 @@
+"""
+Validasi data deklaratif per tabel.
+
+Setiap aturan memeriksa seluruh DataFrame sekaligus (operasi kolom numpy/pandas,
+tanpa loop per baris), sehingga aturan yang sama dipakai untuk satu baris dari
+form, impor massal, data yang sudah ada, dan sebelum training model.
+
+    python validasi.py          # periksa semua tabel di Supabase
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from instrumentasi import timed
+from logging_setup import get_logger
+
+logger = get_logger("validasi")
+
+ERROR = "error"
+PERINGATAN = "peringatan"
+
+# cek(df) -> mask boolean baris yang melanggar; aturan dilewati jika kolomnya tidak ada di df
+Aturan = namedtuple("Aturan", ["nama", "kolom", "cek", "pesan", "level"])
+
+def _angka(df, col):
+    return pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float)
+
+def wajib(*kolom):
+    return [Aturan("wajib", [col], lambda df, col=col: df[col].isna().to_numpy(),
+                   f"{col} wajib diisi", ERROR) for col in kolom]
+
+def non_negatif(*kolom):
+    return [Aturan("non_negatif", [col], lambda df, col=col: _angka(df, col) < 0,
+                   f"{col} tidak boleh negatif", ERROR) for col in kolom]
+
+def positif(*kolom):
+    return [Aturan("positif", [col], lambda df, col=col: ~(_angka(df, col) > 0),
+                   f"{col} tidak boleh nol", ERROR) for col in kolom]
+
+def tidak_semua_nol(*kolom):
+    cols = list(kolom)
+    return [Aturan("tidak_semua_nol", cols, lambda df: (df[cols].fillna(0).to_numpy(dtype=float) == 0).all(axis=1),
+                   f"{' dan '.join(cols)} tidak boleh nol semua", ERROR)]
+
+def jumlah(total, *bagian, toleransi=0):
+    """total == jumlah bagian (misal jumlah_penduduk == laki_laki + perempuan)"""
+    cols = list(bagian)
+    return [Aturan("jumlah", [total] + cols,
+                   lambda df: np.abs(_angka(df, total) - df[cols].to_numpy(dtype=float).sum(axis=1)) > toleransi,
+                   f"{total} harus sama dengan {' + '.join(cols)}", ERROR)]
+
+def rentang(col, minimum, maksimum):
+    return [Aturan("rentang", [col], lambda df: ~((_angka(df, col) >= minimum) & (_angka(df, col) <= maksimum)),
+                   f"{col} harus di antara {minimum} dan {maksimum}", ERROR)]
+
+def anggota(col, nilai):
+    nilai = list(nilai)
+    return [Aturan("anggota", [col], lambda df: ~df[col].isin(nilai).to_numpy(),
+                   f"{col} harus salah satu dari {', '.join(map(str, nilai))}", ERROR)]
+
+def unik(*kolom):
+    cols = list(kolom)
+    return [Aturan("unik", cols, lambda df: df.duplicated(cols, keep=False).to_numpy(),
+                   f"Kombinasi {', '.join(cols)} duplikat", ERROR)]
+
+def lonjakan(col, batas, group=None):
+    """Perubahan dari tahun sebelumnya (per kelompok) lebih dari `batas` (0.5 = 50%)"""
+    cols = ["id_tahun", col] + ([group] if group else [])
+
+    def cek(df):
+        ordered = df.sort_values(["id_tahun"] if group is None else [group, "id_tahun"])
+        values = pd.to_numeric(ordered[col], errors="coerce")
+        prev = values.groupby(ordered[group]).shift() if group else values.shift()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = (values - prev).abs() / prev
+        return (ratio > batas).reindex(df.index).fillna(False).to_numpy()
+
+    return [Aturan("lonjakan", cols, cek, f"{col} berubah lebih dari {batas:.0%} dari tahun sebelumnya", PERINGATAN)]
+
+TAHUN = rentang("id_tahun", 1900, 3000)
+
+ATURAN = {
+    "penduduk_tahunan": [
+        *wajib("id_tahun", "jumlah_penduduk", "laki_laki", "perempuan"), *TAHUN,
+        *non_negatif("laki_laki", "perempuan"), *positif("jumlah_penduduk"),
+        *jumlah("jumlah_penduduk", "laki_laki", "perempuan"),
+        *unik("id_tahun"), *lonjakan("jumlah_penduduk", 0.2),
+    ],
+    "keluarga": [
+        *wajib("id_tahun", "jumlah_kepala_keluarga", "pria", "wanita"), *TAHUN,
+        *non_negatif("pria", "wanita"), *positif("jumlah_kepala_keluarga"),
+        *jumlah("jumlah_kepala_keluarga", "pria", "wanita"),
+        *unik("id_tahun"), *lonjakan("jumlah_kepala_keluarga", 0.3),
+    ],
+    "migrasi": [
+        *wajib("id_tahun", "migrasi_masuk", "migrasi_keluar"), *TAHUN,
+        *non_negatif("migrasi_masuk", "migrasi_keluar"), *tidak_semua_nol("migrasi_masuk", "migrasi_keluar"),
+        *unik("id_tahun"),
+    ],
+    "status_perkawinan": [
+        *wajib("id_tahun", "status_kawin", "cerai_hidup"), *TAHUN,
+        *non_negatif("status_kawin", "cerai_hidup"), *tidak_semua_nol("status_kawin", "cerai_hidup"),
+        *unik("id_tahun"), *lonjakan("status_kawin", 0.3),
+    ],
+    "putus_sekolah": [
+        *wajib("id_tahun", "jumlah_putus_sekolah"), *TAHUN,
+        *non_negatif("jumlah_putus_sekolah"),
+        *unik("id_tahun"),
+    ],
+    "penduduk_usia": [
+        *wajib("id_tahun", "kategori_usia", "laki_laki", "perempuan"), *TAHUN,
+        *anggota("kategori_usia", ["0-14", "15-60", "60+"]),
+        *positif("laki_laki", "perempuan"),
+        *jumlah("total", "laki_laki", "perempuan"),
+        *unik("id_tahun", "kategori_usia"), *lonjakan("total", 0.3, group="kategori_usia"),
+    ],
+}
+
+KOLOM_HASIL = ["baris", "id_tahun", "aturan", "kolom", "pesan", "level"]
+
+@timed("validate", tag_args=("table",))
+def validasi(table, df):
+    """
+    Jalankan semua aturan tabel pada df. Hasil: DataFrame satu baris per
+    pelanggaran (baris = label index df). Aturan yang kolomnya tidak ada dilewati.
+    """
+    aturan = ATURAN.get(table, [])
+    if df is None or df.empty or not aturan:
+        return pd.DataFrame(columns=KOLOM_HASIL)
+    hasil = []
+    for rule in aturan:
+        if not set(rule.kolom) <= set(df.columns):
+            continue
+        idx = np.flatnonzero(rule.cek(df))
+        if len(idx):
+            hasil.append(pd.DataFrame({
+                "baris": df.index[idx],
+                "id_tahun": df["id_tahun"].to_numpy()[idx] if "id_tahun" in df.columns else None,
+                "aturan": rule.nama,
+                "kolom": ", ".join(rule.kolom),
+                "pesan": rule.pesan,
+                "level": rule.level,
+            }))
+    if not hasil:
+        return pd.DataFrame(columns=KOLOM_HASIL)
+    return pd.concat(hasil, ignore_index=True)
+
+def periksa(table, rows):
+    """
+    Validasi baris yang akan ditulis (list of dict). Mengembalikan (ok, daftar pesan error);
+    peringatan tidak menggagalkan penulisan.
+    """
+    df = pd.DataFrame(rows)
+    pelanggaran = validasi(table, df)
+    errors = pelanggaran[pelanggaran["level"] == ERROR]
+    pesan = []
+    for baris, teks in zip(errors["baris"], errors["pesan"]):
+        konteks = [f"{label} {df.at[baris, col]}" for col, label in (("id_tahun", "tahun"), ("kategori_usia", "kategori"))
+                   if col in df.columns and pd.notna(df.at[baris, col])]
+        pesan.append(f"{teks} ({', '.join(konteks)})" if konteks else teks)
+    return errors.empty, list(dict.fromkeys(pesan))
+
+def saring(table, df):
+    """Buang baris dengan pelanggaran level error (dipakai sebelum training); dicatat di log"""
+    pelanggaran = validasi(table, df)
+    errors = pelanggaran[pelanggaran["level"] == ERROR]
+    if errors.empty:
+        return df
+    logger.warning("validation_excluded", extra={"table": table, "rows": int(errors["baris"].nunique()),
+                                                 "error": "; ".join(errors["pesan"].unique())})
+    return df.drop(index=errors["baris"].unique())
+
+def tampilkan_pelanggaran(table):
+    """
+    Ringkasan pelanggaran seluruh isi tabel (bukan hanya halaman yang tampil, agar
+    aturan unik dan lonjakan melihat semua baris) di halaman data_*; tidak tampil
+    jika tabel kosong atau bersih
+    """
+    import streamlit as st
+    from arrow_store import get_table, to_pandas
+
+    try:
+        data = get_table(table)
+    except Exception as e:
+        logger.warning("validation_fetch_error", extra={"table": table, "error": str(e)})
+        return
+    if data.num_rows == 0:
+        return
+    pelanggaran = validasi(table, to_pandas(data))
+    if pelanggaran.empty:
+        return
+    n_error = int((pelanggaran["level"] == ERROR).sum())
+    label = f"⚠️ {len(pelanggaran)} temuan validasi data ({n_error} error)"
+    with st.expander(label, expanded=n_error > 0):
+        st.dataframe(
+            pelanggaran[["id_tahun", "pesan", "level"]].rename(columns={"id_tahun": "Tahun", "pesan": "Pesan", "level": "Level"}),
+            use_container_width=True,
+            hide_index=True
+        )
+        if n_error:
+            st.caption("Baris dengan error tidak dipakai untuk melatih model prediksi.")
+
+def periksa_semua():
+    """Validasi isi semua tabel di Supabase"""
+    from model import fetch_data
+
+    hasil = []
+    for table in ATURAN:
+        try:
+            df = fetch_data(table, ["id_tahun"], [])
+        except Exception as e:
+            logger.warning("validation_fetch_error", extra={"table": table, "error": str(e)})
+            continue
+        hasil.append(validasi(table, df).assign(table=table))
+    return pd.concat(hasil, ignore_index=True) if hasil else pd.DataFrame(columns=KOLOM_HASIL + ["table"])
+
+if __name__ == "__main__":
+    pelanggaran = periksa_semua()
+    print(pelanggaran.to_string(index=False) if not pelanggaran.empty else "Semua tabel lolos validasi.")
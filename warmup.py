@@ -0,0 +1,82 @@
+"""
+Warmup model sebelum pengunjung pertama datang.
+
+    python warmup.py            # latih semua model halaman ui_* secara paralel
+    python warmup.py --jobs 2   # batasi jumlah proses
+"""
+import time
+import argparse
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from logging_setup import get_logger
+
+logger = get_logger("warmup")
+
+def warm_page(page):
+    """Ambil data dan latih semua model untuk satu halaman (dijalankan di proses terpisah)"""
+    from model import fetch_data
+    from model_store import MODEL_SPECS, FEATURE_COLUMNS, train_table_models, table_fingerprint
+    from artefak import dari_tabel
+
+    spec = MODEL_SPECS[page]
+    start = time.perf_counter()
+    columns = spec["targets"] + ([spec["group_by"]] if spec.get("group_by") else [])
+    df = fetch_data(spec["table"], FEATURE_COLUMNS, columns)
+    models = train_table_models(spec["table"], df, spec["targets"], group_by=spec.get("group_by"))
+    rows = dari_tabel(spec["table"], df, spec["targets"], spec.get("group_by"), models)
+    info = {"duration_s": round(time.perf_counter() - start, 3), "models": len(models),
+            "table": spec["table"], "fingerprint": table_fingerprint(spec["table"], df)}
+    return page, info, rows
+
+def run_warmup(jobs=None, pages=None):
+    """Warmup semua halaman secara paralel, tulis artefak model (artefak.py) dan tandai cache siap"""
+    from model_store import MODEL_SPECS, mark_ready
+    from artefak import tulis
+
+    pages = pages or list(MODEL_SPECS)
+    start = time.perf_counter()
+    report = {}
+    rows = []
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {executor.submit(warm_page, page): page for page in pages}
+        for future in as_completed(futures):
+            page = futures[future]
+            try:
+                _, report[page], page_rows = future.result()
+                rows.extend(page_rows)
+            except Exception as e:
+                report[page] = {"error": str(e)}
+                logger.error("warmup_error", extra={"table": MODEL_SPECS[page]["table"], "error": str(e)})
+    try:
+        tulis(rows)
+    except Exception as e:
+        logger.error("artifact_write_error", extra={"error": str(e)})
+    report["_total"] = {"duration_s": round(time.perf_counter() - start, 3)}
+    mark_ready(report)
+    return report
+
+_background = None
+
+def start_background_warmup(jobs=None):
+    """Jalankan warmup di thread latar sekali per proses jika cache belum siap"""
+    global _background
+    from model_store import is_ready
+
+    if is_ready() or (_background is not None and _background.is_alive()):
+        return _background
+    _background = threading.Thread(target=run_warmup, kwargs={"jobs": jobs}, daemon=True, name="warmup")
+    _background.start()
+    return _background
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Warmup model prediksi Sidareja")
+    parser.add_argument("--jobs", type=int, default=None, help="Jumlah proses paralel (default: jumlah core)")
+    args = parser.parse_args()
+
+    report = run_warmup(jobs=args.jobs)
+    for page, info in report.items():
+        if "error" in info:
+            print(f"{page:<28} GAGAL: {info['error']}")
+        else:
+            print(f"{page:<28} {info['duration_s']:>8.3f} s")